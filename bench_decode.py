@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark for the response decoding pipeline
+
+Compares JSON backends and transfer encodings on large txlist pages.
+Pass recorded responses as arguments, or use --record ADDRESS to save
+fresh txlist pages with the ETHERSCAN_API_KEY from your .env file.
+"""
+
+import gzip
+import json
+import os
+import sys
+import time
+import zlib
+from dotenv import load_dotenv
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from services.transport import create_session
+
+ROUNDS = 20
+
+# Rows per recorded page; the API rejects page * offset above 10,000
+PAGE_ROWS = 10000
+
+def record_payloads(address, pages=3):
+    """Save up to pages full txlist pages for an address to recorded_txlist_<n>.json
+    
+    Pages advance a startblock cursor past the last block of the previous
+    page, like the scanner service does, instead of a page number. Rows of
+    a block cut off at the end of a page are skipped; that does not matter
+    for timing the decode.
+    """
+    load_dotenv()
+    api_key = os.getenv('ETHERSCAN_API_KEY')
+    if not api_key:
+        print("Error: ETHERSCAN_API_KEY not found in environment variables")
+        return []
+    
+    session = create_session()
+    paths = []
+    cursor = 0
+    for page in range(1, pages + 1):
+        params = {
+            'module': 'account',
+            'action': 'txlist',
+            'address': address,
+            'startblock': cursor,
+            'endblock': 99999999,
+            'page': 1,
+            'offset': PAGE_ROWS,
+            'sort': 'asc',
+            'apikey': api_key
+        }
+        response = session.get("https://api.etherscan.io/api", params=params, timeout=60)
+        response.raise_for_status()
+        data = json.loads(response.content)
+        if data.get('status') != '1':
+            print(f"Page {page}: not recorded - {data.get('message')}: {data.get('result')}")
+            break
+        print(f"Page {page}: Content-Encoding={response.headers.get('Content-Encoding', 'identity')}, "
+              f"{len(response.content):,} bytes decoded, {len(data['result']):,} rows")
+        path = f"recorded_txlist_{page}.json"
+        with open(path, 'wb') as f:
+            f.write(response.content)
+        paths.append(path)
+        if len(data['result']) < PAGE_ROWS:
+            break
+        cursor = int(data['result'][-1]['blockNumber']) + 1
+        time.sleep(0.25)
+    return paths
+
+def timed(func, payload):
+    """Best-of-ROUNDS wall time in milliseconds"""
+    best = float('inf')
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        func(payload)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+def bench_payload(path):
+    with open(path, 'rb') as f:
+        raw = f.read()
+    data = json.loads(raw)
+    if data.get('status') != '1':
+        print(f"\n{os.path.basename(path)}: skipped, not a successful txlist page ({data.get('message')})")
+        return
+    rows = len(data['result'])
+    print(f"\n{os.path.basename(path)}: {rows:,} rows, {len(raw):,} bytes")
+    
+    print("  Decoders:")
+    backends = [('json', json.loads)]
+    try:
+        import orjson
+        backends.append(('orjson', orjson.loads))
+    except ImportError:
+        print("    orjson not installed (pip install orjson)")
+    baseline = None
+    for name, loads in backends:
+        ms = timed(loads, raw)
+        baseline = baseline or ms
+        print(f"    {name:<8} {ms:8.2f} ms  ({baseline / ms:.1f}x)")
+    
+    print("  Transfer encodings:")
+    encodings = [
+        ('gzip', lambda b: gzip.compress(b, 6), gzip.decompress),
+        ('deflate', lambda b: zlib.compress(b, 6), zlib.decompress)
+    ]
+    try:
+        import brotli
+        encodings.append(('br', lambda b: brotli.compress(b, quality=5), brotli.decompress))
+    except ImportError:
+        print("    brotli not installed (pip install brotli)")
+    for name, compress, decompress in encodings:
+        compressed = compress(raw)
+        ms = timed(decompress, compressed)
+        print(f"    {name:<8} {len(compressed):>12,} bytes ({len(compressed) / len(raw):.1%})  inflate {ms:.2f} ms")
+
+def main():
+    args = sys.argv[1:]
+    if args[:1] == ['--record']:
+        if len(args) < 2:
+            print("Usage: python bench_decode.py --record ADDRESS")
+            return 1
+        args = record_payloads(args[1])
+    
+    if not args:
+        print(__doc__.strip())
+        print("\nUsage: python bench_decode.py recorded_txlist.json [...]")
+        return 1
+    
+    session = create_session()
+    print(f"Session Accept-Encoding: {session.headers['Accept-Encoding']}")
+    for path in args:
+        bench_payload(path)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
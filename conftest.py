@@ -0,0 +1,123 @@
+"""
+Shared fixtures for the offline tests
+
+StubSession stands in for a scanner's HTTP session: it answers the
+account, proxy and logs calls the services make from in-memory rows and
+records every request, so tests can count what reached the network.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+ADDRESS = '0x' + 'a' * 40
+OTHER = '0x' + 'b' * 40
+
+
+def make_row(block, i=0, sender=OTHER, recipient=ADDRESS, value=1000, **fields):
+    """One txlist/tokentx style row"""
+    row = {
+        'blockNumber': str(block),
+        'timeStamp': str(1700000000 + block),
+        'hash': '0x%032x%032x' % (block, i),
+        'blockHash': '0x%064x' % block,
+        'from': sender,
+        'to': recipient,
+        'value': str(value),
+        'gas': '21000',
+        'gasPrice': '1',
+        'gasUsed': '21000',
+        'isError': '0',
+        'input': '0x'
+    }
+    row.update(fields)
+    return row
+
+
+class StubResponse:
+    def __init__(self, data):
+        self.content = json.dumps(data).encode()
+        self.status_code = 200
+        self.headers = {}
+    
+    def raise_for_status(self):
+        pass
+
+
+class StubSession:
+    """Answers scanner requests from rows keyed by action"""
+    
+    def __init__(self, head=10000):
+        self.head = head
+        self.rows = {}
+        self.balances = {}
+        self.hashes = {}
+        self.calls = []
+        self.error = None
+    
+    def get(self, url, params=None, timeout=None, **kwargs):
+        params = dict(params or {})
+        params.pop('apikey', None)
+        self.calls.append(params)
+        if self.error is not None:
+            raise self.error
+        return StubResponse(self.answer(params))
+    
+    def actions(self):
+        return [call.get('action') for call in self.calls]
+    
+    def answer(self, params):
+        action = params.get('action')
+        if action == 'eth_blockNumber':
+            return {'jsonrpc': '2.0', 'id': 1, 'result': hex(self.head)}
+        if action == 'eth_getBlockByNumber':
+            block = int(params['tag'], 16)
+            found = self.hashes.get(block, '0x%064x' % block) if block <= self.head else None
+            return {'jsonrpc': '2.0', 'id': 1, 'result': {'hash': found} if found else None}
+        if action == 'balance':
+            return {'status': '1', 'message': 'OK', 'result': str(self.balances.get(params['address'].lower(), 0))}
+        
+        address = (params.get('address') or '').lower()
+        contract = (params.get('contractaddress') or '').lower()
+        start = int(params.get('startblock', params.get('fromBlock', 0)))
+        end = int(params.get('endblock', params.get('toBlock', 10 ** 12)))
+        rows = [
+            row for row in self.rows.get(action, [])
+            if start <= int(row['blockNumber']) <= end
+            and (not address or address in (row.get('from', '').lower(), row.get('to', '').lower()))
+            and (not contract or row.get('contractAddress', '').lower() == contract)
+        ]
+        rows.sort(key=lambda row: int(row['blockNumber']), reverse=params.get('sort') == 'desc')
+        rows = rows[:int(params.get('offset', 10000))]
+        if not rows:
+            return {'status': '0', 'message': 'No transactions found', 'result': []}
+        return {'status': '1', 'message': 'OK', 'result': rows}
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Keep persisted state and caches of the test in a temporary directory"""
+    monkeypatch.setenv('MCP_ETHERSCAN_DATA_DIR', str(tmp_path))
+    monkeypatch.delenv('CACHE_BACKEND', raising=False)
+    monkeypatch.delenv('MCP_OFFLINE', raising=False)
+    return tmp_path
+
+
+@pytest.fixture
+def stub():
+    return StubSession()
+
+
+@pytest.fixture
+def service(data_dir, stub):
+    """An Etherscan service whose requests are answered by the stub"""
+    from services.etherscan_service import EtherscanService
+    scanner = EtherscanService('test-key', requests_per_second=10000)
+    scanner.session = stub
+    return scanner
+
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+"""
+Bulk export of address histories
+
+Streams every transaction, token transfer and internal transaction of the
+given addresses to JSONL, CSV or Parquet files, one directory per chain
+and address. Progress is checkpointed, so an interrupted export picks up
+where it stopped and a later run appends only what is new.
+"""
+
+import argparse
+import os
+import sys
+from dotenv import load_dotenv
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from models import EXPORT_DATASETS, EXPORT_FORMATS, ExportInput
+from services.chain_manager import ChainManager
+
+def main():
+    parser = argparse.ArgumentParser(description="Export full address histories to disk")
+    parser.add_argument('addresses', nargs='+', help="addresses to export")
+    parser.add_argument('--chains', default='ethereum', help="comma separated chains (default: ethereum)")
+    parser.add_argument('--datasets', default=','.join(EXPORT_DATASETS),
+                        help=f"comma separated datasets (default: {','.join(EXPORT_DATASETS)})")
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='jsonl', help="output format")
+    parser.add_argument('--output', default='',
+                        help="subdirectory of exports/ in the data directory (default: exports/ itself)")
+    args = parser.parse_args()
+    
+    load_dotenv()
+    try:
+        input_data = ExportInput(
+            addresses=args.addresses,
+            chains=args.chains.replace(',', ' ').split(),
+            datasets=args.datasets.replace(',', ' ').split(),
+            format=args.format
+        )
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    
+    manager = ChainManager()
+    try:
+        results = manager.export_histories(input_data.addresses, input_data.chains, input_data.datasets,
+                                           input_data.format, args.output)
+    except KeyboardInterrupt:
+        print("\nInterrupted - run the same command again to resume")
+        return 130
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    
+    failed = 0
+    for result in results:
+        if result['error']:
+            failed += 1
+            print(f"❌ {result['chain']} {result['address']}: {result['error']}")
+            continue
+        counts = ", ".join(f"{dataset}={rows}" for dataset, rows in result['rows'].items())
+        print(f"✅ {result['chain']} {result['address']}: {result['added']} new rows ({counts})")
+        print(f"   {result['directory']}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
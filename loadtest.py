@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+
+"""
+Load test for the MCP Etherscan Server
+
+Starts a local stand-in for the scanner APIs, launches src/server.py over
+stdio or an HTTP transport pointed at it, replays a weighted mix of tool calls at a target
+rate and concurrency, and reports throughput, latency percentiles, error
+rates and the server's peak RSS. No API key or network access is needed.
+
+Example:
+    python loadtest.py --rate 50 --concurrency 16 --duration 30 \\
+        --mix check_balance=5,get_transactions=3,get_token_transfers=2,get_gas_prices=1
+    python loadtest.py --transport streamable-http --clients 8 --rate 100 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'server.py')
+
+DEFAULT_MIX = "check_balance=5,get_transactions=3,get_token_transfers=2,get_gas_prices=1"
+
+ADDRESS_POOL = ['0x%040x' % (0x1000 + i) for i in range(200)]
+
+TRANSFER_TOPIC = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+
+TOKEN_ABI = json.dumps([
+    {"type": "event", "name": "Transfer", "anonymous": False, "inputs": [
+        {"name": "from", "type": "address", "indexed": True},
+        {"name": "to", "type": "address", "indexed": True},
+        {"name": "value", "type": "uint256", "indexed": False}]},
+    {"type": "function", "name": "transfer", "inputs": [
+        {"name": "to", "type": "address"}, {"name": "value", "type": "uint256"}], "outputs": []}
+])
+
+def tool_arguments(tool, rng):
+    """Arguments for one call of a tool"""
+    address = rng.choice(ADDRESS_POOL)
+    if tool in ('get_transactions', 'get_token_transfers', 'get_internal_transactions', 'get_nft_transfers'):
+        return {'address': address, 'limit': 10}
+    if tool in ('get_gas_prices', 'get_available_chains'):
+        return {}
+    if tool == 'get_event_logs':
+        return {'address': address, 'topic0': TRANSFER_TOPIC, 'limit': 20}
+    return {'address': address}
+
+class StandInAPI(BaseHTTPRequestHandler):
+    """Answers Etherscan-style queries with deterministic synthetic data"""
+    
+    latency = 0.0
+    requests_served = 0
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_GET(self):
+        params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        if self.latency:
+            time.sleep(self.latency)
+        StandInAPI.requests_served += 1
+        body = json.dumps(self.answer(params)).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def answer(self, params):
+        action = params.get('action', '')
+        address = params.get('address', '0x' + '0' * 40)
+        seed = int(address[-6:], 16) if address.startswith('0x') else 0
+        count = min(int(params.get('offset', 10)), 50)
+        
+        if action == 'balance':
+            return {'status': '1', 'message': 'OK', 'result': str(seed * 10 ** 15)}
+        if action == 'balancemulti':
+            return {'status': '1', 'message': 'OK', 'result': [
+                {'account': a, 'balance': str(int(a[-6:], 16) * 10 ** 15)} for a in address.split(',')]}
+        if action == 'tokenbalance':
+            return {'status': '1', 'message': 'OK', 'result': str(seed * 10 ** 6)}
+        if action == 'gasoracle':
+            return {'status': '1', 'message': 'OK', 'result': {
+                'SafeGasPrice': '20', 'ProposeGasPrice': '25', 'FastGasPrice': '30', 'suggestBaseFee': '19.5'}}
+        if action == 'eth_blockNumber':
+            return {'jsonrpc': '2.0', 'id': 1, 'result': hex(19000100)}
+        if action == 'getabi':
+            return {'status': '1', 'message': 'OK', 'result': TOKEN_ABI}
+        if action in ('txlist', 'tokentx', 'txlistinternal', 'tokennfttx', 'token1155tx'):
+            return {'status': '1', 'message': 'OK', 'result': [self.row(address, seed, i) for i in range(count)]}
+        if action == 'getLogs':
+            return {'status': '1', 'message': 'OK', 'result': [self.log(address, seed, i) for i in range(count)]}
+        return {'status': '0', 'message': 'NOTOK', 'result': f"Unsupported action '{action}'"}
+    
+    @staticmethod
+    def row(address, seed, i):
+        block = 19000000 - i * 3
+        return {
+            'blockNumber': str(block), 'timeStamp': str(1700000000 - i * 36), 'hash': '0x%064x' % (seed * 1000 + i),
+            'from': address, 'to': '0x%040x' % (seed + i + 1), 'value': str((i + 1) * 10 ** 16),
+            'gas': '21000', 'gasPrice': '25000000000', 'gasUsed': '21000', 'isError': '0', 'txreceipt_status': '1',
+            'input': '0xa9059cbb' + '0' * 128, 'contractAddress': '0x%040x' % (0xc0de + i % 3),
+            'tokenName': 'Token %d' % (i % 3), 'tokenSymbol': 'TK%d' % (i % 3), 'tokenDecimal': '18',
+            'tokenID': str(i), 'tokenValue': '1', 'type': 'call', 'blockHash': '0x%064x' % block
+        }
+    
+    @staticmethod
+    def log(address, seed, i):
+        return {
+            'address': address, 'blockNumber': hex(19000000 - i), 'timeStamp': hex(1700000000 - i * 12),
+            'transactionHash': '0x%064x' % (seed * 1000 + i), 'logIndex': hex(i),
+            'topics': [TRANSFER_TOPIC, '0x' + '0' * 24 + address[2:], '0x' + '0' * 24 + '%040x' % (seed + i)],
+            'data': '0x%064x' % ((i + 1) * 10 ** 18)
+        }
+
+def start_stand_in_api(latency_ms):
+    """Serve the stand-in API on a free local port in a daemon thread"""
+    StandInAPI.latency = latency_ms / 1000.0
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StandInAPI)
+    threading.Thread(target=httpd.serve_forever, name='stand-in-api', daemon=True).start()
+    return httpd, f"http://127.0.0.1:{httpd.server_address[1]}/api"
+
+def server_environment(api_url, data_dir):
+    env = dict(os.environ)
+    env.update({
+        'ETHERSCAN_API_KEY': 'loadtest',
+        'BSCSCAN_API_KEY': 'loadtest',
+        'ETHERSCAN_API_URL': api_url,
+        'BSCSCAN_API_URL': api_url,
+        'ETHERSCAN_RATE_LIMIT': env.get('ETHERSCAN_RATE_LIMIT', '10000'),
+        'BSCSCAN_RATE_LIMIT': env.get('BSCSCAN_RATE_LIMIT', '10000'),
+        'MCP_ETHERSCAN_DATA_DIR': data_dir
+    })
+    return env
+
+def find_server_pids():
+    """PIDs of server.py processes started by this load test (Linux only)"""
+    pids = []
+    if not os.path.isdir('/proc'):
+        return pids
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/cmdline', 'rb') as f:
+                cmdline = f.read().split(b'\0')
+            with open(f'/proc/{entry}/stat') as f:
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == os.getpid() and any(arg.endswith(b'server.py') for arg in cmdline):
+            pids.append(int(entry))
+    return pids
+
+def peak_rss_kb(pid):
+    """VmHWM (peak resident set size) of a process in KiB, if available"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip():
+            mix[name.strip()] = float(weight or 1)
+    return mix
+
+def percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round((len(sorted_values) - 1) * percent / 100.0)))
+    return sorted_values[index]
+
+async def run_load(sessions, args, mix):
+    """Open-loop load: call i starts at i / rate, with at most concurrency in flight"""
+    rng = random.Random(args.seed)
+    tools, weights = list(mix), list(mix.values())
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    sample_errors = {}
+    semaphore = asyncio.Semaphore(args.concurrency)
+    total_calls = args.calls or int(args.rate * args.duration)
+    
+    async def one_call(session, tool, arguments):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await session.call_tool(tool, arguments)
+                text = ''.join(getattr(c, 'text', '') for c in result.content)
+                failed = result.isError or text.startswith('Error:')
+            except Exception as e:
+                failed, text = True, str(e)
+            latencies[tool].append(time.perf_counter() - started)
+            if failed:
+                errors[tool] += 1
+                sample_errors.setdefault(tool, text[:200])
+    
+    started = time.perf_counter()
+    tasks = []
+    for i in range(total_calls):
+        delay = started + i / args.rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tool = rng.choices(tools, weights)[0]
+        session = sessions[i % len(sessions)]
+        tasks.append(asyncio.create_task(one_call(session, tool, tool_arguments(tool, rng))))
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - started, latencies, errors, sample_errors
+
+def report(elapsed, latencies, errors, sample_errors, peak_rss, api_requests):
+    all_latencies = sorted(x for values in latencies.values() for x in values)
+    total = len(all_latencies)
+    total_errors = sum(errors.values())
+    
+    print("\nResults")
+    print("=" * 72)
+    print(f"Calls: {total} in {elapsed:.1f}s -> {total / elapsed:.1f} calls/s")
+    print(f"Errors: {total_errors} ({total_errors / max(total, 1):.1%})")
+    print(f"Latency: p50 {percentile(all_latencies, 50) * 1000:.1f} ms, "
+          f"p90 {percentile(all_latencies, 90) * 1000:.1f} ms, "
+          f"p99 {percentile(all_latencies, 99) * 1000:.1f} ms, "
+          f"max {(all_latencies[-1] if all_latencies else 0) * 1000:.1f} ms")
+    print(f"Stand-in API requests: {api_requests}")
+    print(f"Server peak RSS: {f'{peak_rss / 1024:.1f} MiB' if peak_rss else 'n/a'}")
+    
+    print(f"\n{'tool':<28}{'calls':>7}{'errors':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for tool, values in sorted(latencies.items()):
+        values = sorted(values)
+        print(f"{tool:<28}{len(values):>7}{errors[tool]:>8}"
+              f"{percentile(values, 50) * 1000:>10.1f}{percentile(values, 99) * 1000:>10.1f}")
+    for tool, text in sample_errors.items():
+        print(f"\nFirst {tool} error: {text}")
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+async def wait_for_port(port, timeout=30.0):
+    """Wait until the HTTP server accepts connections"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"Server did not start listening on port {port}")
+
+async def open_sessions(stack, args, env, errlog):
+    """Start the server and open client sessions; returns (sessions, server pid)"""
+    if args.transport == 'stdio':
+        params = StdioServerParameters(command=sys.executable, args=[SERVER_SCRIPT], env=env)
+        read, write = await stack.enter_async_context(stdio_client(params, errlog=errlog))
+        session = await stack.enter_async_context(ClientSession(read, write))
+        await session.initialize()
+        pids = find_server_pids()
+        return [session], pids[0] if pids else None
+    
+    port = free_port()
+    process = subprocess.Popen([sys.executable, SERVER_SCRIPT, '--transport', args.transport, '--port', str(port)],
+                               env=env, stdout=errlog, stderr=errlog)
+    stack.callback(process.wait)
+    stack.callback(process.terminate)
+    await wait_for_port(port)
+    
+    sessions = []
+    for _ in range(args.clients):
+        if args.transport == 'sse':
+            streams = await stack.enter_async_context(sse_client(f"http://127.0.0.1:{port}/sse"))
+        else:
+            streams = await stack.enter_async_context(streamablehttp_client(f"http://127.0.0.1:{port}/mcp"))
+        session = await stack.enter_async_context(ClientSession(streams[0], streams[1]))
+        await session.initialize()
+        sessions.append(session)
+    return sessions, process.pid
+
+async def main_async(args):
+    mix = parse_mix(args.mix)
+    httpd, api_url = start_stand_in_api(args.api_latency)
+    data_dir = tempfile.mkdtemp(prefix='mcp-loadtest-')
+    print(f"Stand-in API: {api_url} ({args.api_latency:.0f} ms latency)")
+    
+    errlog = sys.stderr if args.verbose else open(os.devnull, 'w')
+    async with contextlib.AsyncExitStack() as stack:
+        sessions, pid = await open_sessions(stack, args, server_environment(api_url, data_dir), errlog)
+        tools = {tool.name for tool in (await sessions[0].list_tools()).tools}
+        unknown = set(mix) - tools
+        if unknown:
+            print(f"Unknown tools in mix: {sorted(unknown)}")
+            return 1
+        print(f"Server started over {args.transport} (pid {pid or '?'}, {len(sessions)} client(s)); "
+              f"{args.calls or int(args.rate * args.duration)} calls at {args.rate}/s, concurrency {args.concurrency}")
+        
+        elapsed, latencies, errors, sample_errors = await run_load(sessions, args, mix)
+        peak_rss = peak_rss_kb(pid) if pid else None
+    
+    httpd.shutdown()
+    report(elapsed, latencies, errors, sample_errors, peak_rss, StandInAPI.requests_served)
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the MCP Etherscan Server against a stand-in API")
+    parser.add_argument('--rate', type=float, default=20.0, help="target tool calls per second")
+    parser.add_argument('--concurrency', type=int, default=8, help="maximum calls in flight")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds of load (ignored with --calls)")
+    parser.add_argument('--calls', type=int, default=0, help="exact number of calls to make")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="weighted tool mix, e.g. check_balance=5,get_gas_prices=1")
+    parser.add_argument('--transport', choices=['stdio', 'streamable-http', 'sse'], default='stdio',
+                        help="how to run and reach the server")
+    parser.add_argument('--clients', type=int, default=4, help="client sessions sharing one HTTP server")
+    parser.add_argument('--api-latency', type=float, default=50.0, help="stand-in API latency in ms")
+    parser.add_argument('--seed', type=int, default=1, help="random seed for the call mix")
+    parser.add_argument('--verbose', action='store_true', help="show the server's log output")
+    return asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -34,7 +34,7 @@ def run_server():
     print("Press Ctrl+C to stop the server")
     
     try:
-        subprocess.run([sys.executable, "src/server.py"])
+        subprocess.run([sys.executable, "src/server.py"] + sys.argv[2:])
     except KeyboardInterrupt:
         print("\nServer stopped by user")
     except Exception as e:
@@ -54,6 +54,8 @@ def main():
         print("Usage:")
         print("  python run.py test  - Run tests")
         print("  python run.py run   - Start the server")
+        print("  python run.py run --transport streamable-http --port 8000")
+        print("                      - Serve many clients over HTTP")
         print()
         print("Make sure you have:")
         print("1. Installed dependencies: pip install -r requirements.txt")
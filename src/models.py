@@ -1,12 +1,12 @@
-from typing import Optional
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
-import re
+
+from services.address import normalize_address, normalize_addresses
 
 def validate_ethereum_address(v: str) -> str:
-    """Validate Ethereum address format"""
-    if not re.match(r'^0x[a-fA-F0-9]{40}$', v):
-        raise ValueError('Invalid Ethereum address format')
-    return v
+    """Validate Ethereum address format and checksum, returning it lowercased"""
+    return normalize_address(v)
 
 class AddressBalance(BaseModel):
     address: str
@@ -15,6 +15,15 @@ class AddressBalance(BaseModel):
     chain: Optional[str] = "Ethereum"
     native_token: Optional[str] = "ETH"
 
+class HistoricalBalance(BaseModel):
+    address: str
+    block_number: int
+    balance_in_wei: int
+    balance_in_eth: str
+    chain: Optional[str] = "Ethereum"
+    native_token: Optional[str] = "ETH"
+    finalized: bool = False
+
 class Transaction(BaseModel):
     hash: str
     from_address: str
@@ -24,11 +33,14 @@ class Transaction(BaseModel):
     block_number: int
     chain: Optional[str] = "Ethereum"
     native_token: Optional[str] = "ETH"
+    method_id: Optional[str] = None
+    method_name: Optional[str] = None
 
 class TokenTransfer(BaseModel):
     token: str
     token_name: str
     token_symbol: str
+    token_decimals: Optional[int] = None
     from_address: str
     to_address: str
     value: str
@@ -37,6 +49,68 @@ class TokenTransfer(BaseModel):
     chain: Optional[str] = "Ethereum"
     token_standard: Optional[str] = "ERC20"
 
+class InternalTransaction(BaseModel):
+    hash: str
+    from_address: str
+    to_address: str
+    value: str
+    timestamp: int
+    block_number: int
+    call_type: Optional[str] = "call"
+    is_error: bool = False
+    chain: Optional[str] = "Ethereum"
+    native_token: Optional[str] = "ETH"
+
+class NFTTransfer(BaseModel):
+    token: str
+    token_name: str
+    token_symbol: str
+    token_id: str
+    quantity: str = "1"
+    from_address: str
+    to_address: str
+    timestamp: int
+    block_number: int
+    chain: Optional[str] = "Ethereum"
+    token_standard: Optional[str] = "ERC721"
+
+class EventLog(BaseModel):
+    address: str
+    block_number: int
+    timestamp: int
+    transaction_hash: str
+    log_index: int
+    topics: List[str]
+    data: str
+    event: Optional[str] = None
+    signature: Optional[str] = None
+    args: Optional[Dict[str, Any]] = None
+    chain: Optional[str] = "Ethereum"
+
+class TokenHolding(BaseModel):
+    token: str
+    token_name: str
+    token_symbol: str
+    token_decimals: int
+    raw_balance: int
+    balance: str
+    transfer_count: int
+    chain: Optional[str] = "Ethereum"
+    verified: Optional[bool] = None
+    live_balance: Optional[str] = None
+
+class WatchlistChange(BaseModel):
+    cursor: int
+    chain: str
+    address: str
+    kind: str
+    detected_at: int
+    old_balance_wei: Optional[int] = None
+    new_balance_wei: Optional[int] = None
+    new_transactions: Optional[int] = None
+    latest_block: Optional[int] = None
+    latest_transaction: Optional[str] = None
+
 class GasPrice(BaseModel):
     safe_gwei: str
     propose_gwei: str
@@ -69,6 +143,16 @@ class TokenTransferInput(BaseModel):
         super().__init__(**data)
         self.address = validate_ethereum_address(self.address)
 
+class NFTTransferInput(BaseModel):
+    address: str = Field(..., description="EVM address (0x format)")
+    limit: Optional[int] = Field(default=10, ge=1, le=100, description="Number of transfers to return (max 100)")
+    chain: Optional[str] = Field(default="ethereum", description="Blockchain chain")
+    standard: Optional[str] = Field(default="ERC721", pattern=r'(?i)^(ERC|BEP)?(721|1155)$', description="NFT standard (ERC721 or ERC1155)")
+    
+    def __init__(self, **data):
+        super().__init__(**data)
+        self.address = validate_ethereum_address(self.address)
+
 class ContractInput(BaseModel):
     address: str = Field(..., description="Contract address (0x format)")
     chain: Optional[str] = Field(default="ethereum", description="Blockchain chain")
@@ -76,3 +160,96 @@ class ContractInput(BaseModel):
     def __init__(self, **data):
         super().__init__(**data)
         self.address = validate_ethereum_address(self.address)
+
+
+class LogQueryInput(BaseModel):
+    address: str = Field(..., description="Contract address emitting the logs (0x format)")
+    chain: Optional[str] = Field(default="ethereum", description="Blockchain chain")
+    topic0: Optional[str] = Field(default=None, pattern=r'^0x[a-fA-F0-9]{64}$', description="Event signature hash to filter on")
+    from_block: Optional[int] = Field(default=0, ge=0, description="First block to search")
+    to_block: Optional[int] = Field(default=None, ge=0, description="Last block to search (latest if omitted)")
+    limit: Optional[int] = Field(default=20, ge=1, le=1000, description="Number of logs to return (max 1000)")
+    
+    def __init__(self, **data):
+        super().__init__(**data)
+        self.address = validate_ethereum_address(self.address)
+
+class WatchlistInput(BaseModel):
+    addresses: List[str] = Field(..., min_length=1, description="EVM addresses (0x format)")
+    chain: Optional[str] = Field(default="ethereum", description="Blockchain chain")
+    
+    def __init__(self, **data):
+        super().__init__(**data)
+        self.addresses = normalize_addresses(self.addresses)
+
+class HistoricalBalanceInput(BaseModel):
+    addresses: List[str] = Field(..., min_length=1, description="EVM addresses (0x format)")
+    blocks: List[int] = Field(default_factory=list, description="Block numbers")
+    timestamps: List[int] = Field(default_factory=list, description="Unix timestamps, resolved to the block before each")
+    chain: Optional[str] = Field(default="ethereum", description="Blockchain chain")
+    
+    def __init__(self, **data):
+        super().__init__(**data)
+        self.addresses = normalize_addresses(self.addresses)
+        points = len(self.addresses) * (len(self.blocks) + len(self.timestamps))
+        if not self.blocks and not self.timestamps:
+            raise ValueError('Give at least one block or date')
+        if any(block < 0 for block in self.blocks):
+            raise ValueError('Block numbers must not be negative')
+        if points > 100:
+            raise ValueError(f'At most 100 address/block points per query (got {points})')
+
+EXPORT_DATASETS = ('transactions', 'token_transfers', 'internal_transactions')
+EXPORT_FORMATS = ('jsonl', 'csv', 'parquet')
+
+class ExportInput(BaseModel):
+    addresses: List[str] = Field(..., min_length=1, max_length=50, description="EVM addresses (0x format)")
+    chains: List[str] = Field(default_factory=lambda: ['ethereum'], min_length=1, description="Blockchain chains")
+    datasets: List[str] = Field(default_factory=lambda: list(EXPORT_DATASETS), min_length=1, description="Histories to export")
+    format: str = Field(default="jsonl", description="Output format: jsonl, csv or parquet")
+    
+    def __init__(self, **data):
+        super().__init__(**data)
+        self.addresses = normalize_addresses(self.addresses)
+        self.chains = [chain.lower() for chain in self.chains]
+        self.format = self.format.lower()
+        unknown = [dataset for dataset in self.datasets if dataset not in EXPORT_DATASETS]
+        if unknown:
+            raise ValueError(f"Unknown datasets {unknown}. Available: {list(EXPORT_DATASETS)}")
+        if self.format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown format '{self.format}'. Available: {list(EXPORT_FORMATS)}")
+
+class GraphQueryInput(BaseModel):
+    address: str = Field(..., description="EVM address (0x format) to expand from")
+    chain: Optional[str] = Field(default="ethereum", description="Blockchain chain")
+    hops: int = Field(default=2, ge=1, le=3, description="Hops to expand")
+    fan_out: int = Field(default=10, ge=1, le=25, description="Counterparties followed per address")
+    min_value: str = Field(default="0", description="Smallest edge value followed, in native or token units")
+    direction: str = Field(default="out", description="Follow funds sent (out), received (in) or both")
+    token: Optional[str] = Field(default=None, description="Token contract to follow instead of the native coin")
+    target: Optional[str] = Field(default=None, description="Address to find paths to")
+    
+    def __init__(self, **data):
+        super().__init__(**data)
+        self.address = validate_ethereum_address(self.address)
+        if self.token:
+            self.token = validate_ethereum_address(self.token)
+        if self.target:
+            self.target = validate_ethereum_address(self.target)
+        self.direction = self.direction.lower()
+        if self.direction not in ('out', 'in', 'both'):
+            raise ValueError("Direction must be 'out', 'in' or 'both'")
+        try:
+            if Decimal(self.min_value) < 0:
+                raise ValueError('Minimum value must not be negative')
+        except InvalidOperation:
+            raise ValueError(f"Invalid minimum value '{self.min_value}'")
+
+class PortfolioInput(BaseModel):
+    address: str = Field(..., description="EVM address (0x format)")
+    chain: Optional[str] = Field(default="ethereum", description="Blockchain chain")
+    verify_sample: Optional[int] = Field(default=3, ge=0, le=20, description="Number of holdings to check against live balances")
+    
+    def __init__(self, **data):
+        super().__init__(**data)
+        self.address = validate_ethereum_address(self.address)
\ No newline at end of file
@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 
+import argparse
 import asyncio
+import functools
 import os
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
+from decimal import Decimal
 from typing import Any
 
 # Add the current directory to the Python path
@@ -13,42 +16,101 @@ from mcp.server.fastmcp import FastMCP
 from dotenv import load_dotenv
 
 from services.chain_manager import ChainManager
+from services.deadline import deadline, tool_deadline
+from services.degraded import set_offline, track_staleness
+from services.tool_pool import BoundedToolPool, ServerBusy
 from models import (
     AddressInput,
     TransactionHistoryInput,
     TokenTransferInput,
-    ContractInput
+    NFTTransferInput,
+    ContractInput,
+    LogQueryInput,
+    WatchlistInput,
+    HistoricalBalanceInput,
+    ExportInput,
+    GraphQueryInput,
+    PortfolioInput
 )
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Chain Manager (handles all chains)
-chain_manager = ChainManager()
+# Initialize Chain Manager (handles all chains); decoding worker processes
+# import this module as __mp_main__ and never call a tool, so they skip it
+chain_manager = ChainManager() if __name__ != '__mp_main__' else None
 
 # Create MCP server
 mcp = FastMCP("Etherscan Server")
 
+# Blocking tool work runs here, so one server can serve many clients at once
+tool_pool = BoundedToolPool()
+
+def offload_tool(func):
+    """Run a blocking tool on the worker pool under its time budget (TOOL_DEADLINES)
+    
+    The budget starts when the call arrives, so time spent queued for a
+    worker counts against it. A saturated pool answers with an error
+    instead of queueing without bound. Answers that fell back to local
+    data because a scanner was unavailable say so, and how old it is.
+    """
+    def tracked(*args, **kwargs):
+        with track_staleness() as report:
+            result = func(*args, **kwargs)
+        if report.notes and isinstance(result, str) and not result.startswith("Error:"):
+            result += _format_staleness(report)
+        return result
+    
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with deadline(tool_deadline(func.__name__)):
+            try:
+                return await tool_pool.run(tracked, *args, **kwargs)
+            except ServerBusy as e:
+                return f"Error: {str(e)}"
+    return wrapper
+
+def _format_staleness(report) -> str:
+    """Footer for answers served from local data in degraded mode"""
+    oldest = report.oldest()
+    if oldest >= 3600:
+        age = f"{oldest / 3600:.1f}h"
+    elif oldest >= 60:
+        age = f"{oldest / 60:.0f}m"
+    else:
+        age = f"{oldest:.0f}s"
+    reasons = report.reasons()
+    more = f" (+{len(reasons) - 1} more)" if len(reasons) > 1 else ""
+    return f"\n\n⚠️ Degraded mode: served from local data up to {age} old; upstream: {reasons[0]}{more}"
+
+def _format_age(age_seconds: float) -> str:
+    """Note how old a cached answer is; fresh answers get no note"""
+    if age_seconds < 1:
+        return ""
+    return f" (cached {age_seconds:.0f}s ago)"
+
 @mcp.tool()
+@offload_tool
 def check_balance(address: str, chain: str = "ethereum") -> str:
     """Check the native token balance of an address on any supported chain"""
     try:
         # Validate input
         input_data = AddressInput(address=address, chain=chain)
-        balance = chain_manager.check_balance(input_data.address, input_data.chain)
+        balance, age = chain_manager.check_balance_cached(input_data.address, input_data.chain)
         
-        return f"Address: {balance.address}\nChain: {balance.chain}\nBalance: {balance.balance_in_eth} {balance.native_token}"
+        return f"Address: {balance.address}\nChain: {balance.chain}\nBalance: {balance.balance_in_eth} {balance.native_token}{_format_age(age)}"
     except Exception as e:
         return f"Error: {str(e)}"
 
 @mcp.tool()
+@offload_tool
 def get_transactions(address: str, limit: int = 10, chain: str = "ethereum") -> str:
     """Get recent transactions for an address on any supported chain"""
     try:
         # Validate input
         input_data = TransactionHistoryInput(address=address, limit=limit, chain=chain)
         transactions = chain_manager.get_transactions(
-            input_data.address, 
+            input_data.address,
             input_data.chain,
             input_data.limit or 10
         )
@@ -65,7 +127,8 @@ def get_transactions(address: str, limit: int = 10, chain: str = "ethereum") ->
                 f"From: {tx.from_address}\n"
                 f"To: {tx.to_address}\n"
                 f"Value: {tx.value} {tx.native_token}\n"
-                f"---"
+                + (f"Method: {tx.method_name or tx.method_id}\n" if tx.method_id else "")
+                + f"---"
             )
         
         return f"Recent transactions for {input_data.address} on {input_data.chain}:\n\n" + "\n".join(formatted_transactions)
@@ -73,13 +136,14 @@ def get_transactions(address: str, limit: int = 10, chain: str = "ethereum") ->
         return f"Error: {str(e)}"
 
 @mcp.tool()
+@offload_tool
 def get_token_transfers(address: str, limit: int = 10, chain: str = "ethereum") -> str:
     """Get token transfers for an address on any supported chain"""
     try:
         # Validate input
         input_data = TokenTransferInput(address=address, limit=limit, chain=chain)
         transfers = chain_manager.get_token_transfers(
-            input_data.address, 
+            input_data.address,
             input_data.chain,
             input_data.limit or 10
         )
@@ -106,6 +170,113 @@ def get_token_transfers(address: str, limit: int = 10, chain: str = "ethereum")
         return f"Error: {str(e)}"
 
 @mcp.tool()
+@offload_tool
+def get_internal_transactions(address: str, limit: int = 10, chain: str = "ethereum") -> str:
+    """Get recent internal (contract-initiated) transactions for an address on any supported chain"""
+    try:
+        # Validate input
+        input_data = TransactionHistoryInput(address=address, limit=limit, chain=chain)
+        transactions = chain_manager.get_internal_transactions(
+            input_data.address,
+            input_data.chain,
+            input_data.limit or 10
+        )
+        
+        if not transactions:
+            return f"No internal transactions found for {input_data.address} on {input_data.chain}"
+        
+        formatted_transactions = []
+        for tx in transactions:
+            date = datetime.fromtimestamp(tx.timestamp).strftime('%Y-%m-%d %H:%M:%S')
+            formatted_transactions.append(
+                f"Block {tx.block_number} ({date}):\n"
+                f"Hash: {tx.hash}\n"
+                f"Type: {tx.call_type}{' (failed)' if tx.is_error else ''}\n"
+                f"From: {tx.from_address}\n"
+                f"To: {tx.to_address}\n"
+                f"Value: {tx.value} {tx.native_token}\n"
+                f"---"
+            )
+        
+        return f"Recent internal transactions for {input_data.address} on {input_data.chain}:\n\n" + "\n".join(formatted_transactions)
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+@offload_tool
+def get_nft_transfers(address: str, limit: int = 10, chain: str = "ethereum", standard: str = "ERC721") -> str:
+    """Get ERC721 or ERC1155 NFT transfers for an address on any supported chain"""
+    try:
+        # Validate input
+        input_data = NFTTransferInput(address=address, limit=limit, chain=chain, standard=standard)
+        transfers = chain_manager.get_nft_transfers(
+            input_data.address,
+            input_data.chain,
+            input_data.limit or 10,
+            input_data.standard or "ERC721"
+        )
+        
+        if not transfers:
+            return f"No {input_data.standard} transfers found for {input_data.address} on {input_data.chain}"
+        
+        formatted_transfers = []
+        for tx in transfers:
+            date = datetime.fromtimestamp(tx.timestamp).strftime('%Y-%m-%d %H:%M:%S')
+            formatted_transfers.append(
+                f"Block {tx.block_number} ({date}):\n"
+                f"Collection: {tx.token_name} ({tx.token_symbol})\n"
+                f"Standard: {tx.token_standard}\n"
+                f"Token ID: {tx.token_id}\n"
+                f"Quantity: {tx.quantity}\n"
+                f"From: {tx.from_address}\n"
+                f"To: {tx.to_address}\n"
+                f"Contract: {tx.token}\n"
+                f"---"
+            )
+        
+        return f"Recent NFT transfers for {input_data.address} on {input_data.chain}:\n\n" + "\n".join(formatted_transfers)
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+@offload_tool
+def get_token_portfolio(address: str, chain: str = "ethereum", verify_sample: int = 3) -> str:
+    """Get all token holdings of an address, rebuilt from its full transfer history"""
+    try:
+        input_data = PortfolioInput(address=address, chain=chain, verify_sample=verify_sample)
+        portfolio = chain_manager.get_token_portfolio(
+            input_data.address,
+            input_data.chain,
+            input_data.verify_sample or 0
+        )
+        
+        holdings = portfolio['holdings']
+        if not holdings:
+            return f"No token holdings found for {input_data.address} on {input_data.chain}"
+        
+        formatted_holdings = []
+        for holding in holdings:
+            line = f"{holding.token_symbol or '?'}: {holding.balance} ({holding.token_name or 'Unknown'}, {holding.token})"
+            if holding.verified is False:
+                line += f" [live balance differs: {holding.live_balance}]"
+            elif holding.verified:
+                line += " [verified]"
+            formatted_holdings.append(line)
+        
+        summary = (
+            f"Token portfolio for {portfolio['address']} on {portfolio['chain']}:\n"
+            f"Tokens held: {len(holdings)}\n"
+            f"Transfers processed: {portfolio['transfers_processed']} ({portfolio['new_transfers']} new)\n"
+            f"Synced through block: {portfolio['synced_through_block']}\n"
+        )
+        if portfolio['rolled_back']:
+            summary += f"Transfers rolled back after reorgs: {portfolio['rolled_back']}\n"
+        return summary + "\n" + "\n".join(formatted_holdings)
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+@offload_tool
 def get_contract_abi(address: str, chain: str = "ethereum") -> str:
     """Get the ABI for a smart contract on any supported chain"""
     try:
@@ -118,22 +289,215 @@ def get_contract_abi(address: str, chain: str = "ethereum") -> str:
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def get_gas_prices(chain: str = "ethereum") -> str:
-    """Get current gas prices in Gwei for any supported chain"""
+@offload_tool
+def get_event_logs(address: str, chain: str = "ethereum", topic0: str = "", from_block: int = 0,
+                   to_block: int = 0, limit: int = 20, decode: bool = True) -> str:
+    """Get event logs emitted by a contract, decoded with its verified ABI when available"""
+    try:
+        # Validate input
+        input_data = LogQueryInput(
+            address=address,
+            chain=chain,
+            topic0=topic0 or None,
+            from_block=from_block,
+            to_block=to_block or None,
+            limit=limit
+        )
+        logs = chain_manager.get_event_logs(
+            input_data.address,
+            input_data.chain,
+            [input_data.topic0] if input_data.topic0 else None,
+            input_data.from_block or 0,
+            input_data.to_block,
+            input_data.limit or 20,
+            decode
+        )
+        
+        if not logs:
+            return f"No event logs found for {input_data.address} on {input_data.chain}"
+        
+        formatted_logs = []
+        for log in logs:
+            date = datetime.fromtimestamp(log.timestamp).strftime('%Y-%m-%d %H:%M:%S')
+            entry = f"Block {log.block_number} ({date}), log {log.log_index}:\nTx: {log.transaction_hash}\n"
+            if log.event:
+                entry += f"Event: {log.signature}\n"
+                entry += "".join(f"  {name}: {value}\n" for name, value in (log.args or {}).items())
+            else:
+                entry += f"Topics: {', '.join(log.topics)}\nData: {log.data}\n"
+            formatted_logs.append(entry + "---")
+        
+        return f"Event logs for {input_data.address} on {input_data.chain}:\n\n" + "\n".join(formatted_logs)
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+@offload_tool
+def get_gas_prices(chain: str = "ethereum", window_minutes: int = 15) -> str:
+    """Get current gas prices in Gwei for any supported chain, with percentiles and trend over recent minutes"""
     try:
         prices = chain_manager.get_gas_prices(chain)
         
-        return (
+        result = (
             f"Current Gas Prices on {prices.chain}:\n"
             f"Safe Low: {prices.safe_gwei} Gwei\n"
             f"Standard: {prices.propose_gwei} Gwei\n"
             f"Fast: {prices.fast_gwei} Gwei"
         )
+        
+        stats = chain_manager.get_gas_statistics(chain, window_minutes)
+        if stats['samples'] > 1:
+            labels = {'safe': 'Safe Low', 'propose': 'Standard', 'fast': 'Fast'}
+            result += f"\n\nLast {window_minutes} minutes ({stats['samples']} samples):\n"
+            for tier, label in labels.items():
+                p = stats['percentiles'].get(tier, {})
+                slope = stats['trend'].get(tier)
+                line = f"{label}: p10 {p.get(10, 0):.2f} / p50 {p.get(50, 0):.2f} / p90 {p.get(90, 0):.2f} Gwei"
+                if slope is not None:
+                    line += f", trend {slope:+.3f} Gwei/min"
+                result += line + "\n"
+        
+        return result.rstrip()
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+def _parse_time(value: str) -> int:
+    """Unix timestamp from digits or an ISO date/time (UTC unless an offset is given)"""
+    if value.isdigit():
+        return int(value)
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+@mcp.tool()
+@offload_tool
+def get_historical_balance(addresses: str, blocks: str = "", dates: str = "", chain: str = "ethereum") -> str:
+    """Get native balances at past blocks or dates (comma separated addresses, blocks and dates)"""
+    try:
+        input_data = HistoricalBalanceInput(
+            addresses=addresses.replace(',', ' ').split(),
+            blocks=[int(block) for block in blocks.replace(',', ' ').split()],
+            timestamps=[_parse_time(date) for date in dates.replace(',', ' ').split()],
+            chain=chain
+        )
+        results = chain_manager.get_historical_balances(
+            input_data.addresses,
+            input_data.chain,
+            input_data.blocks,
+            input_data.timestamps
+        )
+        
+        lines = []
+        for address, block, result in results:
+            if isinstance(result, Exception):
+                lines.append(f"{address} @ block {block}: ERROR - {str(result)}")
+            else:
+                note = "" if result.finalized else " (not yet final)"
+                lines.append(f"{address} @ block {block}: {result.balance_in_eth} {result.native_token}{note}")
+        
+        return f"Historical balances on {input_data.chain}:\n\n" + "\n".join(lines)
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+@offload_tool
+def export_address_history(addresses: str, chains: str = "ethereum",
+                           datasets: str = "transactions,token_transfers,internal_transactions",
+                           format: str = "jsonl", output_dir: str = "") -> str:
+    """Export full transaction, token transfer and internal transaction histories to JSONL, CSV or Parquet files"""
+    try:
+        input_data = ExportInput(
+            addresses=addresses.replace(',', ' ').split(),
+            chains=chains.replace(',', ' ').split(),
+            datasets=datasets.replace(',', ' ').split(),
+            format=format
+        )
+        results = chain_manager.export_histories(
+            input_data.addresses,
+            input_data.chains,
+            input_data.datasets,
+            input_data.format,
+            output_dir or None
+        )
+        
+        lines = []
+        for result in results:
+            counts = ", ".join(f"{dataset} {rows}" for dataset, rows in result['rows'].items())
+            if result['error']:
+                status = f"ERROR - {result['error']}"
+            elif result['complete']:
+                status = f"complete, {result['added']} new rows"
+            else:
+                status = f"incomplete, {result['added']} new rows - call again to resume"
+            lines.append(f"{result['chain'].upper()} {result['address']}: {status}\n  {counts or 'no rows yet'}\n  {result['directory']}")
+        
+        return f"Export ({input_data.format}):\n\n" + "\n".join(lines)
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+@offload_tool
+def get_counterparty_graph(address: str, chain: str = "ethereum", hops: int = 2, fan_out: int = 10,
+                           min_value: str = "0", direction: str = "out", token: str = "", target: str = "") -> str:
+    """Trace where funds went (or came from) over several hops, or find paths between two addresses"""
+    try:
+        input_data = GraphQueryInput(
+            address=address,
+            chain=chain,
+            hops=hops,
+            fan_out=fan_out,
+            min_value=min_value,
+            direction=direction,
+            token=token or None,
+            target=target or None
+        )
+        graph = chain_manager.get_counterparty_graph(
+            input_data.address,
+            input_data.chain,
+            input_data.hops,
+            input_data.fan_out,
+            Decimal(input_data.min_value),
+            input_data.direction,
+            input_data.token,
+            input_data.target
+        )
+        
+        unit = graph['unit']
+        lines = []
+        for hop in range(1, input_data.hops + 1):
+            hop_edges = [edge for edge in graph['edges'] if edge['hop'] == hop]
+            if not hop_edges:
+                continue
+            lines.append(f"Hop {hop}:")
+            for edge in hop_edges:
+                if 'sent' in edge:
+                    lines.append(f"  {edge['from']} <-> {edge['to']}: {edge['value']} {unit} total exchanged "
+                                 f"(sent {edge['sent']}, received {edge['received']}; "
+                                 f"{edge['count']} transfers, last block {edge['last_block']})")
+                    continue
+                lines.append(f"  {edge['from']} -> {edge['to']}: {edge['value']} {unit} "
+                             f"({edge['count']} transfers, last block {edge['last_block']})")
+        
+        summary = (
+            f"Counterparty graph for {graph['root']} on {input_data.chain} "
+            f"({input_data.direction}, {len(graph['nodes']) - 1} addresses reached):\n"
+        )
+        if input_data.target:
+            paths = graph['paths']
+            summary += f"Paths to {input_data.target}: {len(paths)}\n"
+            summary += "".join(f"  {' -> '.join(path)}\n" for path in paths)
+        if graph['errors']:
+            summary += f"Partial result: {len(graph['errors'])} addresses could not be expanded\n"
+        elif graph['truncated']:
+            summary += f"Partial result: stopped at {len(graph['nodes'])} addresses\n"
+        return summary + "\n" + ("\n".join(lines) or "No counterparties above the minimum value")
     except Exception as e:
         return f"Error: {str(e)}"
 
 # Multi-chain tools
 @mcp.tool()
+@offload_tool
 def check_balance_all_chains(address: str) -> str:
     """Check balance for an address across all available chains"""
     try:
@@ -145,16 +509,18 @@ def check_balance_all_chains(address: str) -> str:
             if result['success']:
                 balance_info = result['balance']
                 formatted_results.append(
-                    f"{chain.upper()}: {balance_info['balance_in_eth']} {result['native_token']}"
+                    f"{chain.upper()}: {balance_info['balance_in_eth']} {result['native_token']}{_format_age(result['age_seconds'])}"
                 )
             else:
-                formatted_results.append(f"{chain.upper()}: ERROR - {result['error']}")
+                status = "TIMED OUT" if result.get('timed_out') else "ERROR"
+                formatted_results.append(f"{chain.upper()}: {status} - {result['error']}")
         
         return f"Balance for {input_data.address} across all chains:\n\n" + "\n".join(formatted_results)
     except Exception as e:
         return f"Error: {str(e)}"
 
 @mcp.tool()
+@offload_tool
 def search_address_activity(address: str) -> str:
     """Search for address activity across all available chains"""
     try:
@@ -170,7 +536,7 @@ def search_address_activity(address: str) -> str:
         for chain, info in results['chains'].items():
             if info['has_activity']:
                 balance_info = info['balance']
-                activity_info = f"{chain.upper()}: ACTIVE\n"
+                activity_info = f"{chain.upper()}: ACTIVE{_format_age(info['age_seconds'])}\n"
                 activity_info += f"  Balance: {balance_info['balance_in_eth']} {balance_info['native_token']}\n"
                 
                 if info['latest_transaction']:
@@ -180,7 +546,10 @@ def search_address_activity(address: str) -> str:
                 
                 chain_details.append(activity_info)
             elif info['error']:
-                chain_details.append(f"{chain.upper()}: ERROR - {info['error']}\n")
+                status = "TIMED OUT" if info.get('timed_out') else "ERROR"
+                chain_details.append(f"{chain.upper()}: {status} - {info['error']}\n")
+            elif info.get('quiet_through') is not None:
+                chain_details.append(f"{chain.upper()}: No activity detected (through block {info['quiet_through']:,})\n")
             else:
                 chain_details.append(f"{chain.upper()}: No activity detected\n")
         
@@ -189,6 +558,70 @@ def search_address_activity(address: str) -> str:
         return f"Error: {str(e)}"
 
 @mcp.tool()
+@offload_tool
+def watch_addresses(addresses: str, chain: str = "ethereum") -> str:
+    """Watch addresses (comma separated) for balance changes and new transactions"""
+    try:
+        input_data = WatchlistInput(addresses=addresses.replace(',', ' ').split(), chain=chain)
+        added = chain_manager.watch_addresses(input_data.addresses, input_data.chain)
+        watched = chain_manager.watchlist.watched().get(input_data.chain.lower(), [])
+        
+        return (
+            f"Now watching {added} new address(es) on {input_data.chain} "
+            f"({len(watched)} watched in total).\n"
+            f"Use get_watchlist_changes to see what changed."
+        )
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+@offload_tool
+def unwatch_addresses(addresses: str, chain: str = "ethereum") -> str:
+    """Stop watching addresses (comma separated)"""
+    try:
+        input_data = WatchlistInput(addresses=addresses.replace(',', ' ').split(), chain=chain)
+        removed = chain_manager.unwatch_addresses(input_data.addresses, input_data.chain)
+        
+        return f"Stopped watching {removed} address(es) on {input_data.chain}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+@offload_tool
+def get_watchlist_changes(cursor: int = 0, limit: int = 100) -> str:
+    """Get balance changes and new activity on watched addresses since a cursor"""
+    try:
+        changes, next_cursor = chain_manager.get_watchlist_changes(cursor, limit)
+        retained_from = chain_manager.watchlist.retained_from
+        gap = (
+            f"Changes between cursor {cursor} and {retained_from} are no longer retained.\n"
+            if cursor < retained_from else ""
+        )
+        
+        if not changes:
+            return f"{gap}No changes since cursor {cursor}.\nNext cursor: {next_cursor}"
+        
+        formatted_changes = []
+        for change in changes:
+            date = datetime.fromtimestamp(change.detected_at).strftime('%Y-%m-%d %H:%M:%S')
+            if change.kind == 'balance':
+                formatted_changes.append(
+                    f"[{change.cursor}] {date} {change.chain.upper()} {change.address}: "
+                    f"balance {change.old_balance_wei} -> {change.new_balance_wei} wei"
+                )
+            else:
+                formatted_changes.append(
+                    f"[{change.cursor}] {date} {change.chain.upper()} {change.address}: "
+                    f"{change.new_transactions} new transaction(s), latest {change.latest_transaction} "
+                    f"in block {change.latest_block}"
+                )
+        
+        return f"{gap}Watchlist changes since cursor {cursor}:\n\n" + "\n".join(formatted_changes) + f"\n\nNext cursor: {next_cursor}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+@offload_tool
 def get_available_chains() -> str:
     """Get list of available blockchain networks"""
     try:
@@ -209,6 +642,65 @@ def get_available_chains() -> str:
         return f"Error: {str(e)}"
 
 @mcp.tool()
+@offload_tool
+def get_api_quota() -> str:
+    """Get today's API call usage against each key's daily quota"""
+    try:
+        statuses = chain_manager.get_quota_status()
+        if not statuses:
+            return "No chains are currently available. Please check your API key configuration."
+        
+        lines = []
+        for chain, status in statuses.items():
+            hours, seconds = divmod(status['resets_in_seconds'], 3600)
+            line = (
+                f"{chain.upper()}: {status['used']:,} / {status['limit']:,} calls "
+                f"({status['percent_used']}%), {status['remaining']:,} left, resets in {hours}h {seconds // 60}m"
+            )
+            if status['throttled']:
+                line += f"\n  Throttled: {', '.join(status['throttled'])} traffic paused until the reset"
+            upstream = status['upstream']
+            if upstream['state'] == 'offline':
+                line += "\n  Upstream: offline mode, answering from local data only"
+            elif upstream['state'] == 'open':
+                line += f"\n  Upstream: unavailable ({upstream['reason']}), retrying in {upstream['retry_in_seconds']}s"
+            lines.append(line)
+        
+        return f"API quota for {statuses[next(iter(statuses))]['day']} (UTC):\n\n" + "\n".join(lines)
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+@offload_tool
+def get_cache_stats() -> str:
+    """Get the size, memory budget and hit rate of every cache"""
+    try:
+        groups = chain_manager.get_cache_stats()
+        
+        lines = []
+        total = 0
+        for owner, caches in groups.items():
+            lines.append(f"{owner.upper()}:")
+            for name, stats in caches.items():
+                lookups = stats['hits'] + stats['misses']
+                hit_rate = f"{100.0 * stats['hits'] / lookups:.0f}% hit rate" if lookups else "no lookups"
+                if 'bytes' in stats:
+                    total += stats['bytes']
+                    budget = f"{stats['max_bytes'] / 1048576:.1f} MB" if stats['max_bytes'] else "unlimited"
+                    size = f"{stats['bytes'] / 1048576:.1f} MB of {budget}"
+                elif 'disk_bytes' in stats:
+                    budget = f"{stats['max_bytes'] / 1048576:.1f} MB" if stats['max_bytes'] else "unlimited"
+                    size = f"{stats['disk_bytes'] / 1048576:.1f} MB of {budget} on disk ({stats['backend']})"
+                else:
+                    size = f"on disk ({stats.get('backend', 'external')})"
+                lines.append(f"  {name}: {stats['entries']:,} entries, {size}, {hit_rate}, {stats['evictions']:,} evictions")
+        
+        return f"Caches (estimated in-process memory {total / 1048576:.1f} MB):\n\n" + "\n".join(lines)
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+@offload_tool
 def get_ens_name(address: str) -> str:
     """Get the ENS name for an Ethereum address (Ethereum only)"""
     try:
@@ -219,8 +711,8 @@ def get_ens_name(address: str) -> str:
         ens_name = service.get_ens_name(input_data.address)
         
         return (
-            f"ENS name for {input_data.address}: {ens_name}" 
-            if ens_name 
+            f"ENS name for {input_data.address}: {ens_name}"
+            if ens_name
             else f"No ENS name found for {input_data.address}"
         )
     except Exception as e:
@@ -228,8 +720,26 @@ def get_ens_name(address: str) -> str:
 
 def main():
     """Main entry point"""
-    print("Etherscan MCP Server running on stdio", file=sys.stderr)
-    mcp.run()
+    parser = argparse.ArgumentParser(description="Etherscan MCP Server")
+    parser.add_argument('--transport', choices=['stdio', 'sse', 'streamable-http'],
+                        default=os.getenv('MCP_TRANSPORT', 'stdio'),
+                        help="stdio serves one client; sse and streamable-http serve many")
+    parser.add_argument('--host', default=os.getenv('MCP_HOST', '127.0.0.1'), help="bind address for HTTP transports")
+    parser.add_argument('--port', type=int, default=int(os.getenv('MCP_PORT', '8000')), help="port for HTTP transports")
+    parser.add_argument('--offline', action='store_true', help="never call the scanners; answer from local data (MCP_OFFLINE)")
+    args = parser.parse_args()
+    
+    if args.offline:
+        set_offline(True)
+    if args.transport == 'stdio':
+        print("Etherscan MCP Server running on stdio", file=sys.stderr)
+    else:
+        mcp.settings.host = args.host
+        mcp.settings.port = args.port
+        path = mcp.settings.sse_path if args.transport == 'sse' else mcp.settings.streamable_http_path
+        print(f"Etherscan MCP Server running on http://{args.host}:{args.port}{path} ({args.transport}, "
+              f"{tool_pool.workers} tool workers)", file=sys.stderr)
+    mcp.run(transport=args.transport)
 
 if __name__ == "__main__":
     main()
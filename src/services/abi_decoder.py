@@ -0,0 +1,223 @@
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.cache import TTLCache, byte_budget
+from services.workers import map_chunks
+
+# Contracts whose event index is kept; an evicted contract's ABI is indexed again on its next use
+CONTRACT_INDEXES = 2000
+
+# Distinct events kept in the global index for contracts without an ABI
+GLOBAL_EVENTS = 10000
+
+
+def keccak256(text: str) -> bytes:
+    """Keccak-256 of a UTF-8 string, as used for selectors and topics"""
+    try:
+        from eth_utils import keccak
+    except ImportError:
+        raise ImportError("ABI decoding requires eth-utils (pip install eth-utils)")
+    return keccak(text=text)
+
+
+def _abi_decode(types: List[str], data: bytes) -> Tuple[Any, ...]:
+    try:
+        from eth_abi import decode
+    except ImportError:
+        raise Exception("ABI decoding requires eth-abi (pip install eth-abi)")
+    return decode(types, data)
+
+
+def canonical_type(param: Dict[str, Any]) -> str:
+    """Return the canonical ABI type of a parameter, expanding tuples"""
+    abi_type = param.get('type', '')
+    if abi_type.startswith('tuple'):
+        components = ','.join(canonical_type(c) for c in param.get('components', []))
+        return f"({components}){abi_type[len('tuple'):]}"
+    return abi_type
+
+
+def _is_dynamic(abi_type: str) -> bool:
+    """Whether an indexed value of this type is stored as a hash in its topic"""
+    return abi_type in ('string', 'bytes') or abi_type.endswith(']') or abi_type.startswith('(')
+
+
+def _to_json_value(value: Any) -> Any:
+    """Make decoded ABI values JSON friendly"""
+    if isinstance(value, bytes):
+        return '0x' + value.hex()
+    if isinstance(value, (list, tuple)):
+        return [_to_json_value(v) for v in value]
+    return value
+
+
+def parse_abi(abi: Any) -> List[Dict[str, Any]]:
+    """Accept an ABI as JSON text or an already-parsed list"""
+    if isinstance(abi, str):
+        abi = json.loads(abi)
+    return [entry for entry in abi if isinstance(entry, dict)]
+
+
+class EventSpec:
+    """Precomputed decoding plan for one event signature"""
+    
+    __slots__ = ('name', 'signature', 'topic0', 'indexed', 'data_names', 'data_types')
+    
+    def __init__(self, entry: Dict[str, Any]):
+        inputs = entry.get('inputs', [])
+        self.name = entry.get('name', '')
+        self.signature = f"{self.name}({','.join(canonical_type(p) for p in inputs)})"
+        self.topic0 = '0x' + keccak256(self.signature).hex()
+        self.indexed = [(p.get('name', ''), canonical_type(p)) for p in inputs if p.get('indexed')]
+        data_params = [p for p in inputs if not p.get('indexed')]
+        self.data_names = [p.get('name', '') for p in data_params]
+        self.data_types = [canonical_type(p) for p in data_params]
+    
+    def to_tuple(self) -> Tuple[Any, ...]:
+        """Compact, picklable form for handing to worker processes"""
+        return (self.name, self.signature, self.topic0, tuple(self.indexed), tuple(self.data_names), tuple(self.data_types))
+    
+    @classmethod
+    def from_tuple(cls, packed: Tuple[Any, ...]) -> 'EventSpec':
+        spec = cls.__new__(cls)
+        spec.name, spec.signature, spec.topic0, indexed, data_names, data_types = packed
+        spec.indexed, spec.data_names, spec.data_types = list(indexed), list(data_names), list(data_types)
+        return spec
+    
+    def decode(self, topics: List[str], data: str) -> Dict[str, Any]:
+        """Decode a log's indexed topics and data payload into named arguments"""
+        args: Dict[str, Any] = {}
+        
+        for position, (name, abi_type) in enumerate(self.indexed, start=1):
+            key = name or f"arg{position - 1}"
+            if position >= len(topics):
+                args[key] = None
+            elif _is_dynamic(abi_type):
+                # Only the hash of dynamic indexed values is recorded on chain
+                args[key] = topics[position]
+            else:
+                args[key] = _to_json_value(_abi_decode([abi_type], bytes.fromhex(topics[position][2:]))[0])
+        
+        if self.data_types:
+            raw = bytes.fromhex(data[2:] if data.startswith('0x') else data)
+            values = _abi_decode(self.data_types, raw)
+            for position, (name, value) in enumerate(zip(self.data_names, values)):
+                args[name or f"data{position}"] = _to_json_value(value)
+        
+        return args
+
+
+def decode_log_chunk(spec_table: List[Tuple[Any, ...]],
+                     jobs: List[Tuple[int, List[str], str]]) -> List[Optional[Dict[str, Any]]]:
+    """Worker entry point: decode (spec index, topics, data) jobs against packed specs"""
+    specs = [EventSpec.from_tuple(packed) for packed in spec_table]
+    results = []
+    for spec_index, topics, data in jobs:
+        try:
+            results.append(specs[spec_index].decode(topics, data))
+        except Exception:
+            results.append(None)
+    return results
+
+
+def build_event_index(abi: Any) -> Dict[str, EventSpec]:
+    """Map topic0 hashes to event specs for every non-anonymous event in an ABI"""
+    index = {}
+    for entry in parse_abi(abi):
+        if entry.get('type') == 'event' and not entry.get('anonymous'):
+            spec = EventSpec(entry)
+            index[spec.topic0] = spec
+    return index
+
+
+class EventDecoder:
+    """Topic0 lookup tables built once per cached ABI
+    
+    Each contract gets its own index, and every event seen in any ABI is
+    also merged into a global index so logs from contracts without a
+    verified ABI can still be decoded when they emit standard events. The
+    global index is keyed by topic0 and indexed-argument count, which keeps
+    e.g. ERC20 and ERC721 Transfer apart. Both are LRU caches, each held
+    to the 'abi' byte budget.
+    """
+    
+    def __init__(self):
+        self._by_contract = TTLCache(max_entries=CONTRACT_INDEXES, default_ttl=None, max_bytes=byte_budget('abi'))
+        self._global = TTLCache(max_entries=GLOBAL_EVENTS, default_ttl=None, max_bytes=byte_budget('abi'))
+        self._lock = threading.Lock()
+    
+    def has_contract(self, address: str) -> bool:
+        return self._by_contract.get(address.lower()) is not None
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {'abi': self._by_contract.stats(), 'abi_global': self._global.stats()}
+    
+    def register_abi(self, address: str, abi: Any) -> Dict[str, EventSpec]:
+        """Index an ABI's events; returns the contract's index"""
+        index = build_event_index(abi)
+        with self._lock:
+            self._by_contract.set(address.lower(), index)
+            for topic0, spec in index.items():
+                if self._global.get((topic0, len(spec.indexed))) is None:
+                    self._global.set((topic0, len(spec.indexed)), spec)
+        return index
+    
+    def mark_unavailable(self, address: str):
+        """Remember a contract has no usable ABI so it is not fetched again"""
+        with self._lock:
+            if self._by_contract.get(address.lower()) is None:
+                self._by_contract.set(address.lower(), {})
+    
+    def lookup(self, address: str, topics: List[str]) -> Optional[EventSpec]:
+        """O(1) lookup of the event spec for a log's topics"""
+        topic0 = topics[0].lower()
+        spec = self._by_contract.get(address.lower(), {}).get(topic0)
+        return spec if spec is not None else self._global.get((topic0, len(topics) - 1))
+    
+    def decode(self, log: Dict[str, Any]) -> Optional[Tuple[EventSpec, Dict[str, Any]]]:
+        """Decode a raw getLogs row, or return None if its event is unknown"""
+        topics = log.get('topics') or []
+        if not topics:
+            return None
+        spec = self.lookup(log.get('address', ''), topics)
+        if spec is None:
+            return None
+        try:
+            return spec, spec.decode(topics, log.get('data', '0x'))
+        except Exception:
+            # Malformed payload or an ABI that does not match the emitted layout
+            return None
+    
+    def decode_many(self, logs: List[Dict[str, Any]]) -> List[Optional[Tuple[EventSpec, Dict[str, Any]]]]:
+        """Decode a batch of logs, spreading large batches over the worker pool
+        
+        Spec lookup stays in this process; only the ABI decoding, which
+        dominates the cost, is shipped out as compact tuples.
+        """
+        specs: List[EventSpec] = []
+        positions: Dict[int, int] = {}
+        jobs = []
+        targets = []
+        
+        for i, log in enumerate(logs):
+            topics = log.get('topics') or []
+            spec = self.lookup(log.get('address', ''), topics) if topics else None
+            if spec is None:
+                continue
+            if id(spec) not in positions:
+                positions[id(spec)] = len(specs)
+                specs.append(spec)
+            jobs.append((positions[id(spec)], topics, log.get('data', '0x')))
+            targets.append(i)
+        
+        results: List[Optional[Tuple[EventSpec, Dict[str, Any]]]] = [None] * len(logs)
+        if not jobs:
+            return results
+        
+        chunks = map_chunks(decode_log_chunk, jobs, [spec.to_tuple() for spec in specs])
+        decoded = [args for chunk in chunks for args in chunk]
+        for i, (job, args) in enumerate(zip(jobs, decoded)):
+            if args is not None:
+                results[targets[i]] = (specs[job[0]], args)
+        return results
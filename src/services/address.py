@@ -0,0 +1,71 @@
+import re
+from functools import lru_cache
+from typing import Iterable, List
+
+from services.abi_decoder import keccak256
+
+# Distinct addresses whose validation result is remembered
+ADDRESS_CACHE_SIZE = 8192
+
+_ADDRESS_RE = re.compile(r'0x[0-9a-fA-F]{40}\Z')
+
+
+def to_checksum_address(address: str) -> str:
+    """EIP-55 mixed-case form of a 0x-prefixed address"""
+    body = address[2:].lower()
+    digest = keccak256(body).hex()
+    return '0x' + ''.join(c.upper() if int(h, 16) >= 8 else c for c, h in zip(body, digest))
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def _normalize(address: str) -> str:
+    if not _ADDRESS_RE.fullmatch(address):
+        raise ValueError('format')
+    body = address[2:]
+    # All-lowercase and all-uppercase addresses carry no checksum
+    if body != body.lower() and body != body.upper():
+        try:
+            checksummed = to_checksum_address(address)
+        except ImportError:
+            raise ValueError('eth-utils')
+        if checksummed != address:
+            raise ValueError('checksum')
+    return address.lower()
+
+
+def _invalid(address: str, reason: str, network: str) -> ValueError:
+    if reason == 'eth-utils':
+        return ValueError(f"Checking the EIP-55 checksum of mixed-case address {address} requires "
+                          f"eth-utils (pip install eth-utils); pass it in lowercase to skip the check")
+    if reason == 'checksum':
+        return ValueError(f"Invalid EIP-55 checksum for {network} address {address}")
+    return ValueError(f"Invalid {network} address format")
+
+
+def normalize_address(address: str, network: str = 'Ethereum') -> str:
+    """Validate an address, including its EIP-55 checksum if mixed-case, and return it lowercased
+    
+    Results are memoized, so re-validating an address further down the
+    call path is a dictionary hit.
+    """
+    try:
+        return _normalize(address)
+    except (ValueError, TypeError) as e:
+        raise _invalid(address, str(e), network)
+
+
+def normalize_addresses(addresses: Iterable[str], network: str = 'Ethereum') -> List[str]:
+    """Validate many addresses at once, reporting every invalid entry together"""
+    normalized = []
+    invalid = []
+    for address in addresses:
+        try:
+            normalized.append(_normalize(address))
+        except (ValueError, TypeError) as e:
+            if str(e) == 'eth-utils':
+                raise _invalid(address, str(e), network)
+            invalid.append(str(address))
+    if invalid:
+        shown = ', '.join(invalid[:5]) + (f" and {len(invalid) - 5} more" if len(invalid) > 5 else '')
+        raise ValueError(f"Invalid {network} addresses: {shown}")
+    return normalized
@@ -1,36 +1,315 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 from decimal import Decimal
+import contextvars
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
-import re
 
-from models import AddressBalance, Transaction, TokenTransfer, GasPrice
+from models import (
+    AddressBalance,
+    HistoricalBalance,
+    Transaction,
+    TokenTransfer,
+    InternalTransaction,
+    NFTTransfer,
+    EventLog,
+    GasPrice
+)
+from services.address import normalize_address, normalize_addresses
+from services.cache import byte_budget
+from services.abi_decoder import EventDecoder, EventSpec
+from services.deadline import DeadlineExceeded, check_deadline, remaining
+from services.degraded import CONNECT_TIMEOUT, CircuitBreaker, UpstreamUnavailable, note_stale, stale_allowed
+from services.inactivity_index import InactivityIndex
+from services.shared_cache import create_response_cache
+from services.quota import QuotaTracker
+from services.scheduler import BULK, RequestScheduler, current_priority
+from services.selector_index import default_selector_index
+from services.token_registry import TokenRegistry
+from services.transport import create_session, decode_json
+
+# Highest block accepted as an open-ended end of range by the scanner APIs
+LATEST_BLOCK = 99999999
+
+# Rows requested per page when streaming a full history
+HISTORY_PAGE_SIZE = 1000
+
+# Addresses accepted by one balancemulti call
+BALANCEMULTI_BATCH = 20
+
+# Free-tier scanner keys allow 5 calls per second
+DEFAULT_RATE_LIMIT = 5.0
+
+# Seconds a cached history page stays fresh
+HISTORY_CACHE_TTL = 30.0
+
+# Seconds a fetched contract ABI is reused
+ABI_CACHE_TTL = 24 * 60 * 60.0
+
+# Upper bound on a single HTTP request, before any deadline shortens it
+REQUEST_TIMEOUT = 30.0
+
+# Seconds the chain head block number is reused
+HEAD_CACHE_TTL = 3.0
+
+# Concurrent lookups in batch historical queries (the scheduler still paces them)
+HISTORY_BATCH_WORKERS = 8
+
+# History is split into a pinned finalized part and a refetched tail at a
+# multiple of this many blocks, so the split (and the cache keys that depend
+# on it) only moves now and then
+FINALITY_ALIGN = 256
+
+# Seconds the head used for that split is reused; an older head only moves
+# the split further back
+FINALITY_HEAD_TTL = 60.0
+
+# Last good responses kept to answer from when the scanner is unavailable
+LAST_KNOWN_ENTRIES = 4096
+
+
+def _block_of(row: Dict[str, Any]) -> int:
+    """Block number of a list row; logs report it in hex, accounts in decimal"""
+    value = row.get('blockNumber') or '0'
+    return int(value, 16) if value.startswith('0x') else int(value)
 
 
 class BaseScannerService(ABC):
     """Abstract base class for blockchain scanner services"""
     
-    def __init__(self, api_key: str, base_url: str, chain_name: str, native_token: str):
+    # Blocks behind the head after which a block can no longer be reorganised
+    finality_depth = 64
+    
+    def __init__(self, api_key: str, base_url: str, chain_name: str, native_token: str,
+                 requests_per_second: float = DEFAULT_RATE_LIMIT, daily_quota: Optional[int] = None):
         self.api_key = api_key
         self.base_url = base_url
         self.chain_name = chain_name
         self.native_token = native_token
+        self.token_registry = TokenRegistry(chain_name)
+        self.inactivity_index = InactivityIndex(chain_name)
+        self.session = create_session()
+        self.scheduler = RequestScheduler(requests_per_second)
+        self.quota = QuotaTracker(chain_name, api_key, daily_quota, scheduler=self.scheduler)
+        self.response_cache = create_response_cache(chain_name.lower(), max_entries=512, default_ttl=HISTORY_CACHE_TTL,
+                                                    max_bytes=byte_budget('response'))
+        # Answers about finalized blocks never change, so they are kept until evicted for space
+        self.finalized_cache = create_response_cache(f"{chain_name.lower()}-finalized", max_entries=50000, default_ttl=None,
+                                                     max_bytes=byte_budget('finalized'))
+        self._finality_head = (-1, float('-inf'))
+        # Last good response per request, served in degraded mode with its age
+        self.last_known = create_response_cache(f"{chain_name.lower()}-last-known", max_entries=LAST_KNOWN_ENTRIES,
+                                                default_ttl=None, max_bytes=byte_budget('last_known'))
+        self.circuit = CircuitBreaker(chain_name)
+        self.event_decoder = EventDecoder()
+        self.selector_index = default_selector_index()
     
-    def _make_request(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Make a request to scanner API"""
-        params['apikey'] = self.api_key
+    def _make_request(self, params: Dict[str, Any], allow_empty: bool = False,
+                      cache_ttl: Optional[float] = None, remember: bool = True) -> Dict[str, Any]:
+        """Make a request to scanner API
+        
+        With allow_empty, list endpoints answering "No transactions found"
+        return an empty result instead of raising. With cache_ttl, successful
+        responses are cached for that many seconds. Every call that reaches
+        the network first waits for a slot from the service's scheduler,
+        under the priority class of the calling context. Both the wait and
+        the HTTP timeout are cut short by the calling context's deadline.
+        
+        While the scanner is unreachable, out of quota or offline, calls fail
+        fast through the circuit breaker, and calls made for a tool are
+        answered with the last good response instead, noted as stale. Pass
+        remember=False for pages of a paginated scan; neither they nor
+        bulk-priority calls are kept as last good responses.
+        """
+        cache_key = tuple(sorted(params.items()))
+        if cache_ttl:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        request_params = dict(params, apikey=self.api_key)
         
         try:
-            response = requests.get(self.base_url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+            self.circuit.check()
+            self.quota.check(current_priority())
+            check_deadline()
+            self.scheduler.acquire(timeout=remaining())
+            self.quota.record()
+            left = remaining()
+            timeout = min(REQUEST_TIMEOUT, left) if left is not None else REQUEST_TIMEOUT
+            if timeout <= 0:
+                raise DeadlineExceeded("Deadline exceeded")
+            shortened = timeout < REQUEST_TIMEOUT
+            try:
+                response = self.session.get(self.base_url, params=request_params,
+                                            timeout=(min(CONNECT_TIMEOUT, timeout), timeout))
+                response.raise_for_status()
+                data = decode_json(response.content)
+            except ValueError as e:
+                self.circuit.record_failure("invalid JSON")
+                raise UpstreamUnavailable(f"{self.chain_name} returned invalid JSON: {str(e)}")
+            except requests.RequestException as e:
+                left = remaining()
+                if (left is not None and left <= 0) or (shortened and isinstance(e, requests.Timeout)):
+                    # The caller's deadline cut the request short, which says nothing about the scanner
+                    raise DeadlineExceeded(f"{self.chain_name} request cut short by the deadline: {str(e)}")
+                self.circuit.record_failure(type(e).__name__)
+                raise UpstreamUnavailable(f"{self.chain_name} request failed: {str(e)}")
+            self.circuit.record_success()
             
-            if data.get('status') != '1':
-                raise Exception(f"{self.chain_name} API error: {data.get('message', 'Request failed')}")
+            if 'jsonrpc' in data:
+                # Proxy (JSON-RPC) responses carry no status field
+                if data.get('error'):
+                    error = data['error']
+                    raise Exception(f"{self.chain_name} API error: {error.get('message', error) if isinstance(error, dict) else error}")
+            elif data.get('status') != '1':
+                if 'daily' in f"{data.get('message', '')} {data.get('result', '')}".lower():
+                    self.quota.mark_exhausted()
+                    self.circuit.trip(self.quota.status()['resets_in_seconds'], "daily quota exhausted")
+                    raise UpstreamUnavailable(f"{self.chain_name} daily API quota exhausted")
+                if not (allow_empty and data.get('result') == []):
+                    raise Exception(f"{self.chain_name} API error: {data.get('message', 'Request failed')}")
             
+            if cache_ttl:
+                self.response_cache.set(cache_key, data, ttl=cache_ttl)
+            if remember and current_priority() != BULK:
+                self.last_known.set(cache_key, {'data': data, 'fetched_at': time.time()})
             return data
-        except requests.RequestException as e:
-            raise Exception(f"{self.chain_name} request failed: {str(e)}")
+        except UpstreamUnavailable as e:
+            if stale_allowed():
+                entry = self.last_known.get(cache_key)
+                if entry is not None:
+                    note_stale(time.time() - entry['fetched_at'], str(e))
+                    return entry['data']
+            raise
+        except TimeoutError as e:
+            raise DeadlineExceeded(f"{self.chain_name} request not sent before the deadline: {str(e)}")
+    
+    def finalized_boundary(self) -> int:
+        """Highest block whose history is cached permanently, or -1 if the head is unknown"""
+        head, fetched_at = self._finality_head
+        if time.monotonic() - fetched_at > FINALITY_HEAD_TTL:
+            try:
+                head = self.get_latest_block()
+            except Exception:
+                # Without a head nothing is pinned; the flat TTL cache still applies
+                pass
+            self._finality_head = (head, time.monotonic())
+        if head < 0:
+            return -1
+        return (head - self.finality_depth) // FINALITY_ALIGN * FINALITY_ALIGN
+    
+    def _recent_page(self, params: Dict[str, Any], limit: int, start_block: int, end_block: int,
+                     cache_ttl: Optional[float]) -> List[Dict[str, Any]]:
+        page_params = dict(params)
+        page_params.update({
+            'startblock': str(start_block),
+            'endblock': str(end_block),
+            'page': '1',
+            'offset': str(limit),
+            'sort': 'desc'
+        })
+        data = self._make_request(page_params, allow_empty=True, cache_ttl=cache_ttl)
+        return (data.get('result') or [])[:limit]
+    
+    def _fetch_recent(self, params: Dict[str, Any], limit: int, start_block: int = 0,
+                      cache_ttl: Optional[float] = HISTORY_CACHE_TTL) -> List[Dict[str, Any]]:
+        """Fetch the newest rows of a list endpoint
+        
+        When caching, only the blocks above the finalized boundary are
+        fetched with the short-lived cache. If they hold fewer than limit
+        rows, the rest come from a page over the finalized blocks, which is
+        cached permanently.
+        """
+        boundary = self.finalized_boundary() if cache_ttl else -1
+        if boundary < start_block:
+            return self._recent_page(params, limit, start_block, LATEST_BLOCK, cache_ttl)
+        
+        rows = self._recent_page(params, limit, boundary + 1, LATEST_BLOCK, cache_ttl)
+        if len(rows) < limit:
+            cache_key = ('recent', tuple(sorted(params.items())), start_block, boundary, limit)
+            older = self.finalized_cache.get(cache_key)
+            if older is None:
+                older = self._recent_page(params, limit, start_block, boundary, None)
+                self.finalized_cache.set(cache_key, older)
+            rows = rows + older[:limit - len(rows)]
+        return rows
+    
+    def _iter_paginated(self, params: Dict[str, Any], start_block: int = 0,
+                        end_block: Optional[int] = None,
+                        page_size: int = HISTORY_PAGE_SIZE,
+                        range_params: Tuple[str, str] = ('startblock', 'endblock'),
+                        refresh: bool = False) -> Iterator[Dict[str, Any]]:
+        """Stream every row of a list endpoint in ascending block order
+        
+        The scanner APIs cap page * offset at 10,000 rows, so rather than
+        paging by page number this advances a block cursor. When a page comes
+        back full, rows of its last (possibly truncated) block are held back
+        and the next page starts at that block. range_params names the block
+        range parameters, which differ between the account and logs modules.
+        
+        Pages up to the finalized boundary are cached permanently, so only
+        the tail above it is fetched again on later calls. With refresh,
+        short-lived cached pages of the tail are dropped and fetched again.
+        """
+        cursor = start_block
+        last = LATEST_BLOCK if end_block is None else end_block
+        pinned_through = min(last, self.finalized_boundary())
+        
+        while cursor <= last:
+            if cursor <= pinned_through:
+                rows, cursor = self._read_finalized_page(params, cursor, pinned_through, page_size, range_params)
+            else:
+                rows, cursor = self._read_page(params, cursor, last, page_size, range_params, HISTORY_CACHE_TTL,
+                                               refresh=refresh)
+            yield from rows
+    
+    def _read_page(self, params: Dict[str, Any], cursor: int, last: int, page_size: int,
+                   range_params: Tuple[str, str], cache_ttl: Optional[float],
+                   refresh: bool = False) -> Tuple[List[Dict[str, Any]], int]:
+        """Fetch one ascending page; return its complete rows and the block to continue from"""
+        page_params = dict(params)
+        page_params.update({
+            range_params[0]: str(cursor),
+            range_params[1]: str(last),
+            'page': '1',
+            'offset': str(page_size),
+            'sort': 'asc'
+        })
+        if refresh:
+            self.response_cache.delete(tuple(sorted(page_params.items())))
+        
+        data = self._make_request(page_params, allow_empty=True, cache_ttl=cache_ttl, remember=False)
+        rows = data.get('result') or []
+        if len(rows) < page_size:
+            return rows, last + 1
+        
+        last_block = _block_of(rows[-1])
+        complete = [row for row in rows if _block_of(row) < last_block]
+        if not complete:
+            # A single block holds more rows than fit in a page; take what we got
+            return rows, last_block + 1
+        return complete, last_block
+    
+    def _read_finalized_page(self, params: Dict[str, Any], cursor: int, last: int, page_size: int,
+                             range_params: Tuple[str, str]) -> Tuple[List[Dict[str, Any]], int]:
+        """Like _read_page over finalized blocks, cached by start block for good
+        
+        A cached page covers the blocks from cursor to its 'through' block,
+        however the range of the call that stored it was bounded.
+        """
+        cache_key = ('history', range_params[0], tuple(sorted(params.items())), cursor)
+        cached = self.finalized_cache.get(cache_key)
+        if cached is not None:
+            if cached['through'] <= last:
+                return cached['rows'], cached['through'] + 1
+            return [row for row in cached['rows'] if _block_of(row) <= last], last + 1
+        
+        rows, next_cursor = self._read_page(params, cursor, last, page_size, range_params, None)
+        self.finalized_cache.set(cache_key, {'rows': rows, 'through': next_cursor - 1})
+        return rows, next_cursor
     
     def _wei_to_native(self, wei_value: str) -> str:
         """Convert Wei to native token (18 decimals for all EVM chains)"""
@@ -40,24 +319,9 @@ class BaseScannerService(ABC):
         native = wei / Decimal('1000000000000000000')  # 10^18
         return str(native)
     
-    def _format_token_value(self, value: str, decimals: str) -> str:
-        """Format token value based on decimals"""
-        if not value or value == '0':
-            return '0'
-        
-        try:
-            decimals_int = int(decimals) if decimals else 18
-            value_decimal = Decimal(value)
-            formatted = value_decimal / (Decimal('10') ** decimals_int)
-            return str(formatted)
-        except (ValueError, TypeError):
-            return value
-    
     def _validate_address(self, address: str) -> str:
-        """Validate EVM address format"""
-        if not re.match(r'^0x[a-fA-F0-9]{40}$', address):
-            raise ValueError(f"Invalid {self.chain_name} address format")
-        return address.lower()
+        """Validate EVM address format and checksum"""
+        return normalize_address(address, self.chain_name)
     
     def get_address_balance(self, address: str) -> AddressBalance:
         """Get native token balance for an address"""
@@ -85,6 +349,218 @@ class BaseScannerService(ABC):
         except Exception as e:
             raise Exception(f"Failed to get {self.chain_name} balance: {str(e)}")
     
+    def get_latest_block(self) -> int:
+        """Current head block number, reused for a few seconds"""
+        data = self._make_request({'module': 'proxy', 'action': 'eth_blockNumber'}, cache_ttl=HEAD_CACHE_TTL)
+        return int(data['result'], 16)
+    
+    def get_block_hash(self, block_number: int) -> Optional[str]:
+        """Current canonical hash of a block, or None if it does not exist yet"""
+        params = {
+            'module': 'proxy',
+            'action': 'eth_getBlockByNumber',
+            'tag': hex(int(block_number)),
+            'boolean': 'false'
+        }
+        block = self._make_request(params).get('result')
+        return block['hash'].lower() if block else None
+    
+    def is_finalized(self, block_number: int) -> bool:
+        return block_number <= self.get_latest_block() - self.finality_depth
+    
+    def get_block_by_time(self, timestamp: int, closest: str = 'before') -> int:
+        """Block number closest to a unix timestamp; finalized answers are cached permanently"""
+        params = {
+            'module': 'block',
+            'action': 'getblocknobytime',
+            'timestamp': str(int(timestamp)),
+            'closest': closest
+        }
+        cache_key = tuple(sorted(params.items()))
+        cached = self.finalized_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        block_number = int(self._make_request(params)['result'])
+        if self.is_finalized(block_number):
+            self.finalized_cache.set(cache_key, block_number)
+        return block_number
+    
+    def get_balance_at_block(self, address: str, block_number: int) -> HistoricalBalance:
+        """Native balance of an address at the end of a past block"""
+        try:
+            valid_address = self._validate_address(address)
+            cache_key = ('eth_getBalance', valid_address, int(block_number))
+            balance_wei = self.finalized_cache.get(cache_key)
+            finalized = balance_wei is not None
+            
+            if balance_wei is None:
+                params = {
+                    'module': 'proxy',
+                    'action': 'eth_getBalance',
+                    'address': valid_address,
+                    'tag': hex(int(block_number))
+                }
+                balance_wei = str(int(self._make_request(params)['result'], 16))
+                finalized = self.is_finalized(block_number)
+                if finalized:
+                    self.finalized_cache.set(cache_key, balance_wei)
+            
+            return HistoricalBalance(
+                address=valid_address,
+                block_number=int(block_number),
+                balance_in_wei=int(balance_wei),
+                balance_in_eth=self._wei_to_native(balance_wei),
+                chain=self.chain_name,
+                native_token=self.native_token,
+                finalized=finalized
+            )
+        except Exception as e:
+            raise Exception(f"Failed to get {self.chain_name} balance at block {block_number}: {str(e)}")
+    
+    def get_balances_at(self, points: List[Tuple[str, int]]) -> List[Any]:
+        """Look up many (address, block) points concurrently
+        
+        Results come back in input order; a point that failed holds its
+        exception instead of a HistoricalBalance.
+        """
+        if not points:
+            return []
+        
+        def lookup(point: Tuple[str, int]) -> Any:
+            try:
+                return self.get_balance_at_block(*point)
+            except Exception as e:
+                return e
+        
+        # Each worker inherits the caller's deadline and priority class
+        with ThreadPoolExecutor(max_workers=min(HISTORY_BATCH_WORKERS, len(points))) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, lookup, point) for point in points]
+            return [future.result() for future in futures]
+    
+    def _to_transaction(self, tx: Dict[str, Any]) -> Transaction:
+        """Convert a raw txlist row, naming the called method when its selector is known"""
+        call_data = tx.get('input') or ''
+        method_id = call_data[:10] if len(call_data) >= 10 else None
+        return Transaction(
+            hash=tx.get('hash', ''),
+            from_address=tx.get('from', ''),
+            to_address=tx.get('to', '') or 'Contract Creation',
+            value=self._wei_to_native(tx.get('value', '0')),
+            timestamp=int(tx.get('timeStamp', '0')),
+            block_number=int(tx.get('blockNumber', '0')),
+            chain=self.chain_name,
+            native_token=self.native_token,
+            method_id=method_id,
+            method_name=self.selector_index.lookup(method_id)
+        )
+    
+    def _to_token_transfer(self, tx: Dict[str, Any]) -> TokenTransfer:
+        """Convert a raw tokentx row"""
+        # Share one metadata entry per contract instead of copying strings per row
+        token = self.token_registry.observe(
+            tx.get('contractAddress', ''),
+            tx.get('tokenName', ''),
+            tx.get('tokenSymbol', ''),
+            tx.get('tokenDecimal', '18')
+        )
+        
+        return TokenTransfer(
+            token=token.address,
+            token_name=token.name,
+            token_symbol=token.symbol,
+            token_decimals=token.decimals,
+            from_address=tx.get('from', ''),
+            to_address=tx.get('to', ''),
+            value=token.format_value(tx.get('value', '0')),
+            timestamp=int(tx.get('timeStamp', '0')),
+            block_number=int(tx.get('blockNumber', '0')),
+            chain=self.chain_name,
+            token_standard=self.get_token_standard()
+        )
+    
+    def _to_internal_transaction(self, tx: Dict[str, Any]) -> InternalTransaction:
+        """Convert a raw txlistinternal row"""
+        return InternalTransaction(
+            hash=tx.get('hash', ''),
+            from_address=tx.get('from', ''),
+            to_address=tx.get('to', '') or tx.get('contractAddress', '') or 'Contract Creation',
+            value=self._wei_to_native(tx.get('value', '0')),
+            timestamp=int(tx.get('timeStamp', '0')),
+            block_number=int(tx.get('blockNumber', '0')),
+            call_type=tx.get('type', 'call') or 'call',
+            is_error=tx.get('isError', '0') == '1',
+            chain=self.chain_name,
+            native_token=self.native_token
+        )
+    
+    def _to_nft_transfer(self, tx: Dict[str, Any], standard: str) -> NFTTransfer:
+        """Convert a raw tokennfttx or token1155tx row"""
+        return NFTTransfer(
+            token=tx.get('contractAddress', '').lower(),
+            token_name=tx.get('tokenName', ''),
+            token_symbol=tx.get('tokenSymbol', ''),
+            token_id=tx.get('tokenID', ''),
+            quantity=tx.get('tokenValue', '1') or '1',
+            from_address=tx.get('from', ''),
+            to_address=tx.get('to', ''),
+            timestamp=int(tx.get('timeStamp', '0')),
+            block_number=int(tx.get('blockNumber', '0')),
+            chain=self.chain_name,
+            token_standard=self.get_nft_standard(standard)
+        )
+    
+    def _nft_action(self, standard: str) -> str:
+        """Map an NFT standard to its scanner API action"""
+        if standard.upper().endswith('1155'):
+            return 'token1155tx'
+        if standard.upper().endswith('721'):
+            return 'tokennfttx'
+        raise ValueError(f"Unsupported NFT standard '{standard}'. Use ERC721 or ERC1155")
+    
+    def get_nft_standard(self, standard: str) -> str:
+        """Return this chain's name for an NFT standard (ERC721, BEP1155, ...)"""
+        prefix = self.get_token_standard()[:-2]
+        return f"{prefix}1155" if standard.upper().endswith('1155') else f"{prefix}721"
+    
+    def get_balances(self, addresses: List[str]) -> Dict[str, int]:
+        """Get native balances in wei for many addresses, batched through balancemulti"""
+        try:
+            valid_addresses = normalize_addresses(addresses, self.chain_name)
+            balances: Dict[str, int] = {}
+            
+            for i in range(0, len(valid_addresses), BALANCEMULTI_BATCH):
+                params = {
+                    'module': 'account',
+                    'action': 'balancemulti',
+                    'address': ','.join(valid_addresses[i:i + BALANCEMULTI_BATCH]),
+                    'tag': 'latest'
+                }
+                
+                data = self._make_request(params)
+                for entry in data.get('result', []):
+                    balances[entry.get('account', '').lower()] = int(entry.get('balance') or 0)
+            
+            return balances
+        except Exception as e:
+            raise Exception(f"Failed to get {self.chain_name} balances: {str(e)}")
+    
+    def get_new_transactions(self, address: str, after_block: int, limit: int = 100) -> List[Transaction]:
+        """Get the newest transactions strictly after a block, bypassing the cache"""
+        try:
+            valid_address = self._validate_address(address)
+            
+            params = {
+                'module': 'account',
+                'action': 'txlist',
+                'address': valid_address
+            }
+            
+            rows = self._fetch_recent(params, limit, start_block=after_block + 1, cache_ttl=None)
+            return [self._to_transaction(tx) for tx in rows]
+        except Exception as e:
+            raise Exception(f"Failed to get {self.chain_name} new transactions: {str(e)}")
+    
     def get_transaction_history(self, address: str, limit: int = 10) -> List[Transaction]:
         """Get transaction history for an address"""
         try:
@@ -93,75 +569,144 @@ class BaseScannerService(ABC):
             params = {
                 'module': 'account',
                 'action': 'txlist',
-                'address': valid_address,
-                'startblock': '0',
-                'endblock': '99999999',
-                'page': '1',
-                'offset': str(limit),
-                'sort': 'desc'
+                'address': valid_address
             }
             
-            data = self._make_request(params)
-            transactions = []
-            
-            for tx in data.get('result', [])[:limit]:
-                value_native = self._wei_to_native(tx.get('value', '0'))
-                
-                transactions.append(Transaction(
-                    hash=tx.get('hash', ''),
-                    from_address=tx.get('from', ''),
-                    to_address=tx.get('to', '') or 'Contract Creation',
-                    value=value_native,
-                    timestamp=int(tx.get('timeStamp', '0')),
-                    block_number=int(tx.get('blockNumber', '0')),
-                    chain=self.chain_name,
-                    native_token=self.native_token
-                ))
-            
-            return transactions
+            return [self._to_transaction(tx) for tx in self._fetch_recent(params, limit)]
         except Exception as e:
             raise Exception(f"Failed to get {self.chain_name} transaction history: {str(e)}")
     
-    def get_token_transfers(self, address: str, limit: int = 10) -> List[TokenTransfer]:
-        """Get token transfers for an address"""
+    def get_token_transfers(self, address: str, limit: int = 10,
+                            contract_address: Optional[str] = None) -> List[TokenTransfer]:
+        """Get token transfers for an address, optionally of one token contract only"""
         try:
             valid_address = self._validate_address(address)
             
             params = {
                 'module': 'account',
                 'action': 'tokentx',
-                'address': valid_address,
-                'page': '1',
-                'offset': str(limit),
-                'sort': 'desc'
+                'address': valid_address
             }
+            if contract_address:
+                params['contractaddress'] = self._validate_address(contract_address)
             
-            data = self._make_request(params)
-            transfers = []
-            
-            for tx in data.get('result', [])[:limit]:
-                value_formatted = self._format_token_value(
-                    tx.get('value', '0'), 
-                    tx.get('tokenDecimal', '18')
-                )
-                
-                transfers.append(TokenTransfer(
-                    token=tx.get('contractAddress', ''),
-                    token_name=tx.get('tokenName', ''),
-                    token_symbol=tx.get('tokenSymbol', ''),
-                    from_address=tx.get('from', ''),
-                    to_address=tx.get('to', ''),
-                    value=value_formatted,
-                    timestamp=int(tx.get('timeStamp', '0')),
-                    block_number=int(tx.get('blockNumber', '0')),
-                    chain=self.chain_name,
-                    token_standard=self.get_token_standard()
-                ))
-            
+            transfers = [self._to_token_transfer(tx) for tx in self._fetch_recent(params, limit)]
+            self.token_registry.save()
             return transfers
         except Exception as e:
             raise Exception(f"Failed to get {self.chain_name} token transfers: {str(e)}")
     
+    def get_internal_transactions(self, address: str, limit: int = 10) -> List[InternalTransaction]:
+        """Get internal (contract-initiated) transactions for an address"""
+        try:
+            valid_address = self._validate_address(address)
+            
+            params = {
+                'module': 'account',
+                'action': 'txlistinternal',
+                'address': valid_address
+            }
+            
+            return [self._to_internal_transaction(tx) for tx in self._fetch_recent(params, limit)]
+        except Exception as e:
+            raise Exception(f"Failed to get {self.chain_name} internal transactions: {str(e)}")
+    
+    def get_new_internal_transactions(self, address: str, after_block: int,
+                                      limit: int = 100) -> List[InternalTransaction]:
+        """Get the newest internal transactions strictly after a block, bypassing the cache"""
+        try:
+            valid_address = self._validate_address(address)
+            
+            params = {
+                'module': 'account',
+                'action': 'txlistinternal',
+                'address': valid_address
+            }
+            
+            rows = self._fetch_recent(params, limit, start_block=after_block + 1, cache_ttl=None)
+            return [self._to_internal_transaction(tx) for tx in rows]
+        except Exception as e:
+            raise Exception(f"Failed to get {self.chain_name} new internal transactions: {str(e)}")
+    
+    def get_nft_transfers(self, address: str, limit: int = 10, standard: str = "ERC721") -> List[NFTTransfer]:
+        """Get ERC721 or ERC1155 transfers for an address"""
+        try:
+            valid_address = self._validate_address(address)
+            
+            params = {
+                'module': 'account',
+                'action': self._nft_action(standard),
+                'address': valid_address
+            }
+            
+            return [self._to_nft_transfer(tx, standard) for tx in self._fetch_recent(params, limit)]
+        except Exception as e:
+            raise Exception(f"Failed to get {self.chain_name} NFT transfers: {str(e)}")
+    
+    def iter_transactions(self, address: str, start_block: int = 0,
+                          end_block: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Stream raw transaction rows for an address, oldest first"""
+        valid_address = self._validate_address(address)
+        params = {
+            'module': 'account',
+            'action': 'txlist',
+            'address': valid_address
+        }
+        return self._iter_paginated(params, start_block, end_block)
+    
+    def iter_internal_transactions(self, address: str, start_block: int = 0,
+                                   end_block: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Stream raw internal transaction rows for an address, oldest first"""
+        valid_address = self._validate_address(address)
+        params = {
+            'module': 'account',
+            'action': 'txlistinternal',
+            'address': valid_address
+        }
+        return self._iter_paginated(params, start_block, end_block)
+    
+    def iter_nft_transfers(self, address: str, standard: str = "ERC721", start_block: int = 0,
+                           end_block: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Stream raw ERC721 or ERC1155 transfer rows for an address, oldest first"""
+        valid_address = self._validate_address(address)
+        params = {
+            'module': 'account',
+            'action': self._nft_action(standard),
+            'address': valid_address
+        }
+        return self._iter_paginated(params, start_block, end_block)
+    
+    def iter_token_transfers(self, address: str, start_block: int = 0,
+                             end_block: Optional[int] = None,
+                             refresh: bool = False) -> Iterator[Dict[str, Any]]:
+        """Stream raw token transfer rows for an address, oldest first; refresh skips cached tail pages"""
+        valid_address = self._validate_address(address)
+        params = {
+            'module': 'account',
+            'action': 'tokentx',
+            'address': valid_address
+        }
+        return self._iter_paginated(params, start_block, end_block, refresh=refresh)
+    
+    def get_token_balance(self, address: str, contract_address: str) -> int:
+        """Get the raw (unscaled) balance of one token held by an address"""
+        try:
+            valid_address = self._validate_address(address)
+            valid_contract = self._validate_address(contract_address)
+            
+            params = {
+                'module': 'account',
+                'action': 'tokenbalance',
+                'contractaddress': valid_contract,
+                'address': valid_address,
+                'tag': 'latest'
+            }
+            
+            data = self._make_request(params)
+            return int(data['result'] or 0)
+        except Exception as e:
+            raise Exception(f"Failed to get {self.chain_name} token balance: {str(e)}")
+    
     def get_contract_abi(self, address: str) -> str:
         """Get contract ABI"""
         try:
@@ -173,11 +718,100 @@ class BaseScannerService(ABC):
                 'address': valid_address
             }
             
-            data = self._make_request(params)
-            return data['result']
+            data = self._make_request(params, cache_ttl=ABI_CACHE_TTL)
+            abi = data['result']
+            self._index_abi(valid_address, abi)
+            return abi
         except Exception as e:
             raise Exception(f"Failed to get {self.chain_name} contract ABI: {str(e)}")
     
+    def _index_abi(self, address: str, abi: str):
+        """Build the event topic and function selector indexes for a fetched ABI"""
+        if self.event_decoder.has_contract(address):
+            return
+        try:
+            self.event_decoder.register_abi(address, abi)
+            self.selector_index.register_abi(abi)
+        except Exception:
+            self.event_decoder.mark_unavailable(address)
+    
+    def _ensure_event_index(self, address: str):
+        """Make sure a contract's events can be decoded, fetching its ABI once"""
+        if self.event_decoder.has_contract(address):
+            return
+        try:
+            self.get_contract_abi(address)
+        except Exception:
+            # Unverified contracts still decode through the global event index
+            self.event_decoder.mark_unavailable(address)
+    
+    def iter_logs(self, address: Optional[str] = None, topics: Optional[List[Optional[str]]] = None,
+                  from_block: int = 0, to_block: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Stream raw event logs matching an address and/or topics, oldest first"""
+        params: Dict[str, Any] = {
+            'module': 'logs',
+            'action': 'getLogs'
+        }
+        if address:
+            params['address'] = self._validate_address(address)
+        
+        given = [(i, topic.lower()) for i, topic in enumerate(topics or []) if topic]
+        for i, topic in given:
+            params[f'topic{i}'] = topic
+        for (i, _), (j, _) in itertools.combinations(given, 2):
+            params[f'topic{i}_{j}_opr'] = 'and'
+        
+        return self._iter_paginated(params, from_block, to_block, range_params=('fromBlock', 'toBlock'))
+    
+    def _to_event_log(self, log: Dict[str, Any], decoded: Optional[Tuple[EventSpec, Dict[str, Any]]]) -> EventLog:
+        """Convert a raw getLogs row and its decoding, if any"""
+        timestamp = log.get('timeStamp') or '0'
+        log_index = log.get('logIndex') or '0'
+        return EventLog(
+            address=log.get('address', ''),
+            block_number=_block_of(log),
+            timestamp=int(timestamp, 16) if timestamp.startswith('0x') else int(timestamp),
+            transaction_hash=log.get('transactionHash', ''),
+            log_index=int(log_index, 16) if log_index.startswith('0x') else int(log_index),
+            topics=log.get('topics') or [],
+            data=log.get('data', '0x'),
+            event=decoded[0].name if decoded else None,
+            signature=decoded[0].signature if decoded else None,
+            args=decoded[1] if decoded else None,
+            chain=self.chain_name
+        )
+    
+    def iter_event_logs(self, address: Optional[str] = None, topics: Optional[List[Optional[str]]] = None,
+                        from_block: int = 0, to_block: Optional[int] = None,
+                        decode: bool = True, batch_size: int = HISTORY_PAGE_SIZE) -> Iterator[EventLog]:
+        """Stream event logs, decoding them in batches through the topic index"""
+        if decode and address:
+            self._ensure_event_index(address)
+        
+        logs = self.iter_logs(address, topics, from_block, to_block)
+        if not decode:
+            for log in logs:
+                yield self._to_event_log(log, None)
+            return
+        
+        while True:
+            batch = list(itertools.islice(logs, batch_size))
+            if not batch:
+                return
+            for log, decoded in zip(batch, self.event_decoder.decode_many(batch)):
+                yield self._to_event_log(log, decoded)
+    
+    def get_event_logs(self, address: Optional[str] = None, topics: Optional[List[Optional[str]]] = None,
+                       from_block: int = 0, to_block: Optional[int] = None,
+                       limit: int = 100, decode: bool = True) -> List[EventLog]:
+        """Get up to limit event logs; only the pages needed are fetched"""
+        try:
+            logs = self.iter_event_logs(address, topics, from_block, to_block, decode,
+                                        batch_size=max(1, min(limit, HISTORY_PAGE_SIZE)))
+            return list(itertools.islice(logs, limit))
+        except Exception as e:
+            raise Exception(f"Failed to get {self.chain_name} event logs: {str(e)}")
+    
     def get_gas_oracle(self) -> GasPrice:
         """Get current gas prices"""
         try:
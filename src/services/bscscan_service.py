@@ -4,12 +4,16 @@ from services.base_scanner import BaseScannerService
 class BscscanService(BaseScannerService):
     """BSC scanner service using BSCScan API"""
     
-    def __init__(self, api_key: str):
+    # Fast finality makes BSC blocks final well within this depth
+    finality_depth = 15
+    
+    def __init__(self, api_key: str, base_url: str = "https://api.bscscan.com/api", **options):
         super().__init__(
             api_key=api_key,
-            base_url="https://api.bscscan.com/api",
+            base_url=base_url,
             chain_name="BSC",
-            native_token="BNB"
+            native_token="BNB",
+            **options
         )
     
     def get_token_standard(self) -> str:
@@ -0,0 +1,181 @@
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Dict, Hashable, Optional
+
+_MISSING = object()
+
+# Items of a large container measured when estimating its size; the rest are extrapolated
+SIZE_SAMPLE = 32
+
+# Least recently used entries considered when evicting for space
+EVICTION_SAMPLE = 8
+
+# Default byte budget of each kind of cache, overridable with CACHE_BUDGETS. The
+# response, finalized, last_known and abi caches exist once per chain, the rest once
+DEFAULT_BYTE_BUDGETS: Dict[str, int] = {
+    'response': 8 * 1024 * 1024,
+    'finalized': 16 * 1024 * 1024,
+    'last_known': 8 * 1024 * 1024,
+    'abi': 4 * 1024 * 1024,
+    'swr': 4 * 1024 * 1024,
+    'graph': 8 * 1024 * 1024,
+    'portfolio': 16 * 1024 * 1024
+}
+
+_UNITS = {'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+_ATOMS = (str, bytes, int, float, bool, type(None), Decimal)
+
+
+def parse_size(value: str) -> int:
+    """Bytes from a size such as 65536, 512K, 64M or 1G"""
+    value = value.strip().lower().rstrip('b')
+    if value and value[-1] in _UNITS:
+        return int(float(value[:-1]) * _UNITS[value[-1]])
+    return int(value)
+
+
+def byte_budget(name: str) -> Optional[int]:
+    """Budget for a kind of cache from CACHE_BUDGETS (for example response=16M,finalized=0); 0 means unlimited"""
+    budgets = dict(DEFAULT_BYTE_BUDGETS)
+    for part in (os.getenv('CACHE_BUDGETS') or '').split(','):
+        key, _, value = part.partition('=')
+        if value.strip():
+            budgets[key.strip()] = parse_size(value)
+    budget = budgets.get(name)
+    return budget or None
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Approximate bytes held by a value and everything it references
+    
+    Large containers are sized from a sample of their items, which keeps
+    the estimate cheap next to fetching the value in the first place.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, _ATOMS) or _depth > 6:
+        return size
+    
+    if isinstance(value, dict):
+        items = list(itertools.islice(value.items(), SIZE_SAMPLE))
+        measured = sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in items)
+        return size + measured * len(value) // max(1, len(items))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = list(itertools.islice(value, SIZE_SAMPLE))
+        measured = sum(estimate_size(item, _depth + 1) for item in items)
+        return size + measured * len(value) // max(1, len(items))
+    if hasattr(value, '__dict__'):
+        return size + estimate_size(vars(value), _depth + 1)
+    slots = getattr(type(value), '__slots__', ())
+    return size + sum(estimate_size(getattr(value, slot, None), _depth + 1) for slot in slots)
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a per-entry TTL
+    
+    A TTL of None keeps the entry until it is evicted for space. With
+    max_bytes, entry sizes are estimated on insert and the cache keeps
+    under that budget: it drops expired entries first, then the largest
+    of the least recently used ones, so one big page goes before many
+    small recent answers. Values bigger than the whole budget are not
+    cached.
+    """
+    
+    def __init__(self, max_entries: int = 1024, default_ttl: Optional[float] = 60.0,
+                 max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live entry, or default if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            
+            value, expires_at, size = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.misses += 1
+                return default
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Any = _MISSING, size: Optional[int] = None):
+        """Store a value; ttl defaults to the cache's default_ttl, size to an estimate of key and value"""
+        if ttl is _MISSING:
+            ttl = self.default_ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        if size is None:
+            size = estimate_size(key) + estimate_size(value)
+        
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            if self.max_bytes is not None and size > self.max_bytes:
+                self.rejected += 1
+                return
+            
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+            while self.max_bytes is not None and self._bytes > self.max_bytes:
+                self._evict_for_space(key)
+    
+    def _evict_for_space(self, keep: Hashable):
+        """Drop one entry other than keep; caller must hold self._lock"""
+        now = time.monotonic()
+        candidates = [(k, entry) for k, entry in itertools.islice(self._entries.items(), EVICTION_SAMPLE + 1)
+                      if k != keep][:EVICTION_SAMPLE]
+        expired = [k for k, (_, expires_at, _) in candidates if expires_at is not None and expires_at <= now]
+        victim = expired[0] if expired else max(candidates, key=lambda item: item[1][2])[0]
+        self._bytes -= self._entries.pop(victim)[2]
+        self.evictions += 1
+    
+    def delete(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count, estimated bytes and hit/miss/eviction counters"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'rejected': self.rejected
+            }
@@ -1,9 +1,44 @@
+import contextvars
 import os
-from typing import Dict, List, Optional, Any, Type
-from services.base_scanner import BaseScannerService
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Any, Type, Tuple
+from services.base_scanner import BaseScannerService, DEFAULT_RATE_LIMIT
 from services.etherscan_service import EtherscanService
 from services.bscscan_service import BscscanService
-from models import AddressBalance, Transaction, TokenTransfer, GasPrice
+from services.portfolio import PortfolioEngine
+from services.gas_oracle import GasOraclePoller, poller_settings
+from services.watchlist import Watchlist
+from services.swr import StaleWhileRevalidate
+from services.deadline import DeadlineExceeded, remaining
+from services.degraded import UpstreamUnavailable, note_stale
+from services.exporter import export_histories, resolve_output_dir
+from services.cache import TTLCache, byte_budget
+from services.graph import CounterpartyGraph, adjacency_cache
+from models import AddressBalance, Transaction, TokenTransfer, InternalTransaction, NFTTransfer, EventLog, GasPrice, WatchlistChange
+
+# Counterparty indexes kept at once; the least recently queried chain and token is dropped first
+GRAPH_INDEXES = 16
+
+# Portfolio engines kept with their fold state; an evicted one is folded again from the cached history
+PORTFOLIO_ENGINES = 500
+
+
+def _positive_setting(env_var: str, cast: Callable[[str], Any], default: Any = None) -> Any:
+    """Read a positive number from the environment, naming the variable if it is malformed"""
+    value = os.getenv(env_var)
+    if not value:
+        return default
+    try:
+        number = cast(value)
+    except ValueError:
+        number = None
+    if number is None or number <= 0:
+        raise ValueError(f"{env_var} must be a positive number, got '{value}'")
+    return number
 
 
 class ChainManager:
@@ -25,6 +60,9 @@ class ChainManager:
             'ethereum': {
                 'service_class': EtherscanService,
                 'env_var': 'ETHERSCAN_API_KEY',
+                'rate_limit_env_var': 'ETHERSCAN_RATE_LIMIT',
+                'api_url_env_var': 'ETHERSCAN_API_URL',
+                'quota_env_var': 'ETHERSCAN_DAILY_QUOTA',
                 'native_token': 'ETH',
                 'token_standard': 'ERC20',
                 'explorer_url': 'https://etherscan.io'
@@ -32,6 +70,9 @@ class ChainManager:
             'bsc': {
                 'service_class': BscscanService,
                 'env_var': 'BSCSCAN_API_KEY',
+                'rate_limit_env_var': 'BSCSCAN_RATE_LIMIT',
+                'api_url_env_var': 'BSCSCAN_API_URL',
+                'quota_env_var': 'BSCSCAN_DAILY_QUOTA',
                 'native_token': 'BNB',
                 'token_standard': 'BEP20',
                 'explorer_url': 'https://bscscan.com'
@@ -41,6 +82,27 @@ class ChainManager:
         # Initialize services for available chains
         self.services: Dict[str, BaseScannerService] = {}
         self._initialize_services(api_keys)
+        
+        # Portfolio engines keep their fold state between calls: (chain, address) -> engine
+        self._portfolios = TTLCache(max_entries=PORTFOLIO_ENGINES, default_ttl=None, max_bytes=byte_budget('portfolio'))
+        self._portfolios_lock = threading.Lock()
+        
+        # Counterparty indexes, one per chain and asset, least recently used first: (chain, token or '') -> graph
+        self._graphs: "OrderedDict[Tuple[str, str], CounterpartyGraph]" = OrderedDict()
+        self._graphs_lock = threading.Lock()
+        
+        # Gas oracle pollers are started on first use of each chain
+        self._gas_pollers: Dict[str, GasOraclePoller] = {}
+        self._gas_lock = threading.Lock()
+        
+        # Watched addresses; polling starts the first time the watchlist is used
+        self.watchlist = Watchlist(self.services)
+        
+        # Recent balance and activity reads, served stale-while-revalidate
+        self.swr = StaleWhileRevalidate()
+        
+        # Workers for multi-chain operations
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='chain-worker')
     
     def _initialize_services(self, api_keys: Dict[str, str]):
         """Initialize scanner services for chains with API keys"""
@@ -50,7 +112,15 @@ class ChainManager:
             
             if api_key:
                 service_class = chain_config['service_class']
-                self.services[chain_name] = service_class(api_key)
+                rate_limit = _positive_setting(chain_config['rate_limit_env_var'], float, DEFAULT_RATE_LIMIT)
+                options: Dict[str, Any] = {'requests_per_second': rate_limit}
+                daily_quota = _positive_setting(chain_config['quota_env_var'], int)
+                if daily_quota:
+                    options['daily_quota'] = daily_quota
+                # A different endpoint, e.g. a stand-in API for load tests
+                if os.getenv(chain_config['api_url_env_var']):
+                    options['base_url'] = os.getenv(chain_config['api_url_env_var'])
+                self.services[chain_name] = service_class(api_key, **options)
     
     def get_available_chains(self) -> List[str]:
         """Get list of available chains"""
@@ -77,6 +147,16 @@ class ChainManager:
         service = self._get_service(chain)
         return service.get_address_balance(address)
     
+    def check_balance_cached(self, address: str, chain: str = "ethereum",
+                             endpoint: str = "check_balance") -> Tuple[AddressBalance, float]:
+        """Check balance stale-while-revalidate, returning the balance and its age in seconds"""
+        self._get_service(chain)
+        return self.swr.get(
+            endpoint,
+            ('balance', chain.lower(), address.lower()),
+            lambda: self.check_balance(address, chain)
+        )
+    
     def get_transactions(self, address: str, chain: str = "ethereum", limit: int = 10) -> List[Transaction]:
         """Get transactions for an address on a specific chain"""
         service = self._get_service(chain)
@@ -87,47 +167,324 @@ class ChainManager:
         service = self._get_service(chain)
         return service.get_token_transfers(address, limit)
     
+    def get_internal_transactions(self, address: str, chain: str = "ethereum", limit: int = 10) -> List[InternalTransaction]:
+        """Get internal transactions for an address on a specific chain"""
+        service = self._get_service(chain)
+        return service.get_internal_transactions(address, limit)
+    
+    def get_nft_transfers(self, address: str, chain: str = "ethereum", limit: int = 10, standard: str = "ERC721") -> List[NFTTransfer]:
+        """Get ERC721/ERC1155 transfers for an address on a specific chain"""
+        service = self._get_service(chain)
+        return service.get_nft_transfers(address, limit, standard)
+    
     def get_contract_abi(self, address: str, chain: str = "ethereum") -> str:
         """Get contract ABI on a specific chain"""
         service = self._get_service(chain)
         return service.get_contract_abi(address)
     
+    def get_event_logs(self, address: str, chain: str = "ethereum", topics: Optional[List[Optional[str]]] = None,
+                       from_block: int = 0, to_block: Optional[int] = None,
+                       limit: int = 20, decode: bool = True) -> List[EventLog]:
+        """Get decoded event logs emitted by a contract on a specific chain"""
+        service = self._get_service(chain)
+        return service.get_event_logs(address, topics, from_block, to_block, limit, decode)
+    
+    def _get_gas_poller(self, chain: str) -> Optional[GasOraclePoller]:
+        """Get (and start) the gas poller for a chain, or None if polling is disabled"""
+        service = self._get_service(chain)
+        settings = poller_settings()
+        if settings['interval'] <= 0:
+            return None
+        
+        with self._gas_lock:
+            poller = self._gas_pollers.get(chain.lower())
+            if poller is None:
+                poller = GasOraclePoller(service, settings['interval'], int(settings['history_size']))
+                self._gas_pollers[chain.lower()] = poller
+        poller.start()
+        return poller
+    
     def get_gas_prices(self, chain: str = "ethereum") -> GasPrice:
-        """Get gas prices for a specific chain"""
+        """Get gas prices for a specific chain, served from the background poller"""
+        poller = self._get_gas_poller(chain)
+        if poller is None:
+            return self._get_service(chain).get_gas_oracle()
+        
+        latest = poller.latest()
+        if latest is None:
+            return poller.poll()
+        age = poller.age()
+        if poller.last_error and age > 2 * poller.interval:
+            note_stale(age, poller.last_error)
+        return latest
+    
+    def get_gas_statistics(self, chain: str = "ethereum", window_minutes: float = 15) -> Dict[str, Any]:
+        """Percentiles and trend of gas prices over a recent window"""
+        poller = self._get_gas_poller(chain)
+        if poller is None:
+            return {'samples': 0, 'percentiles': {}, 'trend': {}}
+        
+        window_seconds = window_minutes * 60 if window_minutes else None
+        samples = poller.samples(window_seconds)
+        return {
+            'samples': len(samples),
+            'window_minutes': window_minutes,
+            'oldest_sample': samples[0].timestamp if samples else None,
+            'percentiles': poller.percentiles(window_seconds),
+            'trend': poller.trend(window_seconds),
+            'last_error': poller.last_error
+        }
+    
+    def get_historical_balances(self, addresses: List[str], chain: str = "ethereum", blocks: Optional[List[int]] = None,
+                                timestamps: Optional[List[int]] = None) -> List[Tuple[str, int, Any]]:
+        """Balances of every address at every block (or block before each timestamp)
+        
+        Returns (address, block, HistoricalBalance or exception) in address order.
+        """
+        service = self._get_service(chain)
+        points_blocks = list(blocks or [])
+        for timestamp in timestamps or []:
+            points_blocks.append(service.get_block_by_time(timestamp))
+        
+        points = [(address, block) for address in addresses for block in points_blocks]
+        results = service.get_balances_at(points)
+        return [(address, block, result) for (address, block), result in zip(points, results)]
+    
+    def export_histories(self, addresses: List[str], chains: List[str], datasets: List[str], fmt: str = "jsonl",
+                         output_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Export full histories under <data dir>/exports/[output_dir], resuming any earlier export there"""
+        for chain in chains:
+            self._get_service(chain)
+        directory = resolve_output_dir(output_dir)
+        return export_histories(self.services, addresses, [chain.lower() for chain in chains], datasets, fmt, directory)
+    
+    def get_token_portfolio(self, address: str, chain: str = "ethereum", verify_sample: int = 3) -> Dict[str, Any]:
+        """Reconstruct token holdings for an address from its transfer history"""
+        service = self._get_service(chain)
+        key = (chain.lower(), address.lower())
+        
+        with self._portfolios_lock:
+            engine = self._portfolios.get(key)
+            if engine is None:
+                engine = PortfolioEngine(service, address)
+                self._portfolios.set(key, engine, size=0)
+        
+        try:
+            new_transfers = engine.update()
+        except UpstreamUnavailable as e:
+            if engine.synced_at is None:
+                raise
+            # Report the holdings folded so far
+            note_stale(time.time() - engine.synced_at, str(e))
+            new_transfers = 0
+        # Re-stored at its grown size; the engine itself is not sized, as it references the service
+        self._portfolios.set(key, engine, size=engine.estimated_size())
+        holdings = engine.holdings()
+        verified = engine.verify(holdings, verify_sample)
+        
+        return {
+            'address': engine.address,
+            'chain': service.chain_name,
+            'holdings': holdings,
+            'new_transfers': new_transfers,
+            'transfers_processed': engine.transfers_processed,
+            'rolled_back': engine.rolled_back,
+            'synced_through_block': engine.next_block - 1,
+            'verified': len([h for h in verified if h.verified]),
+            'mismatched': [h for h in verified if h.verified is False]
+        }
+    
+    def get_counterparty_graph(self, address: str, chain: str = "ethereum", hops: int = 2, fan_out: int = 10,
+                               min_value: Decimal = Decimal(0), direction: str = "out", token: Optional[str] = None,
+                               target: Optional[str] = None, max_nodes: int = 200) -> Dict[str, Any]:
+        """Expand the counterparties of an address over several hops, or find paths to a target"""
         service = self._get_service(chain)
-        return service.get_gas_oracle()
+        key = (chain.lower(), (token or '').lower())
+        
+        with self._graphs_lock:
+            graph = self._graphs.get(key)
+            if graph is None:
+                graph = self._graphs[key] = CounterpartyGraph(service, token)
+                while len(self._graphs) > GRAPH_INDEXES:
+                    self._graphs.popitem(last=False)
+            else:
+                self._graphs.move_to_end(key)
+        
+        return graph.expand(address, hops, fan_out, min_value, direction, max_nodes, target)
+    
+    def get_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Size and hit counters of every cache, grouped by owner"""
+        stats: Dict[str, Dict[str, Any]] = {}
+        for chain, service in self.services.items():
+            stats[chain] = {
+                'response': service.response_cache.stats(),
+                'finalized': service.finalized_cache.stats(),
+                'last_known': service.last_known.stats(),
+                **service.event_decoder.stats()
+            }
+        stats['shared'] = {
+            'swr': self.swr.stats(),
+            'graph': adjacency_cache().stats(),
+            'portfolio': self._portfolios.stats()
+        }
+        return stats
+    
+    def get_quota_status(self) -> Dict[str, Dict[str, Any]]:
+        """Daily API quota usage for every configured chain"""
+        return {chain: dict(service.quota.status(), upstream=service.circuit.status())
+                for chain, service in self.services.items()}
+    
+    def watch_addresses(self, addresses: List[str], chain: str = "ethereum") -> int:
+        """Add addresses to the watchlist and make sure polling is running"""
+        added = self.watchlist.add(addresses, chain)
+        self.watchlist.start()
+        return added
+    
+    def unwatch_addresses(self, addresses: List[str], chain: str = "ethereum") -> int:
+        """Remove addresses from the watchlist"""
+        return self.watchlist.remove(addresses, chain)
+    
+    def get_watchlist_changes(self, cursor: int = 0, limit: int = 100) -> Tuple[List[WatchlistChange], int]:
+        """Get balance and activity changes recorded after a cursor"""
+        if self.watchlist.watched():
+            self.watchlist.start()
+        return self.watchlist.changes_since(cursor, limit)
     
     # Cross-chain operations
+    def _run_per_chain(self, chains: List[str], func: Callable[[str], Any]) -> Dict[str, Any]:
+        """Run func(chain) for every chain concurrently within the current deadline
+        
+        Returns chain -> result. Chains that failed map to their exception,
+        and chains that failed or were still running when the deadline
+        passed map to DeadlineExceeded. Each worker runs in a copy of the
+        caller's context, so it inherits the deadline and priority class.
+        """
+        def run(chain: str) -> Any:
+            try:
+                return func(chain)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                left = remaining()
+                if left is not None and left <= 0:
+                    raise DeadlineExceeded(f"Timed out: {str(e)}")
+                raise
+        
+        futures = {chain: self._executor.submit(contextvars.copy_context().run, run, chain) for chain in chains}
+        left = remaining()
+        done, _ = wait(list(futures.values()), timeout=max(0.0, left) if left is not None else None)
+        
+        outcomes = {}
+        for chain, future in futures.items():
+            if future not in done:
+                # The worker keeps running, but its own requests stop at the same deadline
+                outcomes[chain] = DeadlineExceeded("Timed out before the deadline")
+            elif future.exception() is not None:
+                outcomes[chain] = future.exception()
+            else:
+                outcomes[chain] = future.result()
+        return outcomes
+    
     def check_balance_multi_chain(self, address: str, chains: Optional[List[str]] = None) -> Dict[str, Any]:
-        """Check balance across multiple chains"""
+        """Check balance across multiple chains concurrently; slow chains are marked timed_out"""
         if chains is None:
             chains = self.get_available_chains()
         
+        def probe(chain: str) -> Dict[str, Any]:
+            if not self.is_chain_available(chain):
+                raise ValueError(f"Chain '{chain}' not available")
+            balance, age = self.check_balance_cached(address, chain, endpoint='check_balance_all_chains')
+            return {
+                'success': True,
+                'balance': balance.dict(),
+                'native_token': self.get_chain_info(chain).get('native_token', 'Unknown'),
+                'age_seconds': age
+            }
+        
         results = {}
-        for chain in chains:
-            try:
-                if self.is_chain_available(chain):
-                    balance = self.check_balance(address, chain)
-                    results[chain] = {
-                        'success': True,
-                        'balance': balance.dict(),
-                        'native_token': self.get_chain_info(chain).get('native_token', 'Unknown')
-                    }
-                else:
-                    results[chain] = {
-                        'success': False,
-                        'error': f"Chain '{chain}' not available"
-                    }
-            except Exception as e:
+        for chain, outcome in self._run_per_chain(chains, probe).items():
+            if isinstance(outcome, Exception):
                 results[chain] = {
                     'success': False,
-                    'error': str(e)
+                    'error': str(outcome),
+                    'timed_out': isinstance(outcome, DeadlineExceeded)
                 }
+            else:
+                results[chain] = outcome
         
         return results
     
+    def _probe_activity(self, address: str, chain: str) -> Dict[str, Any]:
+        """Check one chain for a balance or transactions
+        
+        Addresses found with neither are recorded in the chain's inactivity
+        index up to its finalized block. Later probes of such an address
+        only ask for transactions and internal transactions after that
+        block, and fetch the balance only if one of them turns something
+        up; 'quiet_through' reports the block it stayed inactive through.
+        """
+        service = self._get_service(chain)
+        index = service.inactivity_index
+        chain_result = {
+            'has_activity': False,
+            'balance': None,
+            'transaction_count': 0,
+            'latest_transaction': None,
+            'quiet_through': None,
+            'error': None
+        }
+        
+        quiet_through = index.quiet_through(address)
+        boundary = service.finalized_boundary()
+        transactions = None
+        if quiet_through is not None:
+            try:
+                # Only blocks after the recorded height can hold anything new, and without
+                # a transaction of its own value only arrives through an internal one
+                transactions = service.get_new_transactions(address, quiet_through, limit=1)
+                if not transactions and not service.get_new_internal_transactions(address, quiet_through, limit=1):
+                    if boundary >= 0:
+                        index.record(address, boundary)
+                    chain_result['quiet_through'] = max(boundary, quiet_through)
+                    return chain_result
+            except Exception:
+                # Without both checks the balance decides, as for an unindexed address
+                transactions = None
+        
+        # Check balance
+        balance = self.check_balance(address, chain)
+        chain_result['balance'] = balance.dict()
+        
+        # Check if address has any activity (balance > 0 or transactions)
+        if float(balance.balance_in_eth) > 0:
+            chain_result['has_activity'] = True
+        
+        # Get recent transactions to check activity
+        try:
+            if transactions is None:
+                transactions = self.get_transactions(address, chain, limit=1)
+            if transactions:
+                chain_result['has_activity'] = True
+                chain_result['transaction_count'] = 1  # We only fetched 1
+                chain_result['latest_transaction'] = transactions[0].dict()
+            elif not chain_result['has_activity'] and boundary >= 0:
+                index.record(address, boundary)
+                chain_result['quiet_through'] = max(boundary, quiet_through or -1)
+        except Exception:
+            # If we can't get transactions, still count as activity if balance > 0
+            pass
+        
+        if chain_result['has_activity'] and quiet_through is not None:
+            index.discard(address)
+        return chain_result
+    
     def search_address_activity(self, address: str, chains: Optional[List[str]] = None) -> Dict[str, Any]:
-        """Search for address activity across multiple chains"""
+        """Search for address activity across multiple chains
+        
+        Chains are probed concurrently and each probe is served
+        stale-while-revalidate; 'age_seconds' says how old it is and
+        'timed_out' marks chains that missed the deadline.
+        """
         if chains is None:
             chains = self.get_available_chains()
         
@@ -137,51 +494,38 @@ class ChainManager:
             'chains': {}
         }
         
+        def probe(chain: str) -> Dict[str, Any]:
+            if not self.is_chain_available(chain):
+                raise ValueError(f"Chain '{chain}' not available")
+            chain_result, age = self.swr.get(
+                'search_address_activity',
+                ('activity', chain.lower(), address.lower()),
+                lambda: self._probe_activity(address, chain)
+            )
+            return dict(chain_result, age_seconds=age, timed_out=False)
+        
         total_chains_with_activity = 0
         
-        for chain in chains:
-            chain_result = {
-                'has_activity': False,
-                'balance': None,
-                'transaction_count': 0,
-                'latest_transaction': None,
-                'error': None
-            }
-            
-            try:
-                if not self.is_chain_available(chain):
-                    chain_result['error'] = f"Chain '{chain}' not available"
-                    results['chains'][chain] = chain_result
-                    continue
-                
-                # Check balance
-                balance = self.check_balance(address, chain)
-                chain_result['balance'] = balance.dict()
-                
-                # Check if address has any activity (balance > 0 or transactions)
-                if float(balance.balance_in_eth) > 0:
-                    chain_result['has_activity'] = True
-                
-                # Get recent transactions to check activity
-                try:
-                    transactions = self.get_transactions(address, chain, limit=1)
-                    if transactions:
-                        chain_result['has_activity'] = True
-                        chain_result['transaction_count'] = 1  # We only fetched 1
-                        chain_result['latest_transaction'] = transactions[0].dict()
-                except Exception:
-                    # If we can't get transactions, still count as activity if balance > 0
-                    pass
-                
+        for chain, outcome in self._run_per_chain(chains, probe).items():
+            if isinstance(outcome, Exception):
+                chain_result = {
+                    'has_activity': False,
+                    'balance': None,
+                    'transaction_count': 0,
+                    'latest_transaction': None,
+                    'quiet_through': None,
+                    'error': str(outcome),
+                    'age_seconds': 0.0,
+                    'timed_out': isinstance(outcome, DeadlineExceeded)
+                }
+            else:
+                chain_result = outcome
                 if chain_result['has_activity']:
                     total_chains_with_activity += 1
-                    
-            except Exception as e:
-                chain_result['error'] = str(e)
             
             results['chains'][chain] = chain_result
         
         results['chains_with_activity'] = total_chains_with_activity
         results['has_multi_chain_activity'] = total_chains_with_activity > 1
         
-        return results
\ No newline at end of file
+        return results
@@ -0,0 +1,80 @@
+import contextvars
+import os
+import sys
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, Tuple
+
+# Seconds a tool call may take unless TOOL_DEADLINES says otherwise
+DEFAULT_TOOL_DEADLINE = 60.0
+
+DEFAULT_TOOL_DEADLINES: Dict[str, float] = {
+    'check_balance': 15.0,
+    'check_balance_all_chains': 20.0,
+    'search_address_activity': 25.0,
+    'export_address_history': 300.0,
+    'get_counterparty_graph': 45.0
+}
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar('deadline', default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a call runs out of its time budget"""
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Bound the enclosed calls to a time budget; nested budgets can only shrink it"""
+    if seconds is None:
+        yield
+        return
+    expires_at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(min(expires_at, current) if current is not None else expires_at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current budget, or None if there is no deadline"""
+    expires_at = _deadline.get()
+    if expires_at is None:
+        return None
+    return expires_at - time.monotonic()
+
+
+def check_deadline():
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("Deadline exceeded")
+
+
+@lru_cache(maxsize=4)
+def _parse_deadlines(configured: str) -> Tuple[Dict[str, float], float]:
+    """Per-tool budgets and the default from a TOOL_DEADLINES value, parsed once per value"""
+    deadlines = dict(DEFAULT_TOOL_DEADLINES)
+    default = DEFAULT_TOOL_DEADLINE
+    for part in configured.split(','):
+        name, _, value = part.partition('=')
+        if not value.strip():
+            continue
+        try:
+            seconds = float(value)
+        except ValueError:
+            print(f"Ignoring TOOL_DEADLINES entry '{part.strip()}': not a number of seconds", file=sys.stderr)
+            continue
+        if name.strip() == 'default':
+            default = seconds
+        else:
+            deadlines[name.strip()] = seconds
+    return deadlines, default
+
+
+def tool_deadline(tool_name: str) -> float:
+    """Budget for a tool, from TOOL_DEADLINES (for example search_address_activity=10,default=45)"""
+    deadlines, default = _parse_deadlines(os.getenv('TOOL_DEADLINES') or '')
+    return deadlines.get(tool_name, default)
@@ -0,0 +1,136 @@
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Consecutive upstream failures after which a chain's circuit opens
+DEFAULT_FAILURE_THRESHOLD = 3
+
+# Seconds an open circuit fails fast before letting one probe request through
+DEFAULT_RESET_AFTER = 30.0
+
+# Seconds to establish a connection; an unreachable scanner fails after this, not the full timeout
+CONNECT_TIMEOUT = 5.0
+
+_offline = False
+
+
+class UpstreamUnavailable(Exception):
+    """Raised when a scanner is offline, failing or out of quota"""
+
+
+def set_offline(enabled: bool):
+    """Serve every tool from local data only, without calling any scanner"""
+    global _offline
+    _offline = enabled
+
+
+def offline_mode() -> bool:
+    return _offline or (os.getenv('MCP_OFFLINE') or '').lower() in ('1', 'true', 'yes')
+
+
+class CircuitBreaker:
+    """Stops calling an unreachable scanner until it has had time to recover
+    
+    After failure_threshold consecutive failures the circuit opens and
+    check() raises UpstreamUnavailable at once. Every reset_after seconds
+    one caller is let through as a probe; its success closes the circuit
+    and its failure keeps it open for another period.
+    """
+    
+    def __init__(self, name: str, failure_threshold: Optional[int] = None, reset_after: Optional[float] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or int(os.getenv('CIRCUIT_FAILURES') or DEFAULT_FAILURE_THRESHOLD)
+        self.reset_after = reset_after or float(os.getenv('CIRCUIT_RESET') or DEFAULT_RESET_AFTER)
+        self._failures = 0
+        self._open_until: Optional[float] = None
+        self._reason = ''
+        self._lock = threading.Lock()
+    
+    def check(self):
+        """Raise UpstreamUnavailable unless a call may go out now"""
+        if offline_mode():
+            raise UpstreamUnavailable(f"{self.name}: offline mode")
+        with self._lock:
+            if self._open_until is None:
+                return
+            now = time.monotonic()
+            if now < self._open_until:
+                raise UpstreamUnavailable(
+                    f"{self.name} unavailable ({self._reason}), retrying in {self._open_until - now:.0f}s"
+                )
+            # This caller is the probe; everyone else keeps failing fast meanwhile
+            self._open_until = now + self.reset_after
+    
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._open_until = None
+    
+    def record_failure(self, reason: str):
+        with self._lock:
+            self._failures += 1
+            self._reason = reason
+            if self._failures >= self.failure_threshold or self._open_until is not None:
+                self._open_until = time.monotonic() + self.reset_after
+    
+    def trip(self, seconds: float, reason: str):
+        """Open the circuit for a known period, such as until a quota resets"""
+        with self._lock:
+            self._reason = reason
+            self._open_until = time.monotonic() + seconds
+    
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            left = self._open_until - time.monotonic() if self._open_until is not None else 0.0
+            return {
+                'state': 'offline' if offline_mode() else ('open' if left > 0 else 'closed'),
+                'consecutive_failures': self._failures,
+                'reason': self._reason if left > 0 else '',
+                'retry_in_seconds': max(0, int(left))
+            }
+
+
+class StalenessReport:
+    """Local data a tool call fell back to, as (age in seconds, reason) notes"""
+    
+    def __init__(self):
+        self.notes: List[Tuple[float, str]] = []
+    
+    def oldest(self) -> float:
+        return max((age for age, _ in self.notes), default=0.0)
+    
+    def reasons(self) -> List[str]:
+        return sorted({reason for _, reason in self.notes})
+
+
+_report: contextvars.ContextVar = contextvars.ContextVar('staleness_report', default=None)
+
+
+@contextmanager
+def track_staleness() -> Iterator[StalenessReport]:
+    """Collect fallbacks to local data made by the enclosed calls, including their worker threads"""
+    report = StalenessReport()
+    token = _report.set(report)
+    try:
+        yield report
+    finally:
+        _report.reset(token)
+
+
+def stale_allowed() -> bool:
+    """Only calls that report staleness to the user may be answered with stale data"""
+    return _report.get() is not None
+
+
+def note_stale(age_seconds: float, reason: str):
+    report = _report.get()
+    if report is not None:
+        report.notes.append((max(0.0, age_seconds), reason))
+
+
+def stale_count() -> int:
+    report = _report.get()
+    return len(report.notes) if report is not None else 0
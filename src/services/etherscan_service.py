@@ -5,12 +5,13 @@ from services.base_scanner import BaseScannerService
 class EtherscanService(BaseScannerService):
     """Ethereum scanner service using Etherscan API"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, base_url: str = "https://api.etherscan.io/api", **options):
         super().__init__(
             api_key=api_key,
-            base_url="https://api.etherscan.io/api",
+            base_url=base_url,
             chain_name="Ethereum",
-            native_token="ETH"
+            native_token="ETH",
+            **options
         )
     
     def get_token_standard(self) -> str:
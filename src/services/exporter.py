@@ -0,0 +1,223 @@
+import contextvars
+import csv
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from models import EXPORT_DATASETS, EXPORT_FORMATS
+from services.base_scanner import BaseScannerService, _block_of
+from services.deadline import DeadlineExceeded
+from services.scheduler import request_priority, BULK
+from services.storage import get_data_dir, load_json, save_json
+
+# Scanner iterator streaming each dataset
+DATASET_ITERATORS = {
+    'transactions': 'iter_transactions',
+    'token_transfers': 'iter_token_transfers',
+    'internal_transactions': 'iter_internal_transactions'
+}
+
+# Rows buffered before they are written out and the checkpoint advances
+CHECKPOINT_ROWS = 5000
+
+
+class JsonlWriter:
+    """Appends rows to <base>.jsonl; its checkpoint state is the file length"""
+    
+    def __init__(self, base: Path, state: Optional[Dict[str, Any]]):
+        self.path = base.with_suffix('.jsonl')
+        self._file = open(self.path, 'ab')
+        # Rows written after the last checkpoint are written again on resume
+        self._file.truncate((state or {}).get('offset', 0))
+        self._file.seek(0, os.SEEK_END)
+    
+    def write(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        self._file.write(''.join(json.dumps(row, separators=(',', ':')) + '\n' for row in rows).encode('utf-8'))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return {'offset': self._file.tell()}
+    
+    def close(self):
+        self._file.close()
+
+
+class CsvWriter(JsonlWriter):
+    """Appends rows to <base>.csv, with the columns of the first rows written"""
+    
+    def __init__(self, base: Path, state: Optional[Dict[str, Any]]):
+        self.path = base.with_suffix('.csv')
+        state = state or {}
+        self.columns: Optional[List[str]] = state.get('columns')
+        self._file = open(self.path, 'a+', encoding='utf-8', newline='')
+        self._file.truncate(state.get('offset', 0))
+        self._file.seek(0, os.SEEK_END)
+    
+    def write(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if self.columns is None:
+            self.columns = list(rows[0])
+            csv.writer(self._file).writerow(self.columns)
+        csv.DictWriter(self._file, self.columns, restval='', extrasaction='ignore').writerows(rows)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return {'offset': self._file.tell(), 'columns': self.columns}
+
+
+class ParquetWriter:
+    """Writes each checkpoint's rows as the next part file under <base>/"""
+    
+    def __init__(self, base: Path, state: Optional[Dict[str, Any]]):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise Exception("Parquet export requires pyarrow (pip install pyarrow)")
+        self._pyarrow = pyarrow
+        self.path = base
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.parts = (state or {}).get('parts', 0)
+        for stale in self.path.glob('part-*.parquet'):
+            if int(stale.stem.split('-')[1]) >= self.parts:
+                stale.unlink()
+    
+    def write(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        table = self._pyarrow.Table.from_pylist(rows)
+        self._pyarrow.parquet.write_table(table, str(self.path / f"part-{self.parts:05d}.parquet"))
+        self.parts += 1
+        return {'parts': self.parts}
+    
+    def close(self):
+        pass
+
+
+WRITERS = {'jsonl': JsonlWriter, 'csv': CsvWriter, 'parquet': ParquetWriter}
+
+
+class AddressExport:
+    """Streams the datasets of one address on one chain to disk, resumably
+    
+    Rows are buffered up to CHECKPOINT_ROWS, cut at a block boundary, then
+    written and followed by a checkpoint recording the next block and the
+    file position. An interrupted export loses at most the buffered rows
+    and resumes from the last checkpoint; running it again later appends
+    whatever is new.
+    """
+    
+    def __init__(self, service: BaseScannerService, address: str, datasets: List[str], fmt: str, directory: Path):
+        self.service = service
+        self.address = address
+        self.datasets = datasets
+        self.format = fmt
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_path = directory / 'checkpoint.json'
+        self.state = load_json(self.checkpoint_path, default={}) or {}
+        if not self.state:
+            # Writers truncate their files to the checkpoint, so never adopt files it did not record
+            if any(self.directory.iterdir()):
+                raise ValueError(f"{directory} already holds files but no checkpoint.json; "
+                                 "remove them or export to another directory")
+            self.state['format'] = fmt
+            save_json(self.checkpoint_path, self.state)
+        if self.state.setdefault('format', fmt) != fmt:
+            raise ValueError(f"{directory} already holds a {self.state['format']} export")
+    
+    def run(self) -> int:
+        """Export every dataset, returning how many rows were added"""
+        return sum(self._export(dataset) for dataset in self.datasets)
+    
+    def rows(self) -> Dict[str, int]:
+        return {dataset: self.state.get(dataset, {}).get('rows', 0) for dataset in self.datasets}
+    
+    def _export(self, dataset: str) -> int:
+        checkpoint = self.state.setdefault(dataset, {'next_block': 0, 'rows': 0})
+        writer = WRITERS[self.format](self.directory / dataset, checkpoint.get('writer'))
+        iterate = getattr(self.service, DATASET_ITERATORS[dataset])
+        
+        try:
+            added = 0
+            buffer: List[Dict[str, Any]] = []
+            for row in iterate(self.address, start_block=checkpoint['next_block']):
+                block = _block_of(row)
+                if len(buffer) >= CHECKPOINT_ROWS and block > _block_of(buffer[-1]):
+                    added += self._commit(checkpoint, writer, buffer, block)
+                    buffer = []
+                buffer.append(row)
+            if buffer:
+                added += self._commit(checkpoint, writer, buffer, _block_of(buffer[-1]) + 1)
+            return added
+        finally:
+            writer.close()
+    
+    def _commit(self, checkpoint: Dict[str, Any], writer: Any, rows: List[Dict[str, Any]], next_block: int) -> int:
+        # Data reaches the disk before the checkpoint that points past it
+        checkpoint['writer'] = writer.write(rows)
+        checkpoint['next_block'] = next_block
+        checkpoint['rows'] += len(rows)
+        save_json(self.checkpoint_path, self.state)
+        return len(rows)
+
+
+def resolve_output_dir(output_dir: Optional[str] = None) -> Path:
+    """Export directory for output_dir, which must be relative to <data dir>/exports"""
+    root = (get_data_dir() / 'exports').resolve()
+    if not output_dir:
+        return root
+    relative = Path(output_dir)
+    if relative.is_absolute() or relative.anchor or '..' in relative.parts:
+        raise ValueError(f"Output directory '{output_dir}' must be a relative path inside {root}")
+    directory = (root / relative).resolve()
+    if root not in directory.parents and directory != root:
+        raise ValueError(f"Output directory '{output_dir}' must be a relative path inside {root}")
+    return directory
+
+
+def export_histories(services: Dict[str, BaseScannerService], addresses: List[str], chains: List[str],
+                     datasets: List[str], fmt: str, output_dir: Path) -> List[Dict[str, Any]]:
+    """Export addresses on several chains to output_dir/<chain>/<address>/
+    
+    Chains run in parallel, addresses within a chain one after another, all
+    under the bulk priority class. When the calling context's deadline
+    passes, unfinished exports are reported as incomplete and can be
+    resumed by running the same export again.
+    """
+    for dataset in datasets:
+        if dataset not in EXPORT_DATASETS:
+            raise ValueError(f"Unknown dataset '{dataset}'. Available: {list(EXPORT_DATASETS)}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'. Available: {list(EXPORT_FORMATS)}")
+    
+    def export_chain(chain: str) -> List[Dict[str, Any]]:
+        results = []
+        stopped = False
+        with request_priority(BULK):
+            for address in addresses:
+                result = {
+                    'chain': chain,
+                    'address': address,
+                    'directory': str(output_dir / chain / address),
+                    'added': 0,
+                    'rows': {},
+                    'complete': False,
+                    'error': None
+                }
+                results.append(result)
+                if stopped:
+                    continue
+                try:
+                    export = AddressExport(services[chain], address, datasets, fmt, output_dir / chain / address)
+                    try:
+                        result['added'] = export.run()
+                        result['complete'] = True
+                    finally:
+                        result['rows'] = export.rows()
+                except DeadlineExceeded:
+                    stopped = True
+                except Exception as e:
+                    result['error'] = str(e)
+        return results
+    
+    with ThreadPoolExecutor(max_workers=max(1, len(chains)), thread_name_prefix='export') as executor:
+        futures = [executor.submit(contextvars.copy_context().run, export_chain, chain) for chain in chains]
+        return [result for future in futures for result in future.result()]
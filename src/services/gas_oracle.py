@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from models import GasPrice
+from services.base_scanner import BaseScannerService
+from services.scheduler import request_priority, BACKGROUND
+
+# Seconds between gas oracle refreshes; 0 disables background polling
+DEFAULT_POLL_INTERVAL = 15.0
+
+# Samples kept per chain (one hour at the default interval)
+DEFAULT_HISTORY_SIZE = 240
+
+GAS_TIERS = ('safe', 'propose', 'fast')
+
+
+class GasSample:
+    """One gas oracle reading in Gwei"""
+    
+    __slots__ = ('timestamp', 'safe', 'propose', 'fast')
+    
+    def __init__(self, timestamp: float, price: GasPrice):
+        self.timestamp = timestamp
+        self.safe = float(price.safe_gwei or 0)
+        self.propose = float(price.propose_gwei or 0)
+        self.fast = float(price.fast_gwei or 0)
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """Linear-interpolated percentile of an already sorted list"""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * percent / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+class GasOraclePoller:
+    """Refreshes one chain's gas oracle in the background
+    
+    The latest reading is served from memory, and a fixed-size ring buffer
+    of past readings backs percentile and trend queries.
+    """
+    
+    def __init__(self, service: BaseScannerService, interval: float = DEFAULT_POLL_INTERVAL,
+                 history_size: int = DEFAULT_HISTORY_SIZE):
+        self.service = service
+        self.interval = interval
+        self._samples: Deque[GasSample] = deque(maxlen=history_size)
+        self._latest: Optional[GasPrice] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.last_error: Optional[str] = None
+    
+    def poll(self) -> GasPrice:
+        """Fetch a fresh reading and record it"""
+        price = self.service.get_gas_oracle()
+        with self._lock:
+            self._latest = price
+            self._samples.append(GasSample(time.time(), price))
+        self.last_error = None
+        return price
+    
+    def _run(self):
+        with request_priority(BACKGROUND):
+            while not self._stop.wait(self.interval):
+                try:
+                    self.poll()
+                except Exception as e:
+                    # Keep serving the last good reading; the next tick retries
+                    self.last_error = str(e)
+    
+    def start(self):
+        """Start refreshing in a daemon thread; safe to call repeatedly"""
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f"gas-poller-{self.service.chain_name.lower()}",
+                daemon=True
+            )
+            self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+    
+    def latest(self) -> Optional[GasPrice]:
+        with self._lock:
+            return self._latest
+    
+    def age(self) -> float:
+        """Seconds since the latest reading"""
+        with self._lock:
+            return time.time() - self._samples[-1].timestamp if self._samples else float('inf')
+    
+    def samples(self, window_seconds: Optional[float] = None) -> List[GasSample]:
+        """Samples within the window (all of them if no window is given), oldest first"""
+        with self._lock:
+            samples = list(self._samples)
+        if window_seconds:
+            cutoff = time.time() - window_seconds
+            samples = [s for s in samples if s.timestamp >= cutoff]
+        return samples
+    
+    def percentiles(self, window_seconds: Optional[float] = None,
+                    percents=(10, 50, 90)) -> Dict[str, Dict[int, float]]:
+        """Percentiles of each tier's price over the window"""
+        samples = self.samples(window_seconds)
+        if not samples:
+            return {}
+        result = {}
+        for tier in GAS_TIERS:
+            values = sorted(getattr(s, tier) for s in samples)
+            result[tier] = {p: _percentile(values, p) for p in percents}
+        return result
+    
+    def trend(self, window_seconds: Optional[float] = None) -> Dict[str, float]:
+        """Least-squares slope of each tier's price, in Gwei per minute"""
+        samples = self.samples(window_seconds)
+        if len(samples) < 2:
+            return {}
+        origin = samples[0].timestamp
+        xs = [(s.timestamp - origin) / 60.0 for s in samples]
+        mean_x = sum(xs) / len(xs)
+        spread = sum((x - mean_x) ** 2 for x in xs)
+        if spread == 0:
+            return {}
+        result = {}
+        for tier in GAS_TIERS:
+            ys = [getattr(s, tier) for s in samples]
+            mean_y = sum(ys) / len(ys)
+            result[tier] = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread
+        return result
+
+
+def poller_settings() -> Dict[str, float]:
+    """Read poll interval and history size from the environment"""
+    return {
+        'interval': float(os.getenv('GAS_POLL_INTERVAL') or DEFAULT_POLL_INTERVAL),
+        'history_size': int(os.getenv('GAS_HISTORY_SIZE') or DEFAULT_HISTORY_SIZE)
+    }
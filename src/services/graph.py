@@ -0,0 +1,240 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.base_scanner import BaseScannerService
+from services.cache import TTLCache, byte_budget
+from services.deadline import remaining
+
+# Newest rows of each address's history the index is built from
+DEFAULT_HISTORY_LIMIT = 1000
+
+# Concurrent history fetches while expanding a hop, shared by every graph (the scheduler still paces them)
+GRAPH_WORKERS = 8
+
+# Addresses whose counterparties are kept across all graphs, and for how long before they are rebuilt
+GRAPH_CACHE_SIZE = 5000
+GRAPH_CACHE_TTL = 300.0
+
+DIRECTIONS = ('out', 'in', 'both')
+
+_executor = ThreadPoolExecutor(max_workers=GRAPH_WORKERS, thread_name_prefix='graph-worker')
+
+_adjacency: Optional[TTLCache] = None
+_adjacency_lock = threading.Lock()
+
+
+def adjacency_cache() -> TTLCache:
+    """Counterparties of every graph, keyed by (chain, token, address), under one 'graph' budget"""
+    global _adjacency
+    with _adjacency_lock:
+        if _adjacency is None:
+            _adjacency = TTLCache(max_entries=GRAPH_CACHE_SIZE, default_ttl=GRAPH_CACHE_TTL,
+                                  max_bytes=byte_budget('graph'))
+        return _adjacency
+
+
+class CounterpartyEdge:
+    """What one address exchanged with one counterparty"""
+    
+    __slots__ = ('sent', 'received', 'count', 'last_block')
+    
+    def __init__(self):
+        self.sent = Decimal(0)
+        self.received = Decimal(0)
+        self.count = 0
+        self.last_block = 0
+    
+    def value(self, direction: str) -> Decimal:
+        if direction == 'out':
+            return self.sent
+        if direction == 'in':
+            return self.received
+        return self.sent + self.received
+
+
+class CounterpartyGraph:
+    """Adjacency index of address -> counterparties for one chain and asset
+    
+    Each address's entry is folded from the newest history_limit rows of
+    its history (native transactions, or transfers of one token), fetched
+    through the service's caches, and kept for GRAPH_CACHE_TTL in the cache
+    all graphs share. Expansion
+    fetches every address of a hop concurrently, follows at most fan_out
+    counterparties per address whose value reaches min_value, and stops
+    early at the calling context's deadline, reporting itself truncated.
+    """
+    
+    def __init__(self, service: BaseScannerService, token: Optional[str] = None,
+                 history_limit: int = DEFAULT_HISTORY_LIMIT):
+        self.service = service
+        self.token = token.lower() if token else None
+        self.history_limit = history_limit
+        self._adjacency = adjacency_cache()
+    
+    @property
+    def unit(self) -> str:
+        if self.token is None:
+            return self.service.native_token
+        token = self.service.token_registry.get(self.token)
+        return token.symbol if token and token.symbol else self.token
+    
+    def counterparties(self, address: str) -> Dict[str, CounterpartyEdge]:
+        """Counterparties of an address, fetching and folding its history if needed"""
+        address = address.lower()
+        key = (self.service.chain_name, self.token, address)
+        edges = self._adjacency.get(key)
+        if edges is not None:
+            return edges
+        
+        if self.token is None:
+            rows = [(tx.from_address, tx.to_address, tx.value, tx.block_number)
+                    for tx in self.service.get_transaction_history(address, self.history_limit)]
+        else:
+            # The scanner filters by contract, so the page holds only transfers of the followed token
+            rows = [(t.from_address, t.to_address, t.value, t.block_number)
+                    for t in self.service.get_token_transfers(address, self.history_limit, contract_address=self.token)]
+        
+        edges = {}
+        for sender, recipient, value, block in rows:
+            sender, recipient = sender.lower(), recipient.lower()
+            if sender == address:
+                counterparty, outgoing = recipient, True
+            elif recipient == address:
+                counterparty, outgoing = sender, False
+            else:
+                continue
+            if not counterparty.startswith('0x') or counterparty == address:
+                # Contract creations and self-transfers lead nowhere
+                continue
+            
+            edge = edges.get(counterparty)
+            if edge is None:
+                edge = edges[counterparty] = CounterpartyEdge()
+            if outgoing:
+                edge.sent += Decimal(value)
+            else:
+                edge.received += Decimal(value)
+            edge.count += 1
+            edge.last_block = max(edge.last_block, block)
+        
+        self._adjacency.set(key, edges)
+        return edges
+    
+    def _fetch_level(self, addresses: List[str]) -> Tuple[Dict[str, Dict[str, CounterpartyEdge]], Dict[str, str]]:
+        """Counterparties of several addresses at once; returns (found, address -> error)"""
+        futures = {
+            address: _executor.submit(contextvars.copy_context().run, self.counterparties, address)
+            for address in addresses
+        }
+        left = remaining()
+        done, _ = wait(list(futures.values()), timeout=max(0.0, left) if left is not None else None)
+        
+        found, errors = {}, {}
+        for address, future in futures.items():
+            if future not in done:
+                errors[address] = "Timed out before the deadline"
+            elif future.exception() is not None:
+                errors[address] = str(future.exception())
+            else:
+                found[address] = future.result()
+        return found, errors
+    
+    def expand(self, root: str, hops: int = 2, fan_out: int = 10, min_value: Decimal = Decimal(0),
+               direction: str = 'out', max_nodes: int = 200, target: Optional[str] = None) -> Dict[str, Any]:
+        """Breadth-first neighborhood of root, hop by hop
+        
+        Returns the nodes reached with their hop, the edges followed (value
+        in the graph's unit, from the perspective of the expanded address;
+        with direction 'both' the total exchanged, split into sent and received),
+        addresses that could not be expanded, and whether the expansion was
+        cut short by max_nodes or the deadline. With target, expansion stops
+        after the hop that reaches it.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction '{direction}'. Available: {list(DIRECTIONS)}")
+        root = root.lower()
+        target = target.lower() if target else None
+        
+        nodes = {root: 0}
+        parents: Dict[str, List[str]] = {root: []}
+        edges: List[Dict[str, Any]] = []
+        errors: Dict[str, str] = {}
+        truncated = False
+        frontier = [root]
+        
+        for hop in range(1, hops + 1):
+            if not frontier or (target and target in nodes):
+                break
+            found, failed = self._fetch_level(frontier)
+            errors.update(failed)
+            
+            next_frontier = []
+            for address in frontier:
+                ranked = sorted(
+                    ((counterparty, edge) for counterparty, edge in found.get(address, {}).items()
+                     if edge.value(direction) > 0 and edge.value(direction) >= min_value),
+                    key=lambda item: item[1].value(direction),
+                    reverse=True
+                )
+                for counterparty, edge in ranked[:fan_out]:
+                    if counterparty in nodes and nodes[counterparty] < hop:
+                        # Already reached by a shorter path; keep the edge for context only
+                        edges.append(self._edge(hop, address, counterparty, edge, direction))
+                        continue
+                    if counterparty not in nodes:
+                        if len(nodes) >= max_nodes:
+                            truncated = True
+                            continue
+                        nodes[counterparty] = hop
+                        parents[counterparty] = []
+                        next_frontier.append(counterparty)
+                    parents[counterparty].append(address)
+                    edges.append(self._edge(hop, address, counterparty, edge, direction))
+            frontier = next_frontier
+        
+        left = remaining()
+        result = {
+            'root': root,
+            'unit': self.unit,
+            'nodes': nodes,
+            'edges': edges,
+            'errors': errors,
+            'truncated': truncated or bool(errors) or (left is not None and left <= 0)
+        }
+        if target:
+            result['paths'] = self._paths(parents, root, target)
+        return result
+    
+    def _edge(self, hop: int, address: str, counterparty: str, edge: CounterpartyEdge, direction: str) -> Dict[str, Any]:
+        sender, recipient = (counterparty, address) if direction == 'in' else (address, counterparty)
+        result = {
+            'hop': hop,
+            'from': sender,
+            'to': recipient,
+            'value': str(edge.value(direction)),
+            'count': edge.count,
+            'last_block': edge.last_block
+        }
+        if direction == 'both':
+            result['sent'] = str(edge.sent)
+            result['received'] = str(edge.received)
+        return result
+    
+    @staticmethod
+    def _paths(parents: Dict[str, List[str]], root: str, target: str, limit: int = 10) -> List[List[str]]:
+        """Up to limit shortest paths from root to target through the recorded parents"""
+        if target not in parents:
+            return []
+        paths = []
+        stack = [[target]]
+        while stack and len(paths) < limit:
+            path = stack.pop()
+            if path[-1] == root:
+                paths.append(list(reversed(path)))
+                continue
+            for parent in parents[path[-1]]:
+                stack.append(path + [parent])
+        return paths
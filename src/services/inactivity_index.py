@@ -0,0 +1,163 @@
+import atexit
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from services.storage import get_data_dir, write_atomic
+
+# On-disk layout: magic, then (address 20 bytes, block u64) records sorted by address
+_MAGIC = b'INA1'
+_RECORD = struct.Struct('>20sQ')
+
+# Changes are flushed to disk after this many changes or seconds, whichever comes first
+SAVE_EVERY_CHANGES = 100
+SAVE_EVERY_SECONDS = 30.0
+
+
+def _key(address: str) -> bytes:
+    return bytes.fromhex(address.lower()[2:])
+
+
+class InactivityIndex:
+    """Addresses known to have had no activity on one chain, up to a block
+    
+    Entries are kept as the sorted packed records of the saved file, 28
+    bytes per address, and looked up by binary search in place. Changes
+    are buffered in a small dict and merged into the sorted run on save,
+    which happens every SAVE_EVERY_CHANGES changes or SAVE_EVERY_SECONDS
+    and at exit.
+    """
+    
+    def __init__(self, chain_name: str, path: Optional[Path] = None):
+        self.chain_name = chain_name
+        self._path = path
+        self._records = b''
+        # Unsaved changes: address key -> quiet-through block, or None once active
+        self._pending: Dict[bytes, Optional[int]] = {}
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        self._loaded = False
+        self._lock = threading.Lock()
+        atexit.register(self.save)
+    
+    @property
+    def path(self) -> Path:
+        if self._path is None:
+            self._path = get_data_dir() / 'inactive' / f"{self.chain_name.lower()}.bin"
+        return self._path
+    
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, 'rb') as f:
+                blob = f.read()
+        except OSError:
+            return
+        if blob.startswith(_MAGIC):
+            body = blob[len(_MAGIC):]
+            self._records = body[:len(body) - len(body) % _RECORD.size]
+    
+    def _position(self, key: bytes) -> int:
+        """Index of the first record whose address is not below key"""
+        low, high = 0, len(self._records) // _RECORD.size
+        while low < high:
+            middle = (low + high) // 2
+            if self._records[middle * _RECORD.size:middle * _RECORD.size + 20] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+    
+    def _search(self, key: bytes) -> Optional[int]:
+        """Block recorded for key in the sorted records, if any"""
+        position = self._position(key)
+        if position * _RECORD.size < len(self._records):
+            found, block = _RECORD.unpack_from(self._records, position * _RECORD.size)
+            if found == key:
+                return block
+        return None
+    
+    def _changed(self) -> bool:
+        """Count a buffered change; caller must hold self._lock. Returns whether a save is due"""
+        self._unsaved += 1
+        return self._unsaved >= SAVE_EVERY_CHANGES or time.monotonic() - self._saved_at >= SAVE_EVERY_SECONDS
+    
+    def quiet_through(self, address: str) -> Optional[int]:
+        """Last block through which the address had no activity, or None if unknown"""
+        key = _key(address)
+        with self._lock:
+            self._ensure_loaded()
+            if key in self._pending:
+                return self._pending[key]
+            return self._search(key)
+    
+    def record(self, address: str, block: int):
+        """Note that the address had no activity through block"""
+        key = _key(address)
+        due = False
+        with self._lock:
+            self._ensure_loaded()
+            known = self._pending[key] if key in self._pending else self._search(key)
+            if known is None or block > known:
+                self._pending[key] = block
+                due = self._changed()
+        if due:
+            self.save()
+    
+    def discard(self, address: str):
+        """Forget an address once it shows activity"""
+        key = _key(address)
+        due = False
+        with self._lock:
+            self._ensure_loaded()
+            if self._pending.get(key) is not None or self._search(key) is not None:
+                self._pending[key] = None
+                due = self._changed()
+        if due:
+            self.save()
+    
+    def _merge(self) -> bytes:
+        """The records with the buffered changes applied; caller must hold self._lock
+        
+        Runs of unchanged records between two changed addresses are copied
+        as whole slices, so the cost is one pass over the bytes.
+        """
+        parts = []
+        copied = 0
+        for key, block in sorted(self._pending.items()):
+            position = self._position(key)
+            parts.append(self._records[copied * _RECORD.size:position * _RECORD.size])
+            copied = position
+            if position * _RECORD.size < len(self._records) and \
+                    self._records[position * _RECORD.size:position * _RECORD.size + 20] == key:
+                copied += 1
+            if block is not None:
+                parts.append(_RECORD.pack(key, block))
+        parts.append(self._records[copied * _RECORD.size:])
+        return b''.join(parts)
+    
+    def save(self):
+        """Merge buffered changes into the sorted records and write them out"""
+        with self._lock:
+            if not self._unsaved:
+                return
+            if self._pending:
+                self._records = self._merge()
+                self._pending.clear()
+            self._saved_at = time.monotonic()
+            # On failure the merged records stay in memory and are written with the next save
+            if write_atomic(self.path, _MAGIC + self._records):
+                self._unsaved = 0
+    
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            count = len(self._records) // _RECORD.size
+            for key, block in self._pending.items():
+                known = self._search(key) is not None
+                count += (block is not None) - known
+            return count
@@ -0,0 +1,148 @@
+import random
+import threading
+import time
+from typing import Dict, List, Any, Optional
+
+from models import TokenHolding
+from services.base_scanner import BaseScannerService
+from services.cache import estimate_size
+from services.reorg import RecentBlocks
+
+
+class PortfolioEngine:
+    """Net token balances for one address, folded from its transfer history
+    
+    Balances are kept as raw integers so the fold is exact; scaling by
+    token decimals only happens when holdings are reported. Each update
+    fetches transfers after the last block already folded in. Transfers
+    from blocks that are not final yet are kept, so if a reorg replaced
+    them they are unfolded and their range fetched again.
+    """
+    
+    def __init__(self, service: BaseScannerService, address: str):
+        self.service = service
+        self.address = service._validate_address(address)
+        self.balances: Dict[str, int] = {}
+        self.transfer_counts: Dict[str, int] = {}
+        self.next_block = 0
+        self.transfers_processed = 0
+        self.rolled_back = 0
+        self.synced_at: Optional[float] = None
+        self._recent = RecentBlocks()
+        self._lock = threading.Lock()
+    
+    def apply(self, row: Dict[str, Any], sign: int = 1):
+        """Fold a single raw tokentx row into the running balances; sign=-1 unfolds it"""
+        contract = row.get('contractAddress', '').lower()
+        try:
+            value = int(row.get('value') or 0)
+        except ValueError:
+            return
+        
+        self.service.token_registry.observe(
+            contract,
+            row.get('tokenName', ''),
+            row.get('tokenSymbol', ''),
+            row.get('tokenDecimal', '18')
+        )
+        
+        delta = 0
+        if row.get('to', '').lower() == self.address:
+            delta += value
+        if row.get('from', '').lower() == self.address:
+            delta -= value
+        
+        self.balances[contract] = self.balances.get(contract, 0) + sign * delta
+        self.transfer_counts[contract] = self.transfer_counts.get(contract, 0) + sign
+        self.transfers_processed += sign
+    
+    def _repair_reorg(self) -> int:
+        """Unfold transfers from blocks a reorg replaced, returning how many"""
+        keep_through = self._recent.find_fork(self.service)
+        if keep_through is None:
+            return 0
+        
+        rows = self._recent.rollback(keep_through)
+        for row in rows:
+            self.apply(row, sign=-1)
+        self.next_block = keep_through + 1
+        return len(rows)
+    
+    def update(self) -> int:
+        """Fold in transfers newer than the last sync, returning how many were seen"""
+        with self._lock:
+            repaired = self._repair_reorg()
+            self.rolled_back += repaired
+            
+            # Short-lived cached pages of a replaced range may predate the reorg
+            seen = 0
+            rows = self.service.iter_token_transfers(self.address, start_block=self.next_block,
+                                                     refresh=repaired > 0)
+            for row in rows:
+                self.apply(row)
+                block = int(row.get('blockNumber', '0'))
+                self._recent.add(block, row)
+                self.next_block = max(self.next_block, block + 1)
+                seen += 1
+            
+            self._recent.prune(self.service.finalized_boundary())
+            newest = self._recent.newest()
+            if newest is not None and self._recent.needs_hash(newest):
+                self._recent.set_hash(newest, self.service.get_block_hash(newest))
+            
+            self.service.token_registry.save()
+            self.synced_at = time.time()
+            return seen
+    
+    def estimated_size(self) -> int:
+        """Approximate bytes of the fold state, leaving out the shared service"""
+        with self._lock:
+            return estimate_size(self.balances) + estimate_size(self.transfer_counts) + self._recent.estimated_size()
+    
+    def holdings(self, include_zero: bool = False) -> List[TokenHolding]:
+        """Current holdings, largest transfer activity first"""
+        registry = self.service.token_registry
+        holdings = []
+        
+        with self._lock:
+            balances = dict(self.balances)
+            counts = dict(self.transfer_counts)
+        
+        for contract, raw_balance in balances.items():
+            if raw_balance == 0 and not include_zero:
+                continue
+            token = registry.get(contract)
+            holdings.append(TokenHolding(
+                token=contract,
+                token_name=token.name if token else '',
+                token_symbol=token.symbol if token else '',
+                token_decimals=token.decimals if token else 18,
+                raw_balance=raw_balance,
+                balance=token.format_value(str(raw_balance)) if token else str(raw_balance),
+                transfer_count=counts.get(contract, 0),
+                chain=self.service.chain_name
+            ))
+        
+        holdings.sort(key=lambda h: h.transfer_count, reverse=True)
+        return holdings
+    
+    def verify(self, holdings: List[TokenHolding], sample_size: int = 3) -> List[TokenHolding]:
+        """Compare a random sample of holdings against live tokenbalance calls
+        
+        Rebasing and fee-on-transfer tokens legitimately drift from the
+        transfer-derived figure, so mismatches are reported, not corrected.
+        """
+        if sample_size <= 0 or not holdings:
+            return []
+        
+        sample = random.sample(holdings, min(sample_size, len(holdings)))
+        for holding in sample:
+            try:
+                live = self.service.get_token_balance(self.address, holding.token)
+            except Exception:
+                continue
+            holding.verified = live == holding.raw_balance
+            token = self.service.token_registry.get(holding.token)
+            holding.live_balance = token.format_value(str(live)) if token else str(live)
+        
+        return sample
@@ -0,0 +1,188 @@
+import atexit
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from services.degraded import UpstreamUnavailable
+from services.scheduler import RequestScheduler, BACKGROUND, BULK
+from services.storage import file_lock, get_data_dir, load_json, save_json
+
+# Calls per day on the free Etherscan/BscScan plans
+DEFAULT_DAILY_QUOTA = 100000
+
+# Share of the daily quota after which each class is paused until the reset
+THROTTLE_AT = {BULK: 0.8, BACKGROUND: 0.9}
+
+# Counts are flushed to disk after this many calls or seconds, whichever comes first
+SAVE_EVERY_CALLS = 50
+SAVE_EVERY_SECONDS = 30.0
+
+
+def _today() -> str:
+    """Scanner quotas reset at midnight UTC"""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+
+def _seconds_until_reset() -> float:
+    now = datetime.now(timezone.utc)
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (tomorrow - now).total_seconds()
+
+
+class QuotaTracker:
+    """Counts one API key's calls against its daily quota
+    
+    Counts are persisted per key (under a hash of the key, never the key
+    itself) and merged as deltas, so restarts and other server processes
+    using the same key add to the same daily total. As usage crosses
+    THROTTLE_AT, bulk and then background traffic is paused on the key's
+    scheduler until the quota resets, leaving the rest for interactive
+    calls.
+    """
+    
+    def __init__(self, chain_name: str, api_key: str, daily_limit: Optional[int] = None,
+                 scheduler: Optional[RequestScheduler] = None, path: Optional[Path] = None):
+        self.chain_name = chain_name
+        self.daily_limit = daily_limit or DEFAULT_DAILY_QUOTA
+        self.scheduler = scheduler
+        self._key_id = hashlib.sha256(api_key.encode()).hexdigest()[:12]
+        self._path = path
+        self._day = _today()
+        self._used = 0
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        self._throttled = set()
+        self._reset_timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._loaded = False
+        atexit.register(self.save)
+    
+    @property
+    def path(self) -> Path:
+        if self._path is None:
+            directory = get_data_dir() / 'quota'
+            directory.mkdir(parents=True, exist_ok=True)
+            self._path = directory / f"{self.chain_name.lower()}-{self._key_id}.json"
+        return self._path
+    
+    def _read_stored(self) -> int:
+        try:
+            stored = load_json(self.path, default={}) or {}
+        except (OSError, ValueError):
+            return 0
+        return int(stored.get('used', 0)) if stored.get('day') == self._day else 0
+    
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self._loaded = True
+            self._used = self._read_stored()
+            self._update_throttle()
+    
+    def _roll_over(self):
+        """Start a new day's count if the UTC date changed; caller must hold self._lock"""
+        today = _today()
+        if today != self._day:
+            self._day = today
+            self._used = 0
+            self._unsaved = 0
+            self._loaded = True
+            self._update_throttle()
+    
+    def _update_throttle(self):
+        """Pause or resume classes for the current usage; caller must hold self._lock"""
+        if self.scheduler is None:
+            return
+        usage = self._used / self.daily_limit
+        for priority, threshold in THROTTLE_AT.items():
+            if usage >= threshold and priority not in self._throttled:
+                self._throttled.add(priority)
+                self.scheduler.pause(priority)
+            elif usage < threshold and priority in self._throttled:
+                self._throttled.discard(priority)
+                self.scheduler.resume(priority)
+        
+        # Paused classes may have nobody left to notice the reset, so wake them then
+        if self._throttled and self._reset_timer is None:
+            self._reset_timer = threading.Timer(_seconds_until_reset() + 1, self._on_reset)
+            self._reset_timer.daemon = True
+            self._reset_timer.start()
+    
+    def _on_reset(self):
+        with self._lock:
+            self._reset_timer = None
+            self._roll_over()
+    
+    def check(self, priority: str):
+        """Raise UpstreamUnavailable for a class paused until the quota resets
+        
+        Waiting would hold the caller until midnight UTC, so throttled calls
+        fail at once with the reason instead.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            self._roll_over()
+            if priority not in self._throttled:
+                return
+            percent = 100.0 * self._used / self.daily_limit
+        hours, rest = divmod(int(_seconds_until_reset()), 3600)
+        raise UpstreamUnavailable(
+            f"{self.chain_name} {priority} calls are paused at {percent:.0f}% of the daily API quota; "
+            f"it resets in {hours}h {rest // 60:02d}m"
+        )
+    
+    def record(self, calls: int = 1):
+        """Count outgoing calls"""
+        with self._lock:
+            self._ensure_loaded()
+            self._roll_over()
+            self._used += calls
+            self._unsaved += calls
+            self._update_throttle()
+            due = self._unsaved >= SAVE_EVERY_CALLS or time.monotonic() - self._saved_at >= SAVE_EVERY_SECONDS
+        if due:
+            self.save()
+    
+    def mark_exhausted(self):
+        """The scanner said the daily limit is reached; trust it over our count"""
+        with self._lock:
+            self._ensure_loaded()
+            if self._used < self.daily_limit:
+                self._unsaved += self.daily_limit - self._used
+                self._used = self.daily_limit
+            self._update_throttle()
+        self.save()
+    
+    def save(self):
+        """Merge unsaved calls into the stored daily total"""
+        with self._lock:
+            if not self._unsaved:
+                return
+            delta, self._unsaved = self._unsaved, 0
+            self._saved_at = time.monotonic()
+            day = self._day
+            try:
+                # Other processes using the key may have added calls since we last looked
+                with file_lock(self.path):
+                    total = self._read_stored() + delta
+                    save_json(self.path, {'day': day, 'used': total, 'limit': self.daily_limit})
+                self._used = max(self._used, total)
+            except OSError:
+                self._unsaved += delta
+    
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            self._ensure_loaded()
+            self._roll_over()
+            return {
+                'chain': self.chain_name,
+                'day': self._day,
+                'used': self._used,
+                'limit': self.daily_limit,
+                'remaining': max(0, self.daily_limit - self._used),
+                'percent_used': round(100.0 * self._used / self.daily_limit, 2),
+                'resets_in_seconds': int(_seconds_until_reset()),
+                'throttled': sorted(self._throttled)
+            }
@@ -0,0 +1,63 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.base_scanner import BaseScannerService
+from services.cache import estimate_size
+
+
+class RecentBlocks:
+    """Rows of a synced history that are not final yet, grouped by block
+    
+    Each block keeps the hash it had when it was synced. A reorg replaces a
+    suffix of the chain, so it is enough to check the newest block's hash to
+    notice one; walking back through the older hashes then finds the last
+    block the local history still shares with the chain. Blocks at or below
+    the finalized boundary are dropped, as they can no longer change.
+    """
+    
+    def __init__(self):
+        self._blocks: Dict[int, Tuple[Optional[str], List[Dict[str, Any]]]] = {}
+        self.final_through = -1
+    
+    def __len__(self) -> int:
+        return len(self._blocks)
+    
+    def estimated_size(self) -> int:
+        return estimate_size(self._blocks)
+    
+    def add(self, block: int, row: Dict[str, Any]):
+        _, rows = self._blocks.setdefault(block, (row.get('blockHash') or None, []))
+        rows.append(row)
+    
+    def newest(self) -> Optional[int]:
+        return max(self._blocks) if self._blocks else None
+    
+    def set_hash(self, block: int, block_hash: Optional[str]):
+        if block in self._blocks:
+            self._blocks[block] = (block_hash, self._blocks[block][1])
+    
+    def needs_hash(self, block: int) -> bool:
+        return block in self._blocks and self._blocks[block][0] is None
+    
+    def prune(self, boundary: int):
+        """Forget blocks at or below the finalized boundary"""
+        if boundary <= self.final_through:
+            return
+        for block in [b for b in self._blocks if b <= boundary]:
+            del self._blocks[block]
+        self.final_through = boundary
+    
+    def find_fork(self, service: BaseScannerService) -> Optional[int]:
+        """Highest block to keep after a reorg, or None if the newest block is still canonical"""
+        blocks = [b for b in sorted(self._blocks, reverse=True) if self._blocks[b][0] is not None]
+        for block in blocks:
+            if service.get_block_hash(block) == self._blocks[block][0].lower():
+                return None if block == blocks[0] else block
+        # Nothing above the finalized boundary survived
+        return self.final_through if blocks else None
+    
+    def rollback(self, keep_through: int) -> List[Dict[str, Any]]:
+        """Remove and return the rows of every block after keep_through, newest first"""
+        removed = []
+        for block in sorted((b for b in self._blocks if b > keep_through), reverse=True):
+            removed.extend(reversed(self._blocks.pop(block)[1]))
+        return removed
@@ -0,0 +1,158 @@
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+BULK = 'bulk'
+
+PRIORITIES = (INTERACTIVE, BACKGROUND, BULK)
+
+# Relative share of the rate budget each class gets while all are busy
+DEFAULT_WEIGHTS = {INTERACTIVE: 8.0, BACKGROUND: 3.0, BULK: 1.0}
+
+_current_priority: contextvars.ContextVar = contextvars.ContextVar('request_priority', default=INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority: str) -> Iterator[None]:
+    """Run the enclosed scanner calls under a priority class"""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority '{priority}'. Use one of {list(PRIORITIES)}")
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> str:
+    return _current_priority.get()
+
+
+def weights_from_env() -> Dict[str, float]:
+    """Parse SCHEDULER_WEIGHTS, for example interactive=8,background=3,bulk=1"""
+    weights = dict(DEFAULT_WEIGHTS)
+    for part in (os.getenv('SCHEDULER_WEIGHTS') or '').split(','):
+        name, _, value = part.partition('=')
+        if name.strip() in weights and value.strip():
+            weights[name.strip()] = max(float(value), 0.001)
+    return weights
+
+
+class RequestScheduler:
+    """Shares one API key's rate budget between priority classes
+    
+    Tokens refill at the key's rate. When one is available it goes to the
+    backlogged class with the lowest virtual time, and that class's clock
+    advances by 1 / weight. Busy classes therefore split throughput by
+    weight, an idle class cannot bank credit, and a freshly arriving
+    interactive call is served at the next token even while thousands of
+    bulk calls are queued. A class can also be paused outright, which
+    holds its callers until it is resumed.
+    """
+    
+    def __init__(self, rate: float, burst: Optional[int] = None, weights: Optional[Dict[str, float]] = None):
+        if rate <= 0:
+            raise ValueError("Rate limit must be positive")
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1, int(rate)))
+        self.weights = dict(weights or weights_from_env())
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._queues: Dict[str, Deque[object]] = {p: deque() for p in PRIORITIES}
+        self._vtime: Dict[str, float] = {p: 0.0 for p in PRIORITIES}
+        self._clock = 0.0
+        self._paused: Dict[str, bool] = {p: False for p in PRIORITIES}
+        self._granted: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        self._waited: Dict[str, float] = {p: 0.0 for p in PRIORITIES}
+        self._cond = threading.Condition()
+    
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def _next_class(self) -> Optional[str]:
+        """The backlogged, unpaused class due for the next token"""
+        candidates = [p for p in PRIORITIES if self._queues[p] and not self._paused[p]]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda p: (self._vtime[p], PRIORITIES.index(p)))
+    
+    def acquire(self, priority: Optional[str] = None, timeout: Optional[float] = None) -> float:
+        """Block until the calling class is granted a request slot; returns seconds waited
+        
+        With a timeout, gives up the place in the queue and raises
+        TimeoutError once that many seconds pass without a grant.
+        """
+        priority = priority or current_priority()
+        if priority not in PRIORITIES:
+            priority = INTERACTIVE
+        ticket = object()
+        started = time.monotonic()
+        
+        with self._cond:
+            queue = self._queues[priority]
+            if not queue:
+                # A class returning from idle starts at the current clock, not with banked credit
+                self._vtime[priority] = max(self._vtime[priority], self._clock)
+            queue.append(ticket)
+            
+            try:
+                while True:
+                    self._refill(time.monotonic())
+                    if self._tokens >= 1 and queue[0] is ticket and self._next_class() == priority:
+                        self._tokens -= 1
+                        queue.popleft()
+                        self._clock = self._vtime[priority]
+                        self._vtime[priority] += 1.0 / self.weights.get(priority, 1.0)
+                        self._granted[priority] += 1
+                        waited = time.monotonic() - started
+                        self._waited[priority] += waited
+                        self._cond.notify_all()
+                        return waited
+                    
+                    # Re-check at least once per token interval in case a wake-up was missed
+                    wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 1.0 / self.rate
+                    if timeout is not None:
+                        left = started + timeout - time.monotonic()
+                        if left <= 0:
+                            raise TimeoutError(f"No {priority} request slot within {timeout:.1f}s")
+                        wait = min(wait, left)
+                    self._cond.wait(wait)
+            except BaseException:
+                if ticket in queue:
+                    queue.remove(ticket)
+                    self._cond.notify_all()
+                raise
+    
+    def pause(self, priority: str):
+        """Preempt a class: its callers wait until resume() is called"""
+        with self._cond:
+            self._paused[priority] = True
+    
+    def resume(self, priority: str):
+        with self._cond:
+            self._paused[priority] = False
+            self._cond.notify_all()
+    
+    def is_paused(self, priority: str) -> bool:
+        with self._cond:
+            return self._paused[priority]
+    
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Queue depth, grants and mean wait per class"""
+        with self._cond:
+            return {
+                p: {
+                    'queued': len(self._queues[p]),
+                    'granted': self._granted[p],
+                    'mean_wait': self._waited[p] / self._granted[p] if self._granted[p] else 0.0,
+                    'paused': self._paused[p]
+                }
+                for p in PRIORITIES
+            }
@@ -0,0 +1,202 @@
+import atexit
+import json
+import os
+import re
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from services.abi_decoder import canonical_type, parse_abi, keccak256
+from services.storage import get_data_dir, write_atomic
+
+# On-disk layout: magic, then (selector u32, length u16, utf-8 signature) records
+_MAGIC = b'SEL1'
+_RECORD_HEADER = struct.Struct('>IH')
+
+_SELECTOR_RE = re.compile(r'^0x[0-9a-fA-F]{8}$')
+_SIGNATURE_RE = re.compile(r'^[A-Za-z_$][A-Za-z0-9_$]*\(.*\)$')
+
+# New selectors are flushed to disk after this many or this many seconds, whichever comes first
+SAVE_EVERY_CHANGES = 200
+SAVE_EVERY_SECONDS = 60.0
+
+
+def function_selector(signature: str) -> str:
+    """Return the 0x-prefixed 4-byte selector of a canonical function signature"""
+    return '0x' + keccak256(signature)[:4].hex()
+
+
+class SelectorIndex:
+    """Maps 4-byte function selectors to signatures for decoding tx inputs
+    
+    Entries come from every ABI the server fetches plus an optional
+    signature dataset (SELECTOR_DATASET). Lookups are a single dict probe
+    on the first ten characters of the input, so annotating history rows
+    costs next to nothing. Selectors learned from ABIs are written out in
+    batches of SAVE_EVERY_CHANGES or every SAVE_EVERY_SECONDS, and at exit.
+    """
+    
+    def __init__(self, path: Optional[Path] = None, dataset: Optional[str] = None):
+        self._path = path
+        self._dataset = dataset if dataset is not None else os.getenv('SELECTOR_DATASET')
+        self._selectors: Dict[str, str] = {}
+        self._loaded = False
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        self._lock = threading.Lock()
+        atexit.register(self.save)
+    
+    @property
+    def path(self) -> Path:
+        if self._path is None:
+            self._path = get_data_dir() / 'selectors.bin'
+        return self._path
+    
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            self._read(self.path)
+        except OSError:
+            pass
+        
+        # Re-import the dataset only when it is newer than the saved index
+        if self._dataset and os.path.exists(self._dataset):
+            try:
+                stale = not self.path.exists() or os.path.getmtime(self._dataset) > os.path.getmtime(self.path)
+            except OSError:
+                stale = True
+            if stale:
+                self._import_file(self._dataset)
+                # Save right away so the next start finds the index newer than the dataset
+                if self._unsaved and write_atomic(self.path, self._serialize()):
+                    self._unsaved = 0
+                    self._saved_at = time.monotonic()
+    
+    def _read(self, path: Path):
+        with open(path, 'rb') as f:
+            blob = f.read()
+        if not blob.startswith(_MAGIC):
+            return
+        offset = len(_MAGIC)
+        while offset + _RECORD_HEADER.size <= len(blob):
+            selector, length = _RECORD_HEADER.unpack_from(blob, offset)
+            offset += _RECORD_HEADER.size
+            signature = blob[offset:offset + length].decode('utf-8', errors='replace')
+            offset += length
+            self._selectors.setdefault(f"0x{selector:08x}", signature)
+    
+    def _add(self, selector: str, signature: str, override: bool):
+        selector = selector.lower()
+        if override or selector not in self._selectors:
+            if self._selectors.get(selector) != signature:
+                self._selectors[selector] = signature
+                self._unsaved += 1
+    
+    def register_abi(self, abi: Any) -> int:
+        """Add every function in an ABI, returning how many were indexed; saves once enough changed"""
+        functions = [entry for entry in parse_abi(abi) if entry.get('type', 'function') == 'function' and entry.get('name')]
+        with self._lock:
+            self._ensure_loaded()
+            for entry in functions:
+                signature = f"{entry['name']}({','.join(canonical_type(p) for p in entry.get('inputs', []))})"
+                # Signatures from real ABIs win over colliding dataset entries
+                self._add(function_selector(signature), signature, override=True)
+            due = self._unsaved >= SAVE_EVERY_CHANGES or \
+                (self._unsaved and time.monotonic() - self._saved_at >= SAVE_EVERY_SECONDS)
+        if due:
+            self.save()
+        return len(functions)
+    
+    def _import_file(self, path: str) -> int:
+        """Import a dataset without taking the lock; see import_signatures"""
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        
+        count = 0
+        stripped = text.lstrip()
+        if stripped.startswith('{'):
+            for selector, signature in json.loads(stripped).items():
+                if isinstance(signature, list):
+                    signature = signature[0] if signature else ''
+                if _SELECTOR_RE.match(selector) and signature:
+                    self._add(selector, signature, override=False)
+                    count += 1
+            return count
+        
+        for line in text.splitlines():
+            parts = line.strip().split(None, 1)
+            if not parts or parts[0].startswith('#'):
+                continue
+            if len(parts) == 2 and _SELECTOR_RE.match(parts[0]):
+                self._add(parts[0], parts[1].strip(), override=False)
+            elif _SIGNATURE_RE.match(parts[0]):
+                self._add(function_selector(parts[0]), parts[0], override=False)
+            else:
+                continue
+            count += 1
+        return count
+    
+    def import_signatures(self, path: str) -> int:
+        """Import a signature dataset
+        
+        Accepts a JSON object of selector -> signature, or text with one
+        "0xselector signature" or bare "signature" per line.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            count = self._import_file(path)
+        self.save()
+        return count
+    
+    def lookup(self, data: Optional[str]) -> Optional[str]:
+        """Return the signature for calldata (or a bare selector), if known"""
+        if not data or len(data) < 10:
+            return None
+        if not self._loaded:
+            with self._lock:
+                self._ensure_loaded()
+        return self._selectors.get(data[:10].lower())
+    
+    def _serialize(self) -> bytes:
+        """Encode every entry; caller must hold self._lock"""
+        records = [_MAGIC]
+        for selector, signature in self._selectors.items():
+            encoded = signature.encode('utf-8')[:0xFFFF]
+            records.append(_RECORD_HEADER.pack(int(selector, 16), len(encoded)))
+            records.append(encoded)
+        return b''.join(records)
+    
+    def save(self):
+        """Write the index in its compact binary form if it changed"""
+        with self._lock:
+            if not self._unsaved:
+                return
+            blob = self._serialize()
+            changes, self._unsaved = self._unsaved, 0
+            self._saved_at = time.monotonic()
+        
+        if not write_atomic(self.path, blob):
+            with self._lock:
+                self._unsaved += changes
+    
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._selectors)
+
+
+_default_index: Optional[SelectorIndex] = None
+_default_lock = threading.Lock()
+
+
+def default_selector_index() -> SelectorIndex:
+    """The process-wide selector index; selectors are the same on every chain"""
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = SelectorIndex()
+        return _default_index
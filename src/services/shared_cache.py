@@ -0,0 +1,206 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional
+
+from services.cache import TTLCache
+from services.storage import get_data_dir
+from services.transport import decode_json
+
+_MISSING = object()
+
+# Expired and surplus rows are pruned once every this many writes
+PRUNE_EVERY = 200
+
+
+class SQLiteCache:
+    """TTL cache in a SQLite file shared by every server process on the host
+    
+    Drop-in for TTLCache where values are JSON-serializable. The database
+    runs in WAL mode, so readers never block the single writer, and each
+    thread keeps its own connection. Entries are namespaced (one namespace
+    per chain) because identical API params mean different things on
+    different scanners. Expiry uses wall-clock time so it is comparable
+    between processes. Database errors degrade to cache misses.
+    
+    Each row records the bytes of its key and JSON value. With max_bytes,
+    pruning keeps a namespace under that many bytes by dropping its
+    oldest rows, and values bigger than the whole budget are not stored.
+    """
+    
+    def __init__(self, namespace: str, path: Optional[Path] = None,
+                 max_entries: int = 50000, default_ttl: Optional[float] = 60.0,
+                 max_bytes: Optional[int] = None):
+        self.namespace = namespace
+        self.path = Path(path) if path is not None else get_data_dir() / 'cache.sqlite3'
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+        self.errors = 0
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                ' key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, stored_at REAL NOT NULL,'
+                ' size INTEGER NOT NULL DEFAULT 0)'
+            )
+            try:
+                # Databases created before rows were sized
+                conn.execute('ALTER TABLE entries ADD COLUMN size INTEGER NOT NULL DEFAULT 0')
+            except sqlite3.OperationalError:
+                pass
+            conn.execute('CREATE INDEX IF NOT EXISTS entries_stored_at ON entries (stored_at)')
+            self._local.conn = conn
+        return conn
+    
+    def _key(self, key: Hashable) -> str:
+        return self.namespace + '|' + json.dumps(key, separators=(',', ':'), default=str)
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live entry, or default if it is missing, expired or unreadable"""
+        try:
+            row = self._connect().execute(
+                'SELECT value, expires_at FROM entries WHERE key = ?', (self._key(key),)
+            ).fetchone()
+        except sqlite3.Error:
+            self.errors += 1
+            row = None
+        
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            self.misses += 1
+            return default
+        self.hits += 1
+        return decode_json(row[0])
+    
+    def set(self, key: Hashable, value: Any, ttl: Any = _MISSING):
+        """Store a JSON-serializable value; ttl defaults to the cache's default_ttl"""
+        if ttl is _MISSING:
+            ttl = self.default_ttl
+        now = time.time()
+        try:
+            stored_key = self._key(key)
+            encoded = json.dumps(value, separators=(',', ':'))
+            size = len(stored_key) + len(encoded)
+            if self.max_bytes is not None and size > self.max_bytes:
+                self.rejected += 1
+                self._connect().execute('DELETE FROM entries WHERE key = ?', (stored_key,))
+                return
+            self._connect().execute(
+                'INSERT OR REPLACE INTO entries (key, value, expires_at, stored_at, size) VALUES (?, ?, ?, ?, ?)',
+                (stored_key, encoded, now + ttl if ttl is not None else None, now, size)
+            )
+        except (sqlite3.Error, TypeError, ValueError):
+            self.errors += 1
+            return
+        
+        with self._lock:
+            self._writes += 1
+            due = self._writes % PRUNE_EVERY == 0
+        if due:
+            self.prune()
+    
+    def prune(self):
+        """Drop expired rows, then this namespace's oldest rows beyond max_entries and max_bytes"""
+        low, high = self.namespace + '|', self.namespace + '}'
+        try:
+            conn = self._connect()
+            removed = conn.execute('DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?',
+                                   (time.time(),)).rowcount
+            surplus = len(self) - self.max_entries
+            if surplus > 0:
+                removed += conn.execute(
+                    'DELETE FROM entries WHERE key IN (SELECT key FROM entries WHERE key >= ? AND key < ?'
+                    ' ORDER BY stored_at LIMIT ?)',
+                    (low, high, surplus)
+                ).rowcount
+            excess = self.disk_bytes() - self.max_bytes if self.max_bytes is not None else 0
+            if excess > 0:
+                # Oldest rows until their sizes add up to the excess
+                removed += conn.execute(
+                    'DELETE FROM entries WHERE key IN (SELECT key FROM (SELECT key, size,'
+                    ' SUM(size) OVER (ORDER BY stored_at, key ROWS UNBOUNDED PRECEDING) AS running'
+                    ' FROM entries WHERE key >= ? AND key < ?) WHERE running - size < ?)',
+                    (low, high, excess)
+                ).rowcount
+            self.evictions += max(0, removed)
+        except sqlite3.Error:
+            self.errors += 1
+    
+    def disk_bytes(self) -> int:
+        """Bytes of keys and values stored in this namespace"""
+        try:
+            return self._connect().execute(
+                'SELECT COALESCE(SUM(size), 0) FROM entries WHERE key >= ? AND key < ?',
+                (self.namespace + '|', self.namespace + '}')
+            ).fetchone()[0]
+        except sqlite3.Error:
+            return 0
+    
+    def delete(self, key: Hashable):
+        try:
+            self._connect().execute('DELETE FROM entries WHERE key = ?', (self._key(key),))
+        except sqlite3.Error:
+            self.errors += 1
+    
+    def clear(self):
+        """Remove this namespace's entries"""
+        try:
+            self._connect().execute('DELETE FROM entries WHERE key >= ? AND key < ?',
+                                    (self.namespace + '|', self.namespace + '}'))
+        except sqlite3.Error:
+            self.errors += 1
+    
+    def __len__(self) -> int:
+        try:
+            return self._connect().execute(
+                'SELECT COUNT(*) FROM entries WHERE key >= ? AND key < ?',
+                (self.namespace + '|', self.namespace + '}')
+            ).fetchone()[0]
+        except sqlite3.Error:
+            return 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count, stored bytes and this process's hit/miss/eviction counters"""
+        return {
+            'entries': len(self),
+            'backend': 'sqlite',
+            'disk_bytes': self.disk_bytes(),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'rejected': self.rejected,
+            'errors': self.errors
+        }
+
+
+def create_response_cache(namespace: str, max_entries: int, default_ttl: Optional[float],
+                          max_bytes: Optional[int] = None):
+    """Build the response cache selected by CACHE_BACKEND (memory or sqlite)
+    
+    max_entries and max_bytes bound either backend; the SQLite cache
+    applies them per namespace, to the bytes it stores on disk.
+    """
+    backend = (os.getenv('CACHE_BACKEND') or 'memory').lower()
+    if backend == 'sqlite':
+        path = os.getenv('CACHE_PATH')
+        return SQLiteCache(namespace, Path(path) if path else None, max_entries=max_entries, default_ttl=default_ttl,
+                           max_bytes=max_bytes)
+    if backend != 'memory':
+        raise ValueError(f"Unknown CACHE_BACKEND '{backend}'. Use 'memory' or 'sqlite'")
+    return TTLCache(max_entries=max_entries, default_ttl=default_ttl, max_bytes=max_bytes)
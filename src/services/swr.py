@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from services.cache import TTLCache, byte_budget
+from services.degraded import stale_count
+from services.scheduler import request_priority, BACKGROUND
+
+# Per endpoint (fresh seconds, max stale seconds). Within the fresh window a
+# cached value is served as is; up to the stale limit it is served at once and
+# refreshed in the background; beyond that the caller waits for a fresh fetch.
+DEFAULT_WINDOWS: Dict[str, Tuple[float, float]] = {
+    'check_balance': (15.0, 300.0),
+    'check_balance_all_chains': (15.0, 300.0),
+    'search_address_activity': (60.0, 900.0)
+}
+
+
+def windows_from_env() -> Dict[str, Tuple[float, float]]:
+    """Parse SWR_WINDOWS, for example check_balance=15:300,search_address_activity=0:0"""
+    windows = dict(DEFAULT_WINDOWS)
+    for part in (os.getenv('SWR_WINDOWS') or '').split(','):
+        name, _, value = part.partition('=')
+        if name.strip() in windows and value.strip():
+            fresh, _, stale = value.partition(':')
+            fresh_seconds = max(0.0, float(fresh))
+            windows[name.strip()] = (fresh_seconds, max(fresh_seconds, float(stale or fresh_seconds)))
+    return windows
+
+
+class StaleWhileRevalidate:
+    """Serves recent results immediately and refreshes them off the request path
+    
+    get() returns the value together with its age in seconds, so callers
+    can tell the user how old an answer is. Refreshes run on a small
+    thread pool under the background priority class, and at most one
+    refresh per key is in flight at a time.
+    """
+    
+    def __init__(self, max_entries: int = 4096, windows: Optional[Dict[str, Tuple[float, float]]] = None,
+                 refresh_workers: int = 2):
+        self.windows = dict(windows or windows_from_env())
+        longest = max((stale for _, stale in self.windows.values()), default=0.0)
+        self._cache = TTLCache(max_entries=max_entries, default_ttl=longest or None, max_bytes=byte_budget('swr'))
+        self._pending: Set[Hashable] = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='swr-refresh')
+    
+    def _store(self, key: Hashable, value: Any):
+        self._cache.set(key, (value, time.monotonic()))
+    
+    def _refresh(self, key: Hashable, loader: Callable[[], Any]):
+        try:
+            with request_priority(BACKGROUND):
+                self._store(key, loader())
+        except Exception:
+            # Keep serving the previous value; the next stale read retries
+            pass
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+    
+    def get(self, endpoint: str, key: Hashable, loader: Callable[[], Any]) -> Tuple[Any, float]:
+        """Return (value, age in seconds) for key, using endpoint's freshness window"""
+        fresh, max_stale = self.windows.get(endpoint, (0.0, 0.0))
+        entry = self._cache.get(key) if max_stale > 0 else None
+        
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age <= max_stale:
+                if age > fresh:
+                    with self._lock:
+                        schedule = key not in self._pending
+                        self._pending.add(key)
+                    if schedule:
+                        self._executor.submit(self._refresh, key, loader)
+                return value, age
+        
+        before = stale_count()
+        value = loader()
+        # A loader answered from degraded-mode fallbacks is not a fresh value
+        if stale_count() == before:
+            self._store(key, value)
+        return value, 0.0
+    
+    def invalidate(self, key: Hashable):
+        self._cache.delete(key)
+    
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
@@ -0,0 +1,113 @@
+import sys
+import threading
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Dict, Optional
+
+from services.storage import get_data_dir, load_json, save_json
+
+
+class TokenInfo:
+    """Metadata shared by every transfer of a single token contract"""
+    
+    __slots__ = ('address', 'name', 'symbol', 'decimals', 'scale')
+    
+    def __init__(self, address: str, name: str, symbol: str, decimals: int):
+        self.address = sys.intern(address)
+        self.name = sys.intern(name)
+        self.symbol = sys.intern(symbol)
+        self.decimals = decimals
+        self.scale = Decimal(10) ** decimals
+    
+    def format_value(self, value: str) -> str:
+        """Scale a raw integer token amount by this token's decimals"""
+        if not value or value == '0':
+            return '0'
+        try:
+            return str(Decimal(value) / self.scale)
+        except InvalidOperation:
+            return value
+    
+    def to_dict(self) -> Dict[str, object]:
+        return {'name': self.name, 'symbol': self.symbol, 'decimals': self.decimals}
+
+
+def _parse_decimals(decimals: Optional[str]) -> int:
+    """Parse the tokenDecimal field, defaulting to 18 like the scanner UIs do"""
+    try:
+        return int(decimals) if decimals else 18
+    except (ValueError, TypeError):
+        return 18
+
+
+class TokenRegistry:
+    """Per-chain registry of token metadata keyed by contract address"""
+    
+    def __init__(self, chain_name: str, path: Optional[Path] = None):
+        self.chain_name = chain_name
+        self._path = path
+        self._tokens: Dict[str, TokenInfo] = {}
+        self._loaded = False
+        self._dirty = False
+        self._lock = threading.Lock()
+    
+    @property
+    def path(self) -> Path:
+        if self._path is None:
+            self._path = get_data_dir() / 'tokens' / f"{self.chain_name.lower()}.json"
+        return self._path
+    
+    def _ensure_loaded(self):
+        """Load persisted entries on first use"""
+        if self._loaded:
+            return
+        try:
+            stored = load_json(self.path, default={}) or {}
+        except OSError:
+            stored = {}
+        for address, meta in stored.items():
+            self._tokens[address] = TokenInfo(
+                address,
+                meta.get('name', ''),
+                meta.get('symbol', ''),
+                _parse_decimals(meta.get('decimals'))
+            )
+        self._loaded = True
+    
+    def get(self, contract_address: str) -> Optional[TokenInfo]:
+        """Look up a token by contract address"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._tokens.get(contract_address.lower())
+    
+    def observe(self, contract_address: str, name: str, symbol: str, decimals: Optional[str]) -> TokenInfo:
+        """Return the registry entry for a token, recording it if unseen"""
+        key = contract_address.lower()
+        with self._lock:
+            self._ensure_loaded()
+            info = self._tokens.get(key)
+            if info is not None and (info.name or not name):
+                return info
+            info = TokenInfo(key, name or '', symbol or '', _parse_decimals(decimals))
+            self._tokens[key] = info
+            self._dirty = True
+            return info
+    
+    def save(self):
+        """Persist the registry if anything changed since the last save"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {address: info.to_dict() for address, info in self._tokens.items()}
+            self._dirty = False
+        try:
+            save_json(self.path, data)
+        except OSError:
+            # Persistence is an optimisation; a read-only disk must not break lookups
+            with self._lock:
+                self._dirty = True
+    
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._tokens)
@@ -0,0 +1,67 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Threads running blocking tool work
+DEFAULT_TOOL_WORKERS = 16
+
+# Calls allowed to wait for a worker, per worker, before new calls are turned away
+DEFAULT_QUEUE_PER_WORKER = 4
+
+
+class ServerBusy(Exception):
+    """Raised when the tool pool is saturated and a call is turned away"""
+
+
+class BoundedToolPool:
+    """Runs blocking tool calls off the event loop on a fixed thread pool
+    
+    At most workers calls run at once and at most max_queue more wait for
+    a worker. Beyond that, run() raises ServerBusy immediately, so a
+    saturated server sheds load instead of growing an unbounded backlog.
+    Each call runs in a copy of the caller's context and keeps its
+    deadline and priority class.
+    """
+    
+    def __init__(self, workers: Optional[int] = None, max_queue: Optional[int] = None):
+        self.workers = workers or int(os.getenv('MCP_TOOL_WORKERS') or DEFAULT_TOOL_WORKERS)
+        if max_queue is None:
+            configured = os.getenv('MCP_TOOL_QUEUE')
+            max_queue = int(configured) if configured else self.workers * DEFAULT_QUEUE_PER_WORKER
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='tool-worker')
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+    
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run func on the pool and await its result, or raise ServerBusy if saturated"""
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise ServerBusy(f"Server busy ({self._in_flight} calls in progress), retry shortly")
+            self._in_flight += 1
+        
+        try:
+            context = contextvars.copy_context()
+            call = functools.partial(context.run, func, *args, **kwargs)
+            return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self.completed += 1
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'in_flight': self._in_flight,
+                'completed': self.completed,
+                'rejected': self.rejected
+            }
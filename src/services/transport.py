@@ -0,0 +1,49 @@
+import json
+import os
+from typing import Any, Callable, Optional
+
+import requests
+from urllib3.util.request import ACCEPT_ENCODING
+
+# Decoder chosen by select_json_backend(); MCP_JSON_BACKEND can force one
+_json_loads: Optional[Callable[[bytes], Any]] = None
+json_backend_name = ''
+
+
+def select_json_backend(preferred: Optional[str] = None) -> str:
+    """Pick the fastest available JSON decoder, falling back to the standard library"""
+    global _json_loads, json_backend_name
+    preferred = (preferred or os.getenv('MCP_JSON_BACKEND') or 'auto').lower()
+    
+    if preferred in ('auto', 'orjson'):
+        try:
+            import orjson
+            _json_loads, json_backend_name = orjson.loads, 'orjson'
+            return json_backend_name
+        except ImportError:
+            if preferred == 'orjson':
+                raise Exception("MCP_JSON_BACKEND=orjson requires orjson (pip install orjson)")
+    
+    _json_loads, json_backend_name = json.loads, 'json'
+    return json_backend_name
+
+
+def decode_json(raw: bytes) -> Any:
+    """Decode a response body straight from bytes"""
+    if _json_loads is None:
+        select_json_backend()
+    return _json_loads(raw)
+
+
+def create_session() -> requests.Session:
+    """A pooled session that asks scanners for compressed responses
+    
+    urllib3's ACCEPT_ENCODING lists br only when a brotli package is
+    installed, so we never advertise an encoding we cannot decode.
+    """
+    session = requests.Session()
+    session.headers.update({
+        'Accept-Encoding': ACCEPT_ENCODING,
+        'Accept': 'application/json'
+    })
+    return session
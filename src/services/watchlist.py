@@ -0,0 +1,252 @@
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+from models import WatchlistChange
+from services.base_scanner import BaseScannerService, BALANCEMULTI_BATCH
+from services.scheduler import request_priority, BACKGROUND
+from services.storage import get_data_dir, load_json, save_json
+
+# Seconds between polling rounds
+DEFAULT_POLL_INTERVAL = 60.0
+
+# Share of each key's request budget the watchlist may spend
+DEFAULT_BUDGET_FRACTION = 0.5
+
+# Changes kept (and persisted with the cursor) for get_watchlist_changes
+MAX_CHANGES = 10000
+
+
+class WatchState:
+    """Last observed state of one watched address"""
+    
+    __slots__ = ('balance', 'last_block', 'checked_at')
+    
+    def __init__(self, balance: Optional[int] = None, last_block: Optional[int] = None):
+        self.balance = balance
+        self.last_block = last_block
+        self.checked_at = 0.0
+
+
+class Watchlist:
+    """Polls watched addresses and records only what changed
+    
+    Balances are read in balancemulti batches. New activity is found by
+    asking for transactions after the last block seen, with addresses
+    whose balance moved probed first and the rest round-robin by age.
+    Each round is capped at a fraction of the key's rate budget, and
+    changes are exposed through a monotonically increasing cursor. The
+    newest MAX_CHANGES changes are saved with the cursor, so a cursor
+    survives restarts; retained_from tells callers when older ones were
+    dropped.
+    """
+    
+    def __init__(self, services: Dict[str, BaseScannerService], interval: Optional[float] = None,
+                 budget_fraction: Optional[float] = None, path: Optional[Path] = None):
+        self.services = services
+        self.interval = interval if interval is not None else float(os.getenv('WATCHLIST_POLL_INTERVAL') or DEFAULT_POLL_INTERVAL)
+        self.budget_fraction = budget_fraction if budget_fraction is not None else float(os.getenv('WATCHLIST_BUDGET') or DEFAULT_BUDGET_FRACTION)
+        self._path = path
+        self._watched: Dict[str, Dict[str, WatchState]] = {}
+        self._balance_offsets: Dict[str, int] = {}
+        self._changes: Deque[WatchlistChange] = deque(maxlen=MAX_CHANGES)
+        self._cursor = 0
+        # Every change after this cursor is still in self._changes
+        self._retained_from = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._load()
+    
+    @property
+    def path(self) -> Path:
+        if self._path is None:
+            self._path = get_data_dir() / 'watchlist.json'
+        return self._path
+    
+    def _load(self):
+        try:
+            stored = load_json(self.path, default={}) or {}
+        except OSError:
+            return
+        self._cursor = int(stored.get('cursor', 0))
+        if 'changes' in stored:
+            self._changes.extend(WatchlistChange(**change) for change in stored['changes'])
+            self._retained_from = int(stored.get('retained_from', 0))
+        else:
+            # Saved before changes were persisted; anything up to the cursor is gone
+            self._retained_from = self._cursor
+        for chain, entries in stored.get('chains', {}).items():
+            self._watched[chain] = {
+                address: WatchState(
+                    int(entry['balance']) if entry.get('balance') is not None else None,
+                    entry.get('last_block')
+                )
+                for address, entry in entries.items()
+            }
+    
+    def _save(self):
+        with self._lock:
+            data = {
+                'cursor': self._cursor,
+                'retained_from': self._retained_from,
+                'changes': [change.dict(exclude_none=True) for change in self._changes],
+                'chains': {
+                    chain: {
+                        address: {
+                            'balance': str(state.balance) if state.balance is not None else None,
+                            'last_block': state.last_block
+                        }
+                        for address, state in entries.items()
+                    }
+                    for chain, entries in self._watched.items()
+                }
+            }
+        try:
+            save_json(self.path, data)
+        except OSError:
+            pass
+    
+    def add(self, addresses: List[str], chain: str) -> int:
+        """Start watching addresses on a chain, returning how many were new"""
+        chain = chain.lower()
+        if chain not in self.services:
+            raise ValueError(f"Chain '{chain}' not available. Available chains: {list(self.services.keys())}")
+        added = 0
+        with self._lock:
+            entries = self._watched.setdefault(chain, {})
+            for address in addresses:
+                if address.lower() not in entries:
+                    entries[address.lower()] = WatchState()
+                    added += 1
+        self._save()
+        return added
+    
+    def remove(self, addresses: List[str], chain: str) -> int:
+        """Stop watching addresses on a chain, returning how many were removed"""
+        removed = 0
+        with self._lock:
+            entries = self._watched.get(chain.lower(), {})
+            for address in addresses:
+                if entries.pop(address.lower(), None) is not None:
+                    removed += 1
+        self._save()
+        return removed
+    
+    def watched(self) -> Dict[str, List[str]]:
+        with self._lock:
+            return {chain: sorted(entries) for chain, entries in self._watched.items() if entries}
+    
+    def _record(self, **fields):
+        """Append a change under the lock; caller must hold self._lock"""
+        self._cursor += 1
+        if len(self._changes) == self._changes.maxlen:
+            self._retained_from = self._changes[0].cursor
+        self._changes.append(WatchlistChange(cursor=self._cursor, detected_at=int(time.time()), **fields))
+    
+    def _request_budget(self, service: BaseScannerService) -> int:
+        return max(1, int(service.scheduler.rate * self.interval * self.budget_fraction))
+    
+    def poll_chain(self, chain: str) -> int:
+        """Run one polling round for a chain, returning the number of changes found"""
+        service = self.services[chain]
+        with self._lock:
+            states = dict(self._watched.get(chain, {}))
+        if not states:
+            return 0
+        
+        budget = self._request_budget(service)
+        addresses = list(states)
+        
+        # Balances: a rotating window of batches if the whole list exceeds the budget
+        batch_count = -(-len(addresses) // BALANCEMULTI_BATCH)
+        window = min(batch_count, max(1, budget // 2))
+        offset = self._balance_offsets.get(chain, 0) % batch_count
+        batch_slices = [((offset + i) % batch_count) * BALANCEMULTI_BATCH for i in range(window)]
+        self._balance_offsets[chain] = offset + window
+        polled = [a for start in batch_slices for a in addresses[start:start + BALANCEMULTI_BATCH]]
+        balances = service.get_balances(polled) if polled else {}
+        
+        changes = 0
+        moved = []
+        with self._lock:
+            for address, balance in balances.items():
+                state = states.get(address)
+                if state is None:
+                    continue
+                if state.balance is not None and state.balance != balance:
+                    self._record(chain=chain, address=address, kind='balance',
+                                 old_balance_wei=state.balance, new_balance_wei=balance)
+                    moved.append(address)
+                    changes += 1
+                state.balance = balance
+        
+        # Activity: addresses whose balance moved first, then the least recently checked
+        remaining = budget - window
+        moved_set = set(moved)
+        others = sorted((a for a in addresses if a not in moved_set), key=lambda a: states[a].checked_at)
+        for address in (moved + others)[:max(0, remaining)]:
+            state = states[address]
+            try:
+                if state.last_block is None:
+                    latest = service.get_new_transactions(address, -1, limit=1)
+                    state.last_block = latest[0].block_number if latest else 0
+                else:
+                    new_txs = service.get_new_transactions(address, state.last_block)
+                    if new_txs:
+                        with self._lock:
+                            self._record(chain=chain, address=address, kind='activity',
+                                         new_transactions=len(new_txs),
+                                         latest_block=new_txs[0].block_number,
+                                         latest_transaction=new_txs[0].hash)
+                        state.last_block = max(tx.block_number for tx in new_txs)
+                        changes += 1
+            except Exception:
+                continue
+            state.checked_at = time.time()
+        
+        return changes
+    
+    def poll_once(self) -> int:
+        """Poll every chain once"""
+        changes = 0
+        for chain in list(self.watched()):
+            try:
+                changes += self.poll_chain(chain)
+            except Exception:
+                continue
+        self._save()
+        return changes
+    
+    def _run(self):
+        with request_priority(BACKGROUND):
+            while not self._stop.is_set():
+                self.poll_once()
+                self._stop.wait(self.interval)
+    
+    def start(self):
+        """Start background polling; safe to call repeatedly"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="watchlist-poller", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+    
+    @property
+    def retained_from(self) -> int:
+        """Cursor after which every change is still available"""
+        with self._lock:
+            return self._retained_from
+    
+    def changes_since(self, cursor: int, limit: int = 100) -> Tuple[List[WatchlistChange], int]:
+        """Changes after a cursor, and the cursor to pass next time"""
+        with self._lock:
+            changes = [change for change in self._changes if change.cursor > cursor][:limit]
+            next_cursor = changes[-1].cursor if changes else max(cursor, self._cursor)
+        return changes, next_cursor
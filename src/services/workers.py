@@ -0,0 +1,74 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Sequence
+
+# Fewest rows handed to a worker process at a time; below two chunks the pickling overhead outweighs the parallelism
+MIN_CHUNK_ROWS = 100
+
+# Workers are spawned on every platform; forking a threaded server can copy held locks
+START_METHOD = 'spawn'
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def worker_count() -> int:
+    """Pool size from MCP_WORKER_PROCESSES; 0 keeps all work in-process"""
+    configured = os.getenv('MCP_WORKER_PROCESSES')
+    if configured is not None and configured.strip():
+        return max(0, int(configured))
+    return min(4, max(0, (os.cpu_count() or 1) - 1))
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """The shared worker pool, created on first use, or None if disabled"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = worker_count()
+            if workers <= 0:
+                return None
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(START_METHOD))
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def map_chunks(func: Callable[..., Any], items: Sequence[Any], *args: Any,
+               chunk_size: Optional[int] = None) -> List[Any]:
+    """Run func(*args, chunk) over chunks of items, returning per-chunk results in order
+    
+    func must be a module-level function and items should be compact
+    tuples of primitives so chunks pickle cheaply. By default a batch is
+    split evenly across the workers, in chunks of at least MIN_CHUNK_ROWS.
+    Small inputs, a disabled pool or a broken pool all fall back to a
+    single in-process call, so callers get the same results either way.
+    The calling thread (a tool worker, not the event loop) waits for the
+    chunks; the gain is decoding on several cores at once.
+    """
+    items = list(items)
+    pool = get_process_pool() if len(items) >= 2 * MIN_CHUNK_ROWS else None
+    if pool is None:
+        return [func(*args, items)]
+    if chunk_size is None:
+        chunk_size = max(MIN_CHUNK_ROWS, -(-len(items) // worker_count()))
+    
+    try:
+        futures = [pool.submit(func, *args, items[i:i + chunk_size]) for i in range(0, len(items), chunk_size)]
+        return [future.result() for future in futures]
+    except BrokenProcessPool:
+        shutdown_pool()
+        return [func(*args, items)]
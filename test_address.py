@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+"""
+Tests for address validation and EIP-55 checksums
+
+These run offline; they only exercise services.address and the input models.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from models import AddressInput, WatchlistInput
+from services.address import normalize_address, normalize_addresses
+
+USDC = '0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48'
+
+
+def test_lowercase_and_uppercase_addresses_carry_no_checksum():
+    assert normalize_address(USDC.lower()) == USDC.lower()
+    assert normalize_address('0x' + USDC[2:].upper()) == USDC.lower()
+
+
+def test_correct_checksum_is_accepted():
+    assert normalize_address(USDC) == USDC.lower()
+
+
+def test_bad_checksum_is_rejected():
+    with pytest.raises(ValueError, match='Invalid EIP-55 checksum'):
+        normalize_address('0xA0b86a33E6417c0b8cE4E3aDa22b9a7D3A76b5f6')
+    with pytest.raises(ValueError, match='Invalid EIP-55 checksum for BSC'):
+        normalize_address(USDC[:-1] + 'b', 'BSC')
+
+
+@pytest.mark.parametrize('address', [USDC[:-1], USDC + '0', USDC + '\n', USDC[2:], '0x' + 'g' * 40, None])
+def test_malformed_addresses_are_rejected(address):
+    with pytest.raises(ValueError, match='Invalid Ethereum address format'):
+        normalize_address(address)
+
+
+def test_bulk_validation_reports_every_invalid_address():
+    with pytest.raises(ValueError) as error:
+        normalize_addresses([USDC, '0x123', USDC[:-1] + 'b'])
+    assert '0x123' in str(error.value) and USDC[:-1] + 'b' in str(error.value)
+
+
+def test_models_return_lowercase_addresses():
+    assert AddressInput(address=USDC).address == USDC.lower()
+    assert WatchlistInput(addresses=[USDC, USDC.lower()]).addresses == [USDC.lower()] * 2
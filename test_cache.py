@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+"""
+Tests for the byte-budgeted in-process caches
+
+These run offline and only exercise TTLCache and the budgets it is given.
+"""
+
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from services.cache import TTLCache, byte_budget, parse_size
+
+
+def test_budgets_parse_from_the_environment(monkeypatch):
+    monkeypatch.setenv('CACHE_BUDGETS', 'response=512K, graph=0,abi=2M')
+    assert byte_budget('response') == 512 * 1024
+    assert byte_budget('graph') is None
+    assert byte_budget('abi') == 2 * 1024 * 1024
+    assert byte_budget('finalized') == 16 * 1024 * 1024
+    assert parse_size('1G') == 1024 ** 3
+
+
+def test_largest_least_recently_used_entry_is_evicted_first():
+    cache = TTLCache(max_entries=100, default_ttl=None, max_bytes=1000)
+    cache.set('small', 'x', size=100)
+    cache.set('large', 'x', size=500)
+    cache.set('recent', 'x', size=300)
+    assert cache.get('small') == 'x'
+    
+    cache.set('new', 'x', size=200)
+    assert cache.get('large') is None
+    assert {key for key in ('small', 'recent', 'new') if cache.get(key)} == {'small', 'recent', 'new'}
+    stats = cache.stats()
+    assert stats['bytes'] == 600
+    assert stats['evictions'] == 1
+
+
+def test_expired_entries_go_before_live_ones():
+    cache = TTLCache(max_entries=100, default_ttl=None, max_bytes=1000)
+    cache.set('live', 'x', size=600)
+    cache.set('expired', 'x', ttl=-1, size=100)
+    cache.set('new', 'x', size=350)
+    assert cache.get('live') == 'x'
+    assert cache.stats()['bytes'] == 950
+
+
+def test_value_bigger_than_the_budget_is_rejected():
+    cache = TTLCache(max_entries=100, default_ttl=None, max_bytes=1000)
+    cache.set('kept', 'x', size=400)
+    cache.set('kept', 'y' * 10, size=2000)
+    assert cache.get('kept') is None
+    stats = cache.stats()
+    assert stats['rejected'] == 1
+    assert stats['bytes'] == 0
+
+
+def test_estimated_sizes_keep_the_cache_under_budget():
+    cache = TTLCache(max_entries=1000, default_ttl=None, max_bytes=64 * 1024)
+    for i in range(200):
+        cache.set(i, [{'blockNumber': str(i), 'input': '0x' + 'ab' * 100}] * 10)
+    stats = cache.stats()
+    assert 0 < stats['bytes'] <= 64 * 1024
+    assert stats['evictions'] == 200 - stats['entries']
+    assert cache.get(199) is not None
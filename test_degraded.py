@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+"""
+Tests for the circuit breaker and the fallback to last good responses
+
+These run offline against a stubbed scanner session (see conftest.py).
+"""
+
+import pytest
+import requests
+
+from conftest import ADDRESS
+from services import degraded
+from services.deadline import DeadlineExceeded, deadline
+from services.degraded import CircuitBreaker, UpstreamUnavailable, track_staleness
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(degraded, 'time', fake)
+    return fake
+
+
+def test_circuit_opens_after_consecutive_failures_and_closes_on_a_good_probe(clock, monkeypatch):
+    monkeypatch.delenv('MCP_OFFLINE', raising=False)
+    breaker = CircuitBreaker('ethereum', failure_threshold=3, reset_after=30.0)
+    
+    breaker.record_failure('ConnectionError')
+    breaker.record_failure('ConnectionError')
+    breaker.check()
+    assert breaker.status()['state'] == 'closed'
+    
+    breaker.record_failure('ConnectionError')
+    assert breaker.status() == {'state': 'open', 'consecutive_failures': 3, 'reason': 'ConnectionError',
+                                'retry_in_seconds': 30}
+    with pytest.raises(UpstreamUnavailable, match='retrying in 30s'):
+        breaker.check()
+    
+    # One probe is let through once the period is over; a failed probe reopens the circuit
+    clock.now += 30
+    breaker.check()
+    with pytest.raises(UpstreamUnavailable):
+        breaker.check()
+    breaker.record_failure('Timeout')
+    assert breaker.status()['reason'] == 'Timeout'
+    
+    clock.now += 30
+    breaker.check()
+    breaker.record_success()
+    breaker.check()
+    assert breaker.status() == {'state': 'closed', 'consecutive_failures': 0, 'reason': '', 'retry_in_seconds': 0}
+
+
+def test_success_resets_the_failure_count(clock, monkeypatch):
+    monkeypatch.delenv('MCP_OFFLINE', raising=False)
+    breaker = CircuitBreaker('ethereum', failure_threshold=3, reset_after=30.0)
+    breaker.record_failure('ConnectionError')
+    breaker.record_failure('ConnectionError')
+    breaker.record_success()
+    breaker.record_failure('ConnectionError')
+    assert breaker.status()['state'] == 'closed'
+
+
+def test_unreachable_scanner_is_answered_from_last_good_response(service, stub):
+    stub.balances[ADDRESS] = 5 * 10 ** 18
+    assert service.get_address_balance(ADDRESS).balance_in_wei == 5 * 10 ** 18
+    
+    stub.error = requests.ConnectionError('connection refused')
+    with track_staleness() as report:
+        for _ in range(service.circuit.failure_threshold):
+            assert service.get_address_balance(ADDRESS).balance_in_wei == 5 * 10 ** 18
+    assert 'connection refused' in report.reasons()[0]
+    assert service.circuit.status()['state'] == 'open'
+    
+    # The open circuit answers without another request reaching the scanner
+    calls = len(stub.calls)
+    with track_staleness() as report:
+        assert service.get_address_balance(ADDRESS).balance_in_wei == 5 * 10 ** 18
+    assert len(stub.calls) == calls
+    assert 'unavailable (ConnectionError)' in report.reasons()[0]
+    
+    # Calls that cannot report staleness fail instead
+    with pytest.raises(Exception, match='unavailable'):
+        service.get_address_balance(ADDRESS)
+
+
+def test_timeout_cut_short_by_a_deadline_does_not_open_the_circuit(service, stub):
+    stub.error = requests.ReadTimeout('read timed out')
+    for _ in range(service.circuit.failure_threshold):
+        with deadline(0.5):
+            with pytest.raises(Exception, match='cut short by the deadline'):
+                service.get_address_balance(ADDRESS)
+    with deadline(0.5):
+        with pytest.raises(DeadlineExceeded):
+            list(service.iter_transactions(ADDRESS))
+    status = service.circuit.status()
+    assert status['state'] == 'closed'
+    assert status['consecutive_failures'] == 0
+    
+    # The same timeout without a deadline still counts against the scanner
+    with pytest.raises(Exception, match='read timed out'):
+        service.get_address_balance(ADDRESS)
+    assert service.circuit.status()['consecutive_failures'] == 1
+
+
+def test_offline_mode_never_calls_the_scanner(service, stub, monkeypatch):
+    monkeypatch.setenv('MCP_OFFLINE', '1')
+    with pytest.raises(Exception, match='offline mode'):
+        service.get_address_balance(ADDRESS)
+    assert stub.calls == []
+    assert service.circuit.status()['state'] == 'offline'
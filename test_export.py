@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+"""
+Tests for resumable bulk export
+
+These run offline against a stubbed scanner session (see conftest.py).
+"""
+
+import json
+
+import pytest
+
+from conftest import ADDRESS, make_row
+from services import exporter
+from services.exporter import export_histories, resolve_output_dir
+
+
+def _export(service, directory):
+    return export_histories({'ethereum': service}, [ADDRESS], ['ethereum'], ['transactions'], 'jsonl', directory)
+
+
+def _exported(directory):
+    with open(directory / 'ethereum' / ADDRESS / 'transactions.jsonl', encoding='utf-8') as f:
+        return [json.loads(line)['blockNumber'] for line in f]
+
+
+@pytest.mark.parametrize('output_dir', ['/tmp/elsewhere', '../elsewhere', 'runs/../../elsewhere'])
+def test_output_outside_the_exports_directory_is_rejected(data_dir, output_dir):
+    with pytest.raises(ValueError, match='must be a relative path'):
+        resolve_output_dir(output_dir)
+
+
+def test_output_is_resolved_under_the_exports_directory(data_dir):
+    assert resolve_output_dir(None) == (data_dir / 'exports').resolve()
+    assert resolve_output_dir('runs/first') == (data_dir / 'exports' / 'runs' / 'first').resolve()
+
+
+def test_export_resumes_from_its_checkpoint(service, stub, data_dir, monkeypatch):
+    monkeypatch.setattr(exporter, 'CHECKPOINT_ROWS', 2)
+    stub.rows['txlist'] = [make_row(block) for block in (100, 200, 300, 400, 500)]
+    directory = resolve_output_dir('run')
+    
+    [result] = _export(service, directory)
+    assert result['complete'] and result['added'] == 5
+    
+    # Rows written after the last checkpoint by an interrupted run are dropped on resume
+    with open(directory / 'ethereum' / ADDRESS / 'transactions.jsonl', 'a', encoding='utf-8') as f:
+        f.write('{"blockNumber": "600"}\n{"blockNu')
+    stub.rows['txlist'] += [make_row(600), make_row(700)]
+    stub.calls.clear()
+    
+    [result] = _export(service, directory)
+    assert result['added'] == 2
+    assert result['rows'] == {'transactions': 7}
+    assert _exported(directory) == ['100', '200', '300', '400', '500', '600', '700']
+    pages = [call for call in stub.calls if call.get('action') == 'txlist']
+    assert int(pages[0]['startblock']) == 501
+
+
+def test_directory_with_files_but_no_checkpoint_is_refused(service, stub, data_dir):
+    stub.rows['txlist'] = [make_row(100)]
+    directory = resolve_output_dir('run')
+    existing = directory / 'ethereum' / ADDRESS / 'transactions.jsonl'
+    existing.parent.mkdir(parents=True)
+    existing.write_text('keep me\n', encoding='utf-8')
+    
+    [result] = _export(service, directory)
+    assert 'no checkpoint.json' in result['error']
+    assert existing.read_text(encoding='utf-8') == 'keep me\n'
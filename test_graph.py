@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+"""
+Tests for the counterparty graph
+
+These run offline against a stubbed scanner session (see conftest.py).
+"""
+
+from decimal import Decimal
+
+from conftest import ADDRESS, OTHER, make_row
+from services.graph import CounterpartyGraph
+
+TOKEN = '0x' + 'c' * 40
+NOISE = '0x' + 'd' * 40
+THIRD = '0x' + 'e' * 40
+
+
+def _transfer(block, contract, sender=OTHER, recipient=ADDRESS, value=10 ** 18):
+    return make_row(block, sender=sender, recipient=recipient, value=value, contractAddress=contract,
+                    tokenName='Token', tokenSymbol='TKN', tokenDecimal='18')
+
+
+def test_token_graph_asks_the_scanner_for_the_followed_token_only(service, stub):
+    # A page of other-token transfers would otherwise crowd out the followed token
+    stub.rows['tokentx'] = [_transfer(9000 + i, NOISE, sender=THIRD) for i in range(20)]
+    stub.rows['tokentx'] += [_transfer(8000, TOKEN), _transfer(8001, TOKEN, sender=ADDRESS, recipient=THIRD)]
+    graph = CounterpartyGraph(service, TOKEN, history_limit=5)
+    
+    edges = graph.counterparties(ADDRESS)
+    assert set(edges) == {OTHER, THIRD}
+    assert edges[OTHER].received == Decimal(1)
+    assert edges[THIRD].sent == Decimal(1)
+    assert {call.get('contractaddress') for call in stub.calls if call.get('action') == 'tokentx'} == {TOKEN}
+
+
+def test_both_directions_report_sent_and_received(service, stub):
+    stub.rows['txlist'] = [
+        make_row(9000, 0, value=10 ** 18),
+        make_row(9001, 1, sender=ADDRESS, recipient=OTHER, value=3 * 10 ** 17)
+    ]
+    graph = CounterpartyGraph(service)
+    
+    [edge] = graph.expand(ADDRESS, hops=1, direction='both')['edges']
+    assert (edge['from'], edge['to']) == (ADDRESS, OTHER)
+    assert (edge['value'], edge['sent'], edge['received']) == ('1.3', '0.3', '1')
+    assert edge['count'] == 2
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+"""
+Tests for the split between finalized and unfinalized history pages
+
+These run offline against a stubbed scanner session (see conftest.py).
+"""
+
+from conftest import ADDRESS, make_row
+
+# Head 10000, finality depth 64: pages through block 9728 are pinned
+HEAD = 10000
+BOUNDARY = 9728
+
+
+def _txlist_calls(stub):
+    return [call for call in stub.calls if call.get('action') == 'txlist']
+
+
+def test_boundary_is_aligned_below_the_finality_depth(service, stub):
+    stub.head = HEAD
+    assert service.finalized_boundary() == BOUNDARY
+
+
+def test_second_scan_refetches_only_the_tail(service, stub):
+    stub.head = HEAD
+    stub.rows['txlist'] = [make_row(block, i) for i, block in enumerate(range(9000, 10000, 40))]
+    
+    first = list(service.iter_transactions(ADDRESS))
+    assert [int(row['blockNumber']) for row in first] == list(range(9000, 10000, 40))
+    assert len(_txlist_calls(stub)) == 2
+    
+    # A new row lands in the tail; the short-lived cache of the tail expires
+    stub.rows['txlist'].append(make_row(9995, 99))
+    service.response_cache.clear()
+    stub.calls.clear()
+    
+    second = list(service.iter_transactions(ADDRESS))
+    assert second == first + [stub.rows['txlist'][-1]]
+    calls = _txlist_calls(stub)
+    assert len(calls) == 1
+    assert int(calls[0]['startblock']) == BOUNDARY + 1
+
+
+def test_recent_rows_combine_tail_with_pinned_page(service, stub):
+    stub.head = HEAD
+    stub.rows['txlist'] = [make_row(block, i) for i, block in enumerate(range(9500, 10000, 25))]
+    
+    first = service.get_transaction_history(ADDRESS, limit=15)
+    assert [tx.block_number for tx in first] == list(range(9975, 9600, -25))
+    
+    service.response_cache.clear()
+    stub.calls.clear()
+    second = service.get_transaction_history(ADDRESS, limit=15)
+    assert second == first
+    calls = _txlist_calls(stub)
+    assert len(calls) == 1
+    assert int(calls[0]['startblock']) == BOUNDARY + 1
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+"""
+Tests for the per-chain inactivity index and the probes that use it
+
+These run offline against a temporary index file and a stubbed scanner
+session (see conftest.py).
+"""
+
+import pytest
+
+from conftest import ADDRESS, OTHER, StubSession, make_row
+from services import inactivity_index
+from services.inactivity_index import InactivityIndex
+
+ADDRESSES = ['0x%040x' % (i * 7919) for i in range(1, 60)]
+
+
+def test_saved_entries_are_read_back_sorted(tmp_path):
+    index = InactivityIndex('ethereum', path=tmp_path / 'ethereum.bin')
+    for i, address in enumerate(reversed(ADDRESSES)):
+        index.record(address, 1000 + i)
+    index.save()
+    
+    reloaded = InactivityIndex('ethereum', path=tmp_path / 'ethereum.bin')
+    assert len(reloaded) == len(ADDRESSES)
+    assert reloaded.quiet_through(ADDRESSES[-1]) == 1000
+    assert reloaded.quiet_through(ADDRESSES[0]) == 1000 + len(ADDRESSES) - 1
+    assert reloaded.quiet_through(ADDRESS) is None
+
+
+def test_changes_merge_into_the_saved_records(tmp_path):
+    index = InactivityIndex('ethereum', path=tmp_path / 'ethereum.bin')
+    for address in ADDRESSES[::2]:
+        index.record(address, 500)
+    index.save()
+    
+    # Interleaved inserts, an update, a discard and a stale record that is ignored
+    for address in ADDRESSES[1::2]:
+        index.record(address, 600)
+    index.record(ADDRESSES[0], 700)
+    index.record(ADDRESSES[2], 100)
+    index.discard(ADDRESSES[4])
+    index.discard(ADDRESS)
+    index.save()
+    
+    reloaded = InactivityIndex('ethereum', path=tmp_path / 'ethereum.bin')
+    expected = {address: 500 if i % 2 == 0 else 600 for i, address in enumerate(ADDRESSES)}
+    expected[ADDRESSES[0]] = 700
+    del expected[ADDRESSES[4]]
+    assert len(reloaded) == len(expected)
+    for address in ADDRESSES:
+        assert reloaded.quiet_through(address) == expected.get(address)
+
+
+def test_changes_are_flushed_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(inactivity_index, 'SAVE_EVERY_CHANGES', 10)
+    path = tmp_path / 'ethereum.bin'
+    index = InactivityIndex('ethereum', path=path)
+    
+    for address in ADDRESSES[:9]:
+        index.record(address, 500)
+    assert not path.exists()
+    index.record(ADDRESSES[9], 500)
+    assert len(InactivityIndex('ethereum', path=path)) == 10
+    
+    # Repeating what is already known is not a change
+    for address in ADDRESSES[:10]:
+        index.record(address, 400)
+    index.save()
+    assert len(InactivityIndex('ethereum', path=path)) == 10
+
+
+@pytest.fixture
+def manager(data_dir):
+    from services.chain_manager import ChainManager
+    chains = ChainManager({'ethereum': 'test-key'})
+    chains.services['ethereum'].session = StubSession()
+    return chains
+
+
+def test_quiet_address_skips_the_balance(manager):
+    service = manager.services['ethereum']
+    stub = service.session
+    
+    first = manager._probe_activity(ADDRESS, 'ethereum')
+    assert not first['has_activity']
+    assert first['quiet_through'] == 9728
+    assert service.inactivity_index.quiet_through(ADDRESS) == 9728
+    
+    # Only the blocks after the recorded one are checked, and no balance is fetched
+    stub.calls.clear()
+    second = manager._probe_activity(ADDRESS, 'ethereum')
+    assert not second['has_activity']
+    assert second['balance'] is None
+    assert second['quiet_through'] == 9728
+    assert [(call['action'], int(call['startblock'])) for call in stub.calls] == [
+        ('txlist', 9729), ('txlistinternal', 9729)
+    ]
+
+
+def test_quiet_address_with_an_internal_transfer_gets_a_real_balance(manager):
+    service = manager.services['ethereum']
+    stub = service.session
+    manager._probe_activity(ADDRESS, 'ethereum')
+    
+    # Value arrives without a transaction of the address's own
+    stub.rows['txlistinternal'] = [make_row(9990, sender=OTHER, recipient=ADDRESS, value=10 ** 18)]
+    stub.balances[ADDRESS] = 10 ** 18
+    stub.calls.clear()
+    result = manager._probe_activity(ADDRESS, 'ethereum')
+    assert result['has_activity']
+    assert result['balance']['balance_in_wei'] == 10 ** 18
+    assert service.inactivity_index.quiet_through(ADDRESS) is None
+    assert stub.actions() == ['txlist', 'txlistinternal', 'balance']
+
+
+def test_quiet_address_with_a_new_transaction_leaves_the_index(manager):
+    service = manager.services['ethereum']
+    manager._probe_activity(ADDRESS, 'ethereum')
+    
+    service.session.rows['txlist'] = [make_row(9990, sender=OTHER, recipient=ADDRESS, value=0)]
+    result = manager._probe_activity(ADDRESS, 'ethereum')
+    assert result['has_activity']
+    assert result['latest_transaction']['block_number'] == 9990
+    assert service.inactivity_index.quiet_through(ADDRESS) is None
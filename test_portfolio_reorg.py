@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+"""
+Tests for unfolding token transfers that a reorg replaced
+
+These run offline against a stubbed scanner session (see conftest.py).
+"""
+
+from conftest import ADDRESS, OTHER, make_row
+from services.portfolio import PortfolioEngine
+from services.reorg import RecentBlocks
+
+TOKEN = '0x' + 'c' * 40
+REPLACED = '0x' + 'f' * 64
+
+
+def _transfer(block, i=0, sender=OTHER, recipient=ADDRESS, value=1000, **fields):
+    return make_row(block, i, sender, recipient, value, contractAddress=TOKEN, tokenName='Token',
+                    tokenSymbol='TKN', tokenDecimal='18', **fields)
+
+
+def test_fork_point_is_the_last_block_with_a_matching_hash(service, stub):
+    recent = RecentBlocks()
+    for block in (9800, 9900, 9950):
+        recent.add(block, _transfer(block))
+    assert recent.find_fork(service) is None
+    
+    stub.hashes[9950] = REPLACED
+    assert recent.find_fork(service) == 9900
+    assert [row['blockNumber'] for row in recent.rollback(9900)] == ['9950']
+    assert recent.newest() == 9900
+
+
+def test_replaced_transfers_are_unfolded_and_refetched(service, stub):
+    stub.rows['tokentx'] = [
+        _transfer(9000, value=5000),
+        _transfer(9800, value=300),
+        _transfer(9900, sender=ADDRESS, recipient=OTHER, value=200)
+    ]
+    engine = PortfolioEngine(service, ADDRESS)
+    assert engine.update() == 3
+    stub.rows['tokentx'] += [_transfer(9950, 0, value=700), _transfer(9950, 1, value=50)]
+    assert engine.update() == 2
+    assert engine.balances[TOKEN] == 5850
+    
+    # Block 9950 is replaced: one transfer dropped, another lands in 9960
+    stub.hashes[9950] = REPLACED
+    stub.rows['tokentx'][3:] = [_transfer(9960, value=40, blockHash='0x' + 'e' * 64)]
+    stub.hashes[9960] = '0x' + 'e' * 64
+    stub.calls.clear()
+    
+    assert engine.update() == 1
+    assert engine.rolled_back == 2
+    assert engine.balances[TOKEN] == 5000 + 300 - 200 + 40
+    assert engine.transfer_counts[TOKEN] == 4
+    assert engine.transfers_processed == 4
+    
+    # The replaced tail was fetched again rather than read from the cache
+    pages = [call for call in stub.calls if call.get('action') == 'tokentx']
+    assert [int(call['startblock']) for call in pages] == [9901]
+    
+    # Another sync with no reorg changes nothing
+    assert engine.update() == 0
+    assert engine.balances[TOKEN] == 5140
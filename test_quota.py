@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+"""
+Tests for daily API quota accounting
+
+These run offline against a temporary quota file.
+"""
+
+import multiprocessing
+import os
+import sys
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from services import quota
+from services.degraded import UpstreamUnavailable
+from services.quota import QuotaTracker
+from services.scheduler import RequestScheduler, BACKGROUND, BULK, INTERACTIVE
+
+
+def _record_and_save(path, rounds):
+    """Runs in a separate process: save one call at a time, as often as possible"""
+    tracker = QuotaTracker('ethereum', 'test-key', 10 ** 6, path=path)
+    for _ in range(rounds):
+        tracker.record(1)
+        tracker.save()
+
+
+def _tracker(tmp_path, limit=100):
+    scheduler = RequestScheduler(1000)
+    return QuotaTracker('ethereum', 'test-key', limit, scheduler=scheduler, path=tmp_path / 'quota.json'), scheduler
+
+
+def test_low_priority_classes_pause_as_usage_grows(tmp_path):
+    tracker, scheduler = _tracker(tmp_path)
+    
+    tracker.record(79)
+    assert not scheduler.is_paused(BULK)
+    tracker.record(1)
+    assert scheduler.is_paused(BULK)
+    assert not scheduler.is_paused(BACKGROUND)
+    tracker.record(10)
+    assert scheduler.is_paused(BACKGROUND)
+    assert tracker.status()['throttled'] == [BACKGROUND, BULK]
+
+
+def test_throttled_class_fails_fast_with_reason(tmp_path):
+    tracker, _ = _tracker(tmp_path)
+    tracker.record(85)
+    
+    tracker.check(INTERACTIVE)
+    tracker.check(BACKGROUND)
+    with pytest.raises(UpstreamUnavailable, match='bulk calls are paused at 85%'):
+        tracker.check(BULK)
+
+
+def test_counts_roll_over_at_midnight_utc(tmp_path, monkeypatch):
+    monkeypatch.setattr(quota, '_today', lambda: '2026-01-01')
+    tracker, scheduler = _tracker(tmp_path)
+    tracker.record(95)
+    tracker.save()
+    assert scheduler.is_paused(BULK)
+    
+    monkeypatch.setattr(quota, '_today', lambda: '2026-01-02')
+    status = tracker.status()
+    assert status['day'] == '2026-01-02'
+    assert status['used'] == 0
+    assert status['throttled'] == []
+    assert not scheduler.is_paused(BULK)
+    tracker.check(BULK)
+    
+    # Yesterday's stored total does not count against the new day
+    assert QuotaTracker('ethereum', 'test-key', 100, path=tmp_path / 'quota.json').status()['used'] == 0
+
+
+def test_counts_from_several_processes_add_up(tmp_path):
+    first = QuotaTracker('ethereum', 'test-key', 1000, path=tmp_path / 'quota.json')
+    second = QuotaTracker('ethereum', 'test-key', 1000, path=tmp_path / 'quota.json')
+    first.record(10)
+    first.save()
+    second.record(5)
+    second.save()
+    
+    assert QuotaTracker('ethereum', 'test-key', 1000, path=tmp_path / 'quota.json').status()['used'] == 15
+
+
+def test_concurrent_saves_from_processes_lose_no_calls(tmp_path):
+    path = tmp_path / 'quota.json'
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=_record_and_save, args=(path, 200)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+    
+    assert QuotaTracker('ethereum', 'test-key', 10 ** 6, path=path).status()['used'] == 800
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+"""
+Tests for the 4-byte selector index and its batched saves
+
+These run offline against a temporary index file.
+"""
+
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from services import selector_index
+from services.selector_index import SelectorIndex
+from services.storage import write_atomic
+
+
+def _abi(*names):
+    return [{'type': 'function', 'name': name, 'inputs': [{'type': 'uint256'}]} for name in names]
+
+
+def test_abis_are_saved_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(selector_index, 'SAVE_EVERY_CHANGES', 4)
+    path = tmp_path / 'selectors.bin'
+    index = SelectorIndex(path=path, dataset='')
+    
+    index.register_abi(_abi('first', 'second'))
+    assert not path.exists()
+    index.register_abi(_abi('third', 'fourth'))
+    assert len(SelectorIndex(path=path, dataset='')) == 4
+    
+    index.register_abi(_abi('fifth'))
+    index.save()
+    reloaded = SelectorIndex(path=path, dataset='')
+    assert reloaded.lookup(selector_index.function_selector('fifth(uint256)')) == 'fifth(uint256)'
+
+
+def test_failed_write_leaves_no_temp_file(tmp_path):
+    target = tmp_path / 'taken'
+    target.mkdir()
+    (target / 'inside').write_text('x')
+    
+    # Replacing a non-empty directory fails after the temp file was written
+    assert not write_atomic(target, b'data')
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['taken']
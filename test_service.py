@@ -67,8 +67,15 @@ def test_etherscan_service():
         print(f"   Token transfers successful")
         print()
         
-        # Test 4: Get gas prices
-        print("4. Testing gas prices")
+        # Test 4: Get internal transactions
+        print(f"4. Testing internal transactions for {test_address}")
+        internal_txs = service.get_internal_transactions(test_address, limit=3)
+        print(f"   Found {len(internal_txs)} internal transactions")
+        print(f"   Internal transactions successful")
+        print()
+        
+        # Test 5: Get gas prices
+        print("5. Testing gas prices")
         gas_prices = service.get_gas_oracle()
         print(f"   Safe: {gas_prices.safe_gwei} Gwei")
         print(f"   Standard: {gas_prices.propose_gwei} Gwei")
@@ -76,9 +83,9 @@ def test_etherscan_service():
         print(f"   Gas prices successful")
         print()
         
-        # Test 5: Test contract ABI (using USDC contract - well known)
-        print("5. Testing contract ABI fetch")
-        usdc_contract = "0xA0b86a33E6417c0b8cE4E3aDa22b9a7D3A76b5f6"  # USDC contract
+        # Test 6: Test contract ABI (using USDC contract - well known)
+        print("6. Testing contract ABI fetch")
+        usdc_contract = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"  # USDC contract
         try:
             abi = service.get_contract_abi(usdc_contract)
             print(f"   ABI retrieved successfully ({len(abi)} characters)")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+"""
+Tests for the SQLite response cache shared between server processes
+
+These run offline against a temporary database file.
+"""
+
+import os
+import sqlite3
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from services import shared_cache
+from services.shared_cache import SQLiteCache, create_response_cache
+
+PAGE = {'status': '1', 'result': [{'blockNumber': str(i), 'input': '0x' + 'ab' * 50} for i in range(10)]}
+
+
+def test_pruning_keeps_each_namespace_under_its_byte_budget(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_cache, 'PRUNE_EVERY', 10)
+    path = tmp_path / 'cache.sqlite3'
+    finalized = SQLiteCache('ethereum-finalized', path, default_ttl=None, max_bytes=20000)
+    other = SQLiteCache('bsc-finalized', path, default_ttl=None, max_bytes=20000)
+    other.set('kept', PAGE)
+    
+    for block in range(40):
+        finalized.set(('history', block), PAGE)
+    
+    assert 0 < finalized.disk_bytes() <= 20000
+    assert finalized.evictions > 0
+    # The oldest pages went first, and the other namespace was left alone
+    assert finalized.get(('history', 0)) is None
+    assert finalized.get(('history', 39)) == PAGE
+    assert other.get('kept') == PAGE
+
+
+def test_value_bigger_than_the_budget_is_not_stored(tmp_path):
+    cache = SQLiteCache('ethereum', tmp_path / 'cache.sqlite3', max_bytes=500)
+    cache.set('page', {'result': []})
+    cache.set('page', PAGE)
+    assert cache.get('page') is None
+    assert cache.stats()['rejected'] == 1
+    assert cache.disk_bytes() == 0
+
+
+def test_databases_without_sizes_are_upgraded(tmp_path):
+    path = tmp_path / 'cache.sqlite3'
+    conn = sqlite3.connect(str(path))
+    conn.execute('CREATE TABLE entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, stored_at REAL NOT NULL)')
+    conn.commit()
+    conn.close()
+    
+    cache = SQLiteCache('ethereum', path, max_bytes=100000)
+    cache.set('page', PAGE)
+    assert cache.get('page') == PAGE
+    assert cache.disk_bytes() > 0
+
+
+def test_backend_gets_the_byte_budget(tmp_path, monkeypatch):
+    monkeypatch.setenv('CACHE_BACKEND', 'sqlite')
+    monkeypatch.setenv('CACHE_PATH', str(tmp_path / 'cache.sqlite3'))
+    cache = create_response_cache('ethereum-finalized', max_entries=50000, default_ttl=None, max_bytes=1 << 20)
+    assert isinstance(cache, SQLiteCache)
+    assert cache.stats()['max_bytes'] == 1 << 20